@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of reqman's hot paths, on synthetic scenarios (see generators.py)
+against the in-process mock (no network, runnable offline) :
+
+    python3 benchmarks/bench.py                  # run all, compare to the baseline
+    python3 benchmarks/bench.py render clone     # run the benchs matching these names
+    python3 benchmarks/bench.py --save           # run, and store the results as the baseline
+    python3 benchmarks/bench.py --threshold 0.3  # allowed slowdown vs baseline (default 20%)
+
+For each bench : ops/sec, peak memory of one op (tracemalloc), and the
+ratio against the stored baseline. Exit code is 1 if a bench regresses.
+"""
+import os, sys, time, json, asyncio, tracemalloc, argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import reqman
+import generators as gen
+
+BASELINE = os.path.join(HERE, "baseline.json")
+BENCHS = {}  # name -> setup function (which returns the op to measure)
+
+
+def bench(name):
+    def _(fn):
+        BENCHS[name] = fn
+        return fn
+
+    return _
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def newReqman(ymls: list, conf: str = None) -> reqman.Reqman:
+    r = reqman.Reqman(conf or gen.genConf())
+    r.outputConsole = reqman.OutputConsole.NO
+    for y in ymls:
+        r.add(y)
+    return r
+
+
+###############################################################################
+@bench("env.replaceTxt")
+def _():
+    env = reqman.Env(gen.genConf())
+    txt = " ".join(["<<var%s>>" % i for i in range(0, 150, 3)] + ["<<obj.k3.c.d>>", "<<var7|upper>>"])
+    return lambda: env.replaceTxt(txt)
+
+
+@bench("env.clone")
+def _():
+    env = reqman.Env(gen.genConf(nbVars=1000))
+    return lambda: env.clone()
+
+
+@bench("reqs.parse")
+def _():
+    env = reqman.Env(gen.genConf())
+    yml = gen.genYml(nbReqs=200)
+    return lambda: reqman.Reqs(yml, env)
+
+
+@bench("testresult")
+def _():
+    env = reqman.Env(gen.genConf())
+    env["json"] = json.loads(gen.jsonBody(100))
+    env["status"] = 200
+    tests = [{"json.items.%s.id" % (i % 10): i % 10} for i in range(100)]
+    return lambda: reqman.TestResult(tests, env, 200)
+
+
+@bench("render")
+def _():
+    r = newReqman([gen.genYml(nbReqs=30) for i in range(10)])
+    rr = run(r.asyncExecute(http=gen.mock()))
+    return lambda: reqman.render(rr)
+
+
+@bench("execute.files")
+def _():
+    r = newReqman([gen.genYml(nbReqs=20) for i in range(20)])
+    http = gen.mock()
+    return lambda: run(r.asyncExecute(http=http))
+
+
+@bench("execute.foreach")
+def _():
+    r = newReqman([gen.genForeach(depth=2, width=20)])
+    http = gen.mock("ok")
+    return lambda: run(r.asyncExecute(http=http))
+
+
+@bench("execute.bigjson")
+def _():
+    r = newReqman([gen.genYml(nbReqs=5, nbTests=20, calls=False)])
+    http = gen.mock(gen.jsonBody(10000))
+    return lambda: run(r.asyncExecute(http=http))
+
+
+@bench("execute.bigxml")
+def _():
+    yml = "- GET: /xml\n  tests:\n    - xml.//item[@id='3']/name.size: 500\n"
+    r = newReqman([yml])
+    http = gen.mock(gen.xmlBody(5000))
+    return lambda: run(r.asyncExecute(http=http))
+
+
+def mixed(inline: bool):
+    """ parallel files against a local server : a few big json bodies (decoded/parsed/tested
+        on the loop when 'inline', else offloaded) among small delayed ones. 'lag' is the
+        mean error (ms) of the measured time of the small ones """
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    big = gen.jsonBody(50000).encode()
+    delay = 0.02
+
+    async def bigHandler(request):
+        return web.Response(body=big, content_type="application/json")
+
+    async def smallHandler(request):
+        await asyncio.sleep(delay)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/big", bigHandler)
+    app.router.add_get("/small", smallHandler)
+    server = TestServer(app)
+    run(server.start_server())
+    root = str(server.make_url(""))
+
+    ymls = ["- GET: /big\n  tests:\n    - status: 200\n" * 4]
+    ymls += ["- GET: /small\n  tests:\n    - status: 200\n" * 10 for i in range(10)]
+    r = newReqman(ymls, "root: %s\n" % root)
+
+    def op():
+        old = reqman.OFFLOAD
+        if inline:
+            reqman.OFFLOAD = float("inf")
+        try:
+            rr = run(r.asyncExecute(paralleliz=True))
+        finally:
+            reqman.OFFLOAD = old
+        times = [x.time for i in rr.results[1:] for x in i.exchanges if x.url.endswith("/small")]
+        return dict(lag=sum(times) / len(times) - delay * 1000)
+
+    return op
+
+
+@bench("execute.mixed")
+def _():
+    return mixed(inline=False)
+
+
+@bench("execute.mixed.inline")
+def _():
+    return mixed(inline=True)
+
+
+###############################################################################
+def measure(op, minTime: float) -> dict:
+    op()  # warm up
+    nb, t0 = 0, time.perf_counter()
+    while True:
+        extra = op()  # (a dict of other metrics, or None)
+        nb += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= minTime:
+            break
+
+    tracemalloc.start()
+    op()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(ops=nb / elapsed, peak=peak, **(extra if type(extra) is dict else {}))
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="reqman's benchmarks")
+    p.add_argument("names", nargs="*", help="benchs to run (substring match)")
+    p.add_argument("--save", action="store_true", help="store the results as the baseline")
+    p.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2=20%%)")
+    p.add_argument("--time", type=float, default=1.0, help="min time (s) per bench")
+    p.add_argument("--baseline", default=BASELINE)
+    args = p.parse_args(argv)
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as fid:
+            baseline = json.load(fid)
+
+    results, regressions = {}, []
+    print("%-18s %12s %12s %10s" % ("bench", "ops/sec", "peak (KB)", "vs base"))
+    for name, setup in BENCHS.items():
+        if args.names and not any(n in name for n in args.names):
+            continue
+        r = results[name] = measure(setup(), args.time)
+        ratio = ""
+        if name in baseline:
+            x = r["ops"] / baseline[name]["ops"]
+            ratio = "%+.0f%%" % ((x - 1) * 100)
+            if x < 1 - args.threshold:
+                regressions.append(name)
+                ratio += " !!"
+        extra = " ".join("%s=%.1f" % (k, v) for k, v in r.items() if k not in ["ops", "peak"])
+        print("%-18s %12.1f %12.1f %10s  %s" % (name, r["ops"], r["peak"] / 1024, ratio, extra))
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w+") as fid:
+            json.dump(baseline, fid, indent=2, sort_keys=True)
+        print("Baseline saved:", args.baseline)
+
+    if regressions:
+        print("REGRESSIONS:", ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
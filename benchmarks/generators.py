@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic scenarios for the benchmarks (reqman.conf, yml files, mock
+responses), all deterministic, to run against the in-process mock.
+"""
+import json
+
+ROOT = "http://bench"
+
+
+def genConf(nbVars=200, nbSwitches=20, nbProcs=20) -> str:
+    """ a big reqman.conf : vars (with nested references), switches & procs """
+    l = ["root: %s" % ROOT, "headers:", "  x-token: <<var0>>"]
+    for i in range(nbVars):
+        if i % 3 == 2:
+            l.append("var%s: <<var%s>>-<<var%s>>" % (i, i - 1, i - 2))
+        else:
+            l.append("var%s: value%s" % (i, i))
+    l.append("obj:")
+    for i in range(nbVars // 4):
+        l.append("  k%s: {a: %s, b: [1, 2, 3], c: {d: text%s}}" % (i, i, i))
+    l.append("upper: |\n  return x.upper()")
+    l.append("switches:")
+    for i in range(nbSwitches):
+        l.append("  sw%s:\n    doc: switch %s\n    root: %s/sw%s" % (i, i, ROOT, i))
+    for i in range(nbProcs):
+        l.append("proc%s:\n  - GET: /proc/%s\n    tests:\n      - status: 200" % (i, i))
+    return "\n".join(l) + "\n"
+
+
+def genTests(nb=10) -> list:
+    """ the tests of a request (against the json of jsonBody()) """
+    ll = ["    - status: 200"]
+    for i in range(nb):
+        ll.append("    - json.items.%s.id: %s" % (i % 10, i % 10))
+    return ll
+
+
+def genYml(nbReqs=20, nbTests=10, calls=True) -> str:
+    """ a yml file of requests, with params, headers, body, tests & calls """
+    l = []
+    for i in range(nbReqs):
+        l.append("- POST: /item/<<var%s>>/%s" % (i % 50, i))
+        l.append("  headers:\n    x-id: <<var%s|upper>>" % (i % 50))
+        l.append('  body: {"id": %s, "name": "<<var%s>>", "list": [1,2,3]}' % (i, i % 50))
+        l.append("  tests:")
+        l.extend(genTests(nbTests))
+        l.append("  save: last")
+        if calls and i % 5 == 0:
+            l.append("- call: proc%s" % (i % 20))
+    return "\n".join(l) + "\n"
+
+
+def genForeach(depth=2, width=20) -> str:
+    """ nested procs, each level iterating on 'width' params """
+    l = ["- level%s:" % depth]
+    l.append("    - GET: /deep/<<i0>>/<<i1>>")
+    l.append("      tests:\n        - status: 200")
+    for d in range(depth - 1, -1, -1):
+        l.append("- level%s:" % d)
+        l.append("    - call: level%s" % (d + 1))
+        l.append("      foreach:")
+        for w in range(width):
+            l.append("        - i%s: %s" % (d, w))
+    l.append("- call: level0")
+    return "\n".join(l) + "\n"
+
+
+def jsonBody(nbItems=10000) -> str:
+    """ a large json document """
+    return json.dumps(
+        dict(
+            items=[dict(id=i % 10, name="item%s" % i, tags=["a", "b"], v=i * 1.5) for i in range(nbItems)],
+            total=nbItems,
+        )
+    )
+
+
+def xmlBody(nbItems=5000) -> str:
+    """ a large xml document """
+    return "<root>%s</root>" % "".join(
+        ['<item id="%s"><name>item%s</name><v>%s</v></item>' % (i % 10, i, i) for i in range(nbItems)]
+    )
+
+
+def mock(body: str = None) -> dict:
+    """ the in-process mock (reqman's 'http' dict), answering 'body' to all urls """
+    body = body or jsonBody(20)
+
+    class Any(dict):
+        def __contains__(self, url):
+            return True
+
+        def __getitem__(self, url):
+            return (200, body)
+
+    return Any()
@@ -15,15 +15,18 @@
 # https://github.com/manatlan/reqman
 # #############################################################################
 
-import os, sys, re, asyncio, io, datetime, itertools, glob, enum, codecs
+import os, sys, re, asyncio, io, datetime, itertools, glob, enum, codecs, copy, time, random
 import http, urllib, email  # for cookies management
+import email.utils
 import urllib.parse
-import collections, json
+import collections, collections.abc, json, difflib, mimetypes, csv
 import typing as T
 import sys, traceback
-import pickle, zlib, hashlib
+import pickle, zlib, hashlib, tempfile, heapq
 import http.cookiejar
-import concurrent, ssl
+import concurrent, ssl, atexit
+import concurrent.futures
+import multiprocessing
 from defusedxml.minidom import parseString
 import encodings.idna
 import inspect
@@ -33,6 +36,7 @@ import inspect
 
 # import httpcore # see "pip install httpcore"
 import aiohttp  # see "pip install aiohttp"
+import aiohttp.web
 import yaml  # see "pip install pyyaml"
 import stpl  # see "pip install stpl"
 import xpath  # see "pip install py-dom-xpath-six"
@@ -49,6 +53,7 @@ else :
 
 __usage__="""USAGE TEST   : %s [--option] [-switch] <folder|file>...
 USAGE CREATE : %s new <url>
+USAGE SERVE  : %s serve [port]
 Version %s
 Test a http service with pre-made scenarios, whose are simple yaml files
 (More info on https://github.com/manatlan/reqman)
@@ -65,8 +70,22 @@ Test a http service with pre-made scenarios, whose are simple yaml files
         --s        : Save RMR file
         --r        : Replay the given RMR file in dual mode
         --i        : Use SHEBANG params (for a single file), alone
-        --x:var    : Special mode to output an env var (as json output)
-""" % (REQMANEXE,REQMANEXE,__version__)
+        --x:var    : Special mode to output an env var (as json output), only the
+                     requests which contribute to the var are executed (no html)
+        --watch    : Re-run the changed files (or all, if reqman.conf changes)
+        --workers:N: Shard the files in N processes (BEGIN/END run once)
+        --profile  : Print the time spent per phase (--profile:file.json
+                     to save a chrome-trace too)
+        --failfast : Stop after the first failed test (--failfast:N after N, or
+                     --failfast:N,M after N failed tests or M unreachable/timeouts)
+        --rerun-failed : Re-run only the failed requests of the given RMR file
+                     (and the ones they depend on, thru saved vars)
+        --sample:10%% : Execute a sample of the rows of the foreach's (a rate, or a
+                     number of rows, --sample:5), chosen by a seed (--sample:10%%,seed)
+        --shard:i/n: Execute the i-th part (on n) of the rows of the foreach's
+        --reordered: In dual mode, match the exchanges by id wherever they are
+                     (for runs whose order can differ, ex: --p)
+""" % (REQMANEXE,REQMANEXE,REQMANEXE,__version__)
 
 EXPOSEDS={}  #to be able to expose real python code as {"functName": <callable>, ...}
 
@@ -92,6 +111,11 @@ try:  # colorama is optionnal
 except ImportError:
     cy = cr = cg = cb = cw = lambda t: t
 
+try:  # httpx (with h2) is optionnal, for the http2 transport (see request2())
+    import httpx
+except ImportError:
+    httpx = None
+
 KNOWNVERBS = [
     "GET",
     "POST",
@@ -103,8 +127,9 @@ KNOWNVERBS = [
     "PATCH",
     "CONNECT",
 ]
-KNOWNACTIONEXT = ["headers", "doc", "tests", "params", "foreach", "save", "body", "if", "query"]
+KNOWNACTIONEXT = ["headers", "doc", "tests", "params", "foreach", "save", "body", "form", "multipart", "if", "query", "retry", "sample"]
 REQMAN_CONF = "reqman.conf"
+LONGOPTIONS = ["watch", "workers", "profile", "failfast", "rerun-failed", "sample", "shard", "reordered"]  # options with a long name (others letters can be grouped, ex: --kspb)
 
 
 class OutputConsole(enum.Enum):
@@ -114,6 +139,76 @@ class OutputConsole(enum.Enum):
     FULL = 3
 
 
+class Profiler:
+    """ Low-overhead spans (wall & cpu ns), when enabled (see --profile) """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []  # (phase, name, start_ns, wall_ns, cpu_ns)
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+        self.spans = []
+
+    def start(self):
+        if self.enabled:
+            return time.perf_counter_ns(), time.thread_time_ns()
+
+    def stop(self, t, phase: str, name: str = ""):
+        if t is not None:
+            self.spans.append(
+                (
+                    phase,
+                    name,
+                    t[0],
+                    time.perf_counter_ns() - t[0],
+                    time.thread_time_ns() - t[1],
+                )
+            )
+
+    def report(self, top=5) -> str:
+        ms = lambda ns: "%10.1f" % (ns / 1000000)
+        phases = collections.OrderedDict()
+        for phase, name, _, wall, cpu in self.spans:
+            phases.setdefault(phase, []).append((wall, cpu, name))
+
+        l = ["%-10s %8s %10s %10s %10s %10s" % ("phase", "count", "wall(ms)", "cpu(ms)", "mean(ms)", "max(ms)")]
+        for phase, ll in phases.items():
+            walls = [i[0] for i in ll]
+            l.append(
+                "%-10s %8s %s %s %s %s"
+                % (phase, len(ll), ms(sum(walls)), ms(sum([i[1] for i in ll])), ms(sum(walls) / len(ll)), ms(max(walls)))
+            )
+
+        def slowest(phase, title):
+            if phase in phases:
+                l.append(title)
+                for wall, cpu, name in sorted(phases[phase], reverse=True)[:top]:
+                    l.append("%s  %s" % (ms(wall), name))
+
+        slowest("request", "Slowest requests (ms):")
+        if "resolver" in phases:  # aggregated by method
+            l.append("Slowest resolvers (ms):")
+            d = collections.Counter()
+            for wall, cpu, name in phases["resolver"]:
+                d[name] += wall
+            for name, wall in d.most_common(top):
+                l.append("%s  %s" % (ms(wall), name))
+        return "\n".join(l)
+
+    def dump(self, filename: str):
+        """ save the spans as a chrome-trace json file (chrome://tracing, speedscope) """
+        events = [
+            dict(name=name or phase, cat=phase, ph="X", ts=start / 1000, dur=wall / 1000, pid=1, tid=1)
+            for phase, name, start, wall, cpu in self.spans
+        ]
+        with open(filename, "w+") as fid:
+            json.dump(dict(traceEvents=events, displayTimeUnit="ms"), fid)
+
+
+PROFILER = Profiler()
+
+
 class RMFormatException(Exception):
     pass
 
@@ -148,8 +243,10 @@ def jdumps(o, *a, **k):
     return json.dumps(o, *a, **k)
 
 
-def izip(ex1, ex2):
-    pop = lambda ex: len(ex) > 0 and ex.pop(0) or None
+def izip(ex1, ex2, reordered=False):
+    """ align the exchanges of 2 runs (by their ids), in linear time.
+        if 'reordered' : the order of 'ex1' is kept, and the exchanges of 'ex2'
+        are matched wherever they are (for runs whose order can differ) """
 
     def trans(ex):
         tex = {}
@@ -165,25 +262,55 @@ def izip(ex1, ex2):
     tex1, lex1 = trans(ex1)
     tex2, lex2 = trans(ex2)
 
-    cex1 = [(i, tex2.get(uid)) for uid, i in lex1]
-    cex2 = [(i, tex1.get(uid)) for uid, i in lex2]
+    if reordered:
+        orphans = collections.defaultdict(list)  # uid of the previous matched -> unmatched of ex2
+        anchor = None
+        for uid, i in lex2:
+            if uid in tex1:
+                anchor = uid
+            else:
+                orphans[anchor].append((None, i))
+
+        l = list(orphans[None])
+        for uid, i in lex1:
+            l.append((i, tex2.get(uid)))
+            l.extend(orphans.get(uid, []))
+        return l
+
+    # a tuple is keyed as it is compared (Exchange.__eq__ compares ids)
+    key = lambda t: t and tuple(i.id if i else None for i in t)
+
+    cex1 = collections.deque((i, tex2.get(uid)) for uid, i in lex1)
+    cex2 = collections.deque((i, tex1.get(uid)) for uid, i in lex2)
+    rest1 = collections.Counter(key(i) for i in cex1)  # to know in O(1) if in cex1
+    rest2 = collections.Counter(key(i) for i in cex2)
+
+    def pop(cex, rest):
+        if cex:
+            i = cex.popleft()
+            rest[key(i)] -= 1
+            return i
+
+    def push(cex, rest, i):
+        cex.appendleft(i)
+        rest[key(i)] += 1
 
     l = []
     while 1:
-        i1 = pop(cex1)
-        i2 = pop(cex2)
+        i1 = pop(cex1, rest1)
+        i2 = pop(cex2, rest2)
         if i1 is None and i2 is None:
             break
         if i1 == i2:
             l.append(i1)
         else:
-            if i2 in cex1:
+            if i2 and rest1[key(i2)] > 0:
                 l.append((i1[0], None))
-                cex2.insert(0, i2)
+                push(cex2, rest2, i2)
             else:
-                if i1 in cex2:
+                if i1 and rest2[key(i1)] > 0:
                     l.append((None, i2[0]))
-                    cex1.insert(0, i1)
+                    push(cex1, rest1, i1)
                 else:
                     if i1:
                         l.append((i1[0], None))
@@ -230,6 +357,10 @@ class CookieStore(http.cookiejar.CookieJar):  # TODO: can do a lot better with h
 
     def __init__(self, ll: T.List[dict] = []) -> None:
         http.cookiejar.CookieJar.__init__(self)
+        self.add(ll)
+
+    def add(self, ll: T.List[dict]) -> None:
+        """ add exported cookies (see export()) """
         for c in ll:
             self.set_cookie(http.cookiejar.Cookie(**c))
 
@@ -282,15 +413,29 @@ def toStr(x):
 
 
 class Content:
+    """ the bytes of a body, in one buffer (a memoryview) which the views read
+        without copying it (its text is decoded once) """
+
     def __init__(self, content):
-        self.__b = content if type(content) is bytes else ustr(content).encode()
+        content = content if type(content) is bytes else ustr(content).encode()
+        self.__b = memoryview(content)
+        self.__s = None  # the decoded text (lazy)
+
+    def __str(self) -> T.Union[str, None]:
+        if self.__s is None:
+            try:
+                self.__s = str(self.__b, "utf-8")
+            except UnicodeDecodeError:
+                self.__s = False  # binary
+        return None if self.__s is False else self.__s
 
     def __repr__(self) -> str:
-        return toStr(self.__b)
+        s = self.__str()
+        return s if s is not None else str(self.__b.obj)
 
     def toJson(self):
         try:
-            return json.loads(self.__b.decode())
+            return json.loads(self.__str())
         except:
             return None
 
@@ -301,8 +446,186 @@ class Content:
             return None
 
     def __bytes__(self):
+        return self.__b.obj  # (no copy)
+
+    def view(self) -> memoryview:
         return self.__b
 
+    def __getstate__(self):  # (a memoryview can't be pickled)
+        return {"_Content__b": self.__b.obj}
+
+    def __setstate__(self, state):
+        self.__b = memoryview(state["_Content__b"])
+        self.__s = None
+
+
+class BodyStream:
+    """ A request body which is streamed (chunked transfer) from a file (<<file:path>>)
+        or an iterator (returned by a python method) ; it's never held in memory,
+        only its size & hash are kept (computed while sent) """
+
+    CHUNK = 64 * 1024
+
+    def __init__(self, source: T.Union[str, T.Iterator], name: str = None):
+        self.source = source  # a file path, or an iterator of bytes/str
+        self.name = name or (source if type(source) is str else "<iterator>")
+        self.size = 0
+        self.hash = None
+        self.consumed = False
+
+    @property
+    def replayable(self) -> bool:  # an iterator can only be sent once
+        return type(self.source) is str or not self.consumed
+
+    def _chunks(self) -> T.Iterator:
+        if type(self.source) is str:
+            with open(self.source, "rb") as fid:
+                while True:
+                    chunk = fid.read(BodyStream.CHUNK)
+                    if not chunk:
+                        break
+                    yield chunk
+        else:
+            yield from self.source
+
+    def __iter__(self) -> T.Iterator[bytes]:
+        self.consumed = True
+        self.size, md5 = 0, hashlib.md5()
+        for chunk in self._chunks():
+            chunk = chunk.encode() if type(chunk) is str else bytes(chunk)
+            self.size += len(chunk)
+            md5.update(chunk)
+            yield chunk
+        self.hash = md5.hexdigest()
+
+    async def stream(self) -> T.AsyncIterator[bytes]:  # for the transports
+        for chunk in self:
+            yield chunk
+
+    def drain(self) -> None:
+        if not self.consumed:
+            for _ in self:
+                pass
+
+    def __str__(self):
+        return "<stream %s: %s bytes, md5 %s>" % (self.name, self.size, self.hash)
+
+
+class Multipart(BodyStream):
+    """ A multipart/form-data body, whose parts are encoded lazily while streamed
+        (a file part, ie a BodyStream value, is read by chunks) """
+
+    def __init__(self, fields: dict):
+        super().__init__(None, "multipart(%s)" % ",".join(fields))
+        self.fields = fields  # name -> value (or list of values)
+        self.boundary = "----reqman" + hashlib.md5(os.urandom(16)).hexdigest()
+
+    @property
+    def contentType(self) -> str:
+        return "multipart/form-data; boundary=%s" % self.boundary
+
+    @property
+    def replayable(self) -> bool:
+        return all(v.replayable for _, v in self._values() if isinstance(v, BodyStream))
+
+    def _values(self) -> T.Iterator:
+        for name, value in self.fields.items():
+            for v in value if type(value) is list else [value]:
+                yield name, v
+
+    def _chunks(self) -> T.Iterator[bytes]:
+        for name, v in self._values():
+            head = "--%s\r\nContent-Disposition: form-data; name=\"%s\"" % (
+                self.boundary,
+                name.replace('"', "%22"),
+            )
+            if isinstance(v, BodyStream):
+                filename = os.path.basename(v.name).replace('"', "%22")
+                ctype = mimetypes.guess_type(v.name)[0] or "application/octet-stream"
+                yield (
+                    '%s; filename="%s"\r\nContent-Type: %s\r\n\r\n'
+                    % (head, filename, ctype)
+                ).encode()
+                v.consumed = True  # (not hashed, per part)
+                for chunk in v._chunks():
+                    yield chunk.encode() if type(chunk) is str else bytes(chunk)
+            else:
+                if v is None:
+                    v = ""
+                elif type(v) not in [str, bytes]:
+                    v = jdumps(v)
+                yield (head + "\r\n\r\n").encode()
+                yield v if type(v) is bytes else v.encode()
+            yield b"\r\n"
+        yield ("--%s--\r\n" % self.boundary).encode()
+
+
+class Rows:
+    """ The rows (dicts) of a foreach's data source : a csv file (with a header line),
+        a jsonl file (a json dict per line), or a folder of json files (a dict per file).
+        They are read lazily (one at a time, at each iteration), and can be sliced """
+
+    KEYS = ["file", "start", "stop", "step"]  # of a source (as a dict)
+
+    def __init__(self, path: str, name: str = None, start=None, stop=None, step=None):
+        self.path = path
+        self.name = name or path
+        self.slice = (start, stop, step)
+
+    @classmethod
+    def get(cls, scope: "Env", o: T.Union[str, dict]) -> "Rows":
+        """ from "<<file:path>>", or a dict {file, start, stop, step} """
+        if type(o) is str:
+            o = dict(file=o.strip()[7:-2])
+        try:
+            start, stop, step = [
+                None if o.get(k) is None else int(o[k]) for k in ["start", "stop", "step"]
+            ]
+            assert all(i is None or i >= 0 for i in [start, stop]) and step != 0  # (islice's ones)
+            assert step is None or step > 0
+        except (ValueError, TypeError, AssertionError):
+            raise RMException("Reqs: foreach source start/stop/step should be numbers")
+
+        name = str(scope.replaceTxt(str(o["file"]))).strip()
+        path = name
+        if scope.path and not os.path.isabs(path):
+            path = os.path.join(scope.path, path)
+        if not os.path.exists(path):
+            raise RMException("Reqs: foreach source '%s' not found" % name)
+        return cls(path, name, start, stop, step)
+
+    @staticmethod
+    def isSource(o: dict) -> bool:
+        return "file" in o and all(k in Rows.KEYS for k in o)
+
+    def _rows(self) -> T.Iterator:
+        if os.path.isdir(self.path):
+            for fn in sorted(glob.glob(os.path.join(self.path, "*.json"))):
+                with open(fn, "r", encoding="utf-8-sig") as fid:
+                    yield json.load(fid)
+        elif self.path.lower().endswith(".csv"):
+            with open(self.path, "r", newline="", encoding="utf-8-sig") as fid:
+                yield from csv.DictReader(fid)
+        elif self.path.lower().endswith((".jsonl", ".ndjson")):
+            with open(self.path, "r", encoding="utf-8-sig") as fid:
+                for line in fid:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            raise RMException("Reqs: foreach source '%s' is not a csv/jsonl/folder" % self.name)
+
+    def __iter__(self) -> T.Iterator[dict]:
+        try:
+            for row in itertools.islice(self._rows(), *self.slice):
+                if type(row) is not dict:
+                    raise RMException("Reqs: foreach source '%s' has a row which is not a dict" % self.name)
+                yield row
+        except (json.decoder.JSONDecodeError, csv.Error, UnicodeDecodeError) as e:
+            raise RMException("Reqs: foreach source '%s' is malformed (%s)" % (self.name, e))
+
+    def __repr__(self):
+        return "<Rows %s>" % self.name
+
 
 class RmDict(dict):
     def __init__(self, **kargs):
@@ -311,16 +634,18 @@ class RmDict(dict):
 
 
 class HeadersMixedCase(dict):
-    def __init__(self, **kargs):
-        dict.__init__(self, **kargs)
+    def __init__(self, **kargs):  # (keys are interned : shared by all the exchanges)
+        dict.__init__(self, {sys.intern(str(k)): v for k, v in kargs.items()})
 
     def __getitem__(self, key):
-        d = {k.lower(): v for k, v in self.items()}
-        return d.get(key.lower(), None)
+        return self.get(key, None)
 
     def get(self, key, default=None):
-        d = {k.lower(): v for k, v in self.items()}
-        return d.get(key.lower(), default)
+        key, found = key.lower(), default
+        for k, v in self.items():
+            if k.lower() == key:
+                found = v  # (the last one wins)
+        return found
 
 
 """
@@ -359,50 +684,584 @@ async def request(method,url,body:bytes,headers, timeout=None):
 textchars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F})
 isBytes = lambda bytes: bool(bytes.translate(None, textchars))
 
+try:  # brotli is optionnal, to accept the "br" responses (decoded by the transports)
+    import brotli
+
+    ACCEPTENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPTENCODING = "gzip, deflate"
+
+try:  # fcntl is optionnal (posix), to lock the index of the http cache (see HttpCache.save())
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SNIFF = 4096  # nb of bytes to sniff, to know if a body is binary
+JSONMIME = re.compile(r"^application/(?:[\w.+-]+?\+)?json")
+TEXTMIME = re.compile(r"^(text/|application/(?:[\w.+-]+?\+)?(json|xml|javascript)|.*\+xml$)")
+
+
+def decodeContent(content: bytes, contentType: str = None) -> bytes:
+    """ return the body of a response in utf8 (if text) or as is (if binary). Text vs
+        binary is decided from the Content-Type/charset (and the first bytes) """
+    mime, *params = [i.strip() for i in (contentType or "").split(";")]
+    mime = mime.lower()
+    charset = None
+    for param in params:
+        k, _, v = param.partition("=")
+        if k.strip().lower() == "charset":
+            charset = v.strip().strip('"') or None
+
+    if JSONMIME.match(mime):
+        try:
+            return jdumps(json.loads(str(content, charset or "utf-8"))).encode(
+                "utf-8"
+            )  # ensure json chars are not escaped, and are in utf8
+        except (ValueError, LookupError):
+            pass
+
+    if charset:
+        try:
+            if codecs.lookup(charset).name not in ["utf-8", "ascii"]:
+                # a text to transcode (sniffed, when it's not a text mime)
+                if TEXTMIME.match(mime) or not isBytes(content[:SNIFF]):
+                    return str(content, charset, "replace").encode("utf-8")
+        except LookupError:
+            pass
+    return content  # binary, or text already in utf8 (no copy)
+
+
+OFFLOAD = 512 * 1024  # size (bytes) of a body from which its cpu-bound steps are offloaded
+EXECUTORS = {}  # "thread" -> the executor of the offloaded steps (created when needed)
+
+
+def _executor() -> concurrent.futures.Executor:
+    if "thread" not in EXECUTORS:
+        EXECUTORS["thread"] = concurrent.futures.ThreadPoolExecutor(4, "reqman")
+        atexit.register(EXECUTORS["thread"].shutdown)
+    return EXECUTORS["thread"]
+
+
+def _timed(fn: T.Callable, *args) -> tuple:
+    t = time.time()
+    return fn(*args), t, time.time()
+
+
+async def offload(size: int, fn: T.Callable, *args) -> tuple:
+    """ -> (fn(*args), wait, time) : a cpu-bound step (pure : no user's code), executed in
+        a thread when 'size' is over OFFLOAD, so the loop keeps the other requests flowing.
+        'wait' is the time (ms) waited for the executor, 'time' the time (ms) of the step """
+    t0 = time.time()
+    if size >= OFFLOAD:
+        r, t1, t2 = await asyncio.get_event_loop().run_in_executor(
+            _executor(), _timed, fn, *args
+        )
+        return r, (t1 - t0) * 1000, (t2 - t1) * 1000
+    return fn(*args), 0, (time.time() - t0) * 1000
+
+
+SESSION = None  # a pooled aiohttp session (keep-alive), when opened (see openSession())
+
+
+async def openSession() -> None:
+    """ keep an aiohttp session (and its tcp connections) alive between requests """
+    global SESSION
+    if SESSION is None:
+        # cookies are managed by reqman (CookieStore), not by the session
+        SESSION = aiohttp.ClientSession(
+            trust_env=True, cookie_jar=aiohttp.DummyCookieJar()
+        )
+
+
+async def closeSession() -> None:
+    global SESSION
+    if SESSION is not None:
+        await SESSION.close()
+        SESSION = None
+    await closeH2()
+
+
+async def _request(session, method, url, body: bytes, headers, timeout=None, proxy=None):
+    if not HeadersMixedCase(**headers).get("Accept-Encoding"):
+        headers = dict(headers, **{"Accept-Encoding": ACCEPTENCODING})
+    r = await session.request(
+        method,
+        url,
+        data=body,
+        headers=headers,
+        ssl=False,
+        timeout=timeout,
+        allow_redirects=False,
+        proxy=proxy
+    )
+    content = await r.read()  # (decoded by asyncExecute)
+
+    info = "HTTP/%s.%s %s %s" % (
+        r.version.major,
+        r.version.minor,
+        int(r.status),
+        r.reason,
+    )
+    outHeaders = dict(r.headers)
+    if "Set-Cookie" in r.headers:
+        outHeaders["Set-Cookie"] = list(r.headers.getall("Set-Cookie"))
+    return r.status, outHeaders, Content(content), info
+
 
 async def request(method, url, body: bytes, headers, timeout=None,proxy=None):
     try:
-        async with aiohttp.ClientSession(trust_env=True) as session:
-
-            r = await session.request(
-                method,
-                url,
-                data=body,
-                headers=headers,
-                ssl=False,
-                timeout=timeout,
-                allow_redirects=False,
-                proxy=proxy
-            )
-            try:
-                obj = await r.json()
-                content = jdumps(obj).encode(
-                    "utf-8"
-                )  # ensure json chars are not escaped, and are in utf8
-            except:
-                content = await r.read()
-                if not isBytes(content):
-                    txt = await r.text()
-                    content = txt.encode("utf-8")  # force bytes to be in utf8
-
-            info = "HTTP/%s.%s %s %s" % (
-                r.version.major,
-                r.version.minor,
-                int(r.status),
-                r.reason,
+        if SESSION is None:
+            async with aiohttp.ClientSession(trust_env=True) as session:
+                return await _request(
+                    session, method, url, body, headers, timeout=timeout, proxy=proxy
+                )
+        else:
+            return await _request(
+                SESSION, method, url, body, headers, timeout=timeout, proxy=proxy
             )
-            outHeaders = dict(r.headers)
-            if "Set-Cookie" in r.headers:
-                outHeaders["Set-Cookie"] = list(r.headers.getall("Set-Cookie"))
-            return r.status, outHeaders, Content(content), info
-    except aiohttp.client_exceptions.ClientConnectorError as e:
+    except (
+        aiohttp.client_exceptions.ClientConnectorError,
+        aiohttp.client_exceptions.ServerDisconnectedError,
+    ) as e:
         return None, {}, "Unreachable", ""
     except concurrent.futures._base.TimeoutError as e:
         return None, {}, "Timeout", ""
     except aiohttp.client_exceptions.InvalidURL as e:
         return None, {}, "Invalid", ""
     except ssl.SSLError:
-        pass
+        return None, {}, "SSL Error", ""
+
+
+H2CLIENTS = {}  # (loop, proxy) -> httpx.AsyncClient, multiplexing the requests on a connection per origin
+
+
+async def closeH2() -> None:
+    """ close the http2 clients of the current loop """
+    loop = id(asyncio.get_event_loop())
+    for k in [k for k in H2CLIENTS if k[0] == loop]:
+        await H2CLIENTS.pop(k).aclose()
+
+
+async def request2(method, url, body: bytes, headers, timeout=None, proxy=None):
+    """ same as request(), but thru httpx (http2 when the server negotiates it) """
+    key = (id(asyncio.get_event_loop()), proxy)
+    client = H2CLIENTS.get(key)
+    if client is None:
+        try:
+            client = H2CLIENTS[key] = httpx.AsyncClient(
+                http2=True, verify=False, trust_env=True, **({"proxy": proxy} if proxy else {})
+            )
+        except ImportError:  # httpx, without h2
+            raise RMException("'http2' needs the h2 module (pip install httpx[http2])")
+    if not HeadersMixedCase(**headers).get("Accept-Encoding"):
+        headers = dict(headers, **{"Accept-Encoding": ACCEPTENCODING})
+    try:
+        r = await client.request(
+            method,
+            url,
+            content=body,
+            headers=headers,
+            timeout=timeout or 300.0,  # same default as aiohttp
+        )
+    except httpx.TimeoutException:
+        return None, {}, "Timeout", ""
+    except (httpx.NetworkError, httpx.RemoteProtocolError):  # (connect/read/write)
+        return None, {}, "Unreachable", ""
+    except (httpx.InvalidURL, httpx.UnsupportedProtocol):
+        return None, {}, "Invalid", ""
+    except ssl.SSLError:
+        return None, {}, "SSL Error", ""
+
+    content = r.content  # (decoded by asyncExecute)
+
+    info = "%s %s %s" % (r.http_version, int(r.status_code), r.reason_phrase)
+    outHeaders = dict(r.headers)
+    if "set-cookie" in r.headers:
+        outHeaders["Set-Cookie"] = r.headers.get_list("set-cookie")
+    return r.status_code, outHeaders, Content(content), info
+
+
+class RetryPolicy:
+    """ Retry the transient errors (unreachable, timeout, and some statuses) of the
+        idempotent methods (by default), with an exponential backoff (and jitter)
+        between attempts, or the Retry-After of the response (capped by 'max') """
+
+    IDEMPOTENTS = ["GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"]
+
+    def __init__(
+        self, attempts=3, backoff=0.5, maxBackoff=10, statuses=(502, 503, 504), methods=None
+    ):
+        self.attempts = max(1, int(attempts))
+        self.backoff = float(backoff)  # seconds, before the 2nd attempt
+        self.maxBackoff = float(maxBackoff)
+        self.statuses = [int(i) for i in statuses]
+        self.methods = [str(i).upper() for i in methods or RetryPolicy.IDEMPOTENTS]
+
+    @classmethod
+    def get(cls, conf) -> T.Union["RetryPolicy", None]:
+        """ from a 'retry' var/action : nb of attempts, or {attempts, backoff, max, statuses, methods} """
+        if not conf:
+            return None
+        try:
+            if type(conf) is dict:
+                return RetryPolicy(
+                    conf.get("attempts", 3),
+                    conf.get("backoff", 0.5),
+                    conf.get("max", 10),
+                    toList(conf.get("statuses", [502, 503, 504])),
+                    toList(conf["methods"]) if "methods" in conf else None,
+                )
+            elif conf is True:
+                return RetryPolicy()
+            else:
+                return RetryPolicy(conf)
+        except (ValueError, TypeError):
+            raise RMFormatException("retry is malformed")
+
+    def delay(self, attempt: int, retryAfter=None) -> float:
+        """ seconds to wait before the attempt 'attempt' (1 is the first retry) """
+        after = RateLimiter.seconds(retryAfter)
+        if after is not None:
+            return min(self.maxBackoff, after)
+        d = min(self.maxBackoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(d / 2, d)
+
+    def isRetryable(self, method: str, status, content) -> bool:
+        if method.upper() not in self.methods:
+            return False  # (a non idempotent one may have been applied)
+        if status is None:
+            return content in ["Unreachable", "Timeout"]
+        return status in self.statuses
+
+
+class HttpCache:
+    """ An on-disk cache (LRU, size-bounded) of the GET/HEAD responses which have
+        validators (ETag/Last-Modified), to send conditional requests
+        (If-None-Match/If-Modified-Since) ; a 304 is filled from the cache """
+
+    INDEX = "index.json"
+    _instances = {}  # folder -> HttpCache
+
+    def __init__(self, folder: str, maxSize: int):
+        self.folder = folder
+        self.maxSize = maxSize  # in bytes
+        self.varies = {}  # url -> header names (of the "Vary" response header)
+        self.entries = {}  # key -> dict(url,status,headers,info,size,atime)
+        self.removed = set()  # evicted keys (since the last save)
+        self.dirty = False
+        os.makedirs(folder, exist_ok=True)
+        try:
+            with open(os.path.join(folder, HttpCache.INDEX), "r") as fid:
+                index = json.load(fid)
+            self.varies, self.entries = index["varies"], index["entries"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    @classmethod
+    def get(cls, conf, path=None) -> "HttpCache":
+        """ from a 'cache' var of the conf : "folder" or {path: folder, size: Mb} """
+        if type(conf) is dict:
+            folder, size = conf.get("path", ".reqman_cache"), conf.get("size", 50)
+        else:
+            folder, size = str(conf), 50
+        if path and not os.path.isabs(folder):
+            folder = os.path.join(path, folder)
+        folder = os.path.abspath(folder)
+        if folder not in cls._instances:
+            cls._instances[folder] = HttpCache(folder, int(float(size) * 1024 * 1024))
+        return cls._instances[folder]
+
+    @staticmethod
+    def isCacheable(method: str, headers: dict) -> bool:
+        h = HeadersMixedCase(**headers)
+        return (
+            method in ["GET", "HEAD"]
+            and not h.get("If-None-Match")
+            and not h.get("If-Modified-Since")
+            and "no-store" not in (h.get("Cache-Control") or "")
+        )
+
+    def _key(self, method, url, headers: dict) -> str:
+        h = HeadersMixedCase(**headers)
+        vary = ["%s:%s" % (k.lower(), h.get(k)) for k in self.varies.get(url, [])]
+        return hashlib.md5("\n".join([method, url] + vary).encode()).hexdigest()
+
+    @classmethod
+    def close(cls):
+        """ save the indexes of all the caches (at the end of a run) """
+        for cache in cls._instances.values():
+            cache.save()
+
+    def save(self):
+        """ merge the index with the one on disk (others processes may have saved theirs,
+            see --workers), and replace it atomically, under a lock file """
+        if not self.dirty:
+            return
+        index = os.path.join(self.folder, HttpCache.INDEX)
+        with open(index + ".lock", "a+") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(index, "r") as fid:
+                    disk = json.load(fid)
+                for key, e in disk["entries"].items():
+                    if key in self.removed:
+                        continue
+                    if key not in self.entries or e["atime"] > self.entries[key]["atime"]:
+                        self.entries[key] = e
+                self.varies = dict(disk["varies"], **self.varies)
+            except (OSError, ValueError, KeyError):
+                pass
+            self._evict()
+            fd, tmp = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+            with os.fdopen(fd, "w") as fid:
+                json.dump(dict(varies=self.varies, entries=self.entries), fid)
+            os.replace(tmp, index)
+        self.removed.clear()
+        self.dirty = False
+
+    def validators(self, method, url, headers: dict) -> dict:
+        """ return the conditional headers to send (empty if not in cache) """
+        e = self.entries.get(self._key(method, url, headers))
+        h = {}
+        if e:
+            oh = HeadersMixedCase(**e["headers"])
+            if oh.get("ETag"):
+                h["If-None-Match"] = oh.get("ETag")
+            if oh.get("Last-Modified"):
+                h["If-Modified-Since"] = oh.get("Last-Modified")
+        return h
+
+    def load(self, method, url, headers: dict) -> T.Union[tuple, None]:
+        """ return the cached (status, outHeaders, content, info) """
+        key = self._key(method, url, headers)
+        e = self.entries.get(key)
+        if e:
+            try:
+                with open(os.path.join(self.folder, key), "rb") as fid:
+                    content = fid.read()
+            except OSError:
+                return None
+            e["atime"] = datetime.datetime.now().timestamp()
+            self.dirty = True
+            return e["status"], dict(e["headers"]), Content(content), e["info"]
+
+    def store(self, method, url, headers: dict, status, outHeaders: dict, content, info):
+        oh = HeadersMixedCase(**outHeaders)
+        if status != 200 or type(content) is not Content:
+            return
+        if not (oh.get("ETag") or oh.get("Last-Modified")):
+            return
+        if "no-store" in (oh.get("Cache-Control") or ""):
+            return
+        vary = [i.strip() for i in (oh.get("Vary") or "").split(",") if i.strip()]
+        if vary:
+            self.varies[url] = vary
+        else:
+            self.varies.pop(url, None)
+        key = self._key(method, url, headers)
+        b = bytes(content)
+        with open(os.path.join(self.folder, key), "wb+") as fid:
+            fid.write(b)
+        self.entries[key] = dict(
+            url=url,
+            status=status,
+            headers={k: v for k, v in outHeaders.items() if type(v) is str},
+            info=info,
+            size=len(b),
+            atime=datetime.datetime.now().timestamp(),
+        )
+        self.removed.discard(key)
+        self.dirty = True
+        self._evict()
+
+    def _evict(self):
+        """ remove the least recently used entries, while the cache is too big """
+        total = sum([e["size"] for e in self.entries.values()])
+        for key in sorted(self.entries, key=lambda k: self.entries[k]["atime"]):
+            if total <= self.maxSize:
+                break
+            total -= self.entries.pop(key)["size"]
+            self.removed.add(key)
+            try:
+                os.unlink(os.path.join(self.folder, key))
+            except OSError:
+                pass
+
+
+atexit.register(HttpCache.close)  # (the runs outside a Reqman, ie: testContent())
+
+
+class Timings:
+    """ A small local db (json) of the durations (ms) of the files, and of their
+        requests, in the previous runs : to schedule the longest files first (LPT)
+        in parallel mode (and the previously failing ones, if 'failedFirst') """
+
+    def __init__(self, filename: str, failedFirst: bool = False):
+        self.filename = filename
+        self.failedFirst = failedFirst
+        self.folder = os.path.dirname(filename)
+        try:
+            with open(filename, "r") as fid:
+                self.files = json.load(fid)["files"]
+        except (OSError, ValueError, KeyError):
+            self.files = {}  # name -> dict(time, ko, reqs={uid: time})
+
+    @classmethod
+    def get(cls, conf, path=None) -> "Timings":
+        """ from a 'timings' var of the conf : true, "file", or {path: file, failedfirst: bool} """
+        if type(conf) is dict:
+            filename, failedFirst = conf.get("path"), bool(conf.get("failedfirst"))
+        else:
+            filename, failedFirst = (None if conf is True else str(conf)), False
+        filename = filename or ".reqman_timings.json"
+        if path and not os.path.isabs(filename):
+            filename = os.path.join(path, filename)
+        return Timings(os.path.abspath(filename), failedFirst)
+
+    def _key(self, name: str) -> str:
+        return os.path.relpath(os.path.abspath(name), self.folder).replace("\\", "/")
+
+    def estimate(self, name: str, reqs: "Reqs" = None) -> float:
+        """ the expected duration of a file (or of its known requests) """
+        f = self.files.get(self._key(name))
+        if f:
+            return f["time"]
+        if reqs is not None:
+            known = {}
+            for i in self.files.values():
+                known.update(i.get("reqs", {}))
+
+            def walk(items, nb=1):
+                t = 0
+                for i in items:
+                    if isinstance(i, Req):
+                        t += known.get(i.uid(), 0) * nb
+                    elif isinstance(i, ReqGroup):
+                        foreach = i.foreach if type(i.foreach) is list else [{}]
+                        t += walk(i.reqs, nb * max(1, len(foreach)))
+                return t
+
+            t = walk(reqs)
+            if t:
+                return t
+        times = [i["time"] for i in self.files.values()]
+        return sum(times) / len(times) if times else 0  # unknown: the average
+
+    def schedule(self, items: list, name: T.Callable, reqs: T.Callable = None) -> list:
+        """ 'items' in the execution order : the longest first (and the KO ones first) """
+
+        def key(i):
+            n = name(i)
+            ko = self.failedFirst and self.files.get(self._key(n), {}).get("ko", False)
+            return (not ko, -self.estimate(n, reqs(i) if reqs else None))
+
+        return sorted(items, key=key)
+
+    def update(self, results: T.List["Reqs"]) -> None:
+        """ save the durations of a run (moving average with the previous ones) """
+        for reqs in results:
+            exs = reqs.exchanges or []
+            if reqs.name.startswith("<") or any(getattr(x, "skipped", False) for x in exs):
+                continue  # not a file, or partial
+            k = self._key(reqs.name)
+            time = sum(x.time for x in exs)
+            old = self.files.get(k)
+            self.files[k] = dict(
+                time=(old["time"] + time) / 2 if old else time,
+                ko=not all(all(x.tests) for x in exs),
+                reqs={x.id: x.time for x in exs if x.id},
+            )
+        try:
+            with open(self.filename, "w+") as fid:
+                json.dump(dict(version=1, files=self.files), fid)
+        except OSError:
+            pass
+
+
+class RateLimiter:
+    """ A token bucket (rate: requests/s, burst) and a max of concurrent requests,
+        for a host. It adapts itself : the rate is halved on a 429 (and the
+        host is paused for its Retry-After), and recovers on successes """
+
+    _instances = {}  # (loop, host, conf) -> RateLimiter
+
+    def __init__(self, rate=None, burst=1, concurrent=None):
+        self.maxRate = self.rate = rate and float(rate) or None
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.last = time.monotonic()
+        self.pausedUntil = 0
+        self.sem = asyncio.Semaphore(int(concurrent)) if concurrent else None
+
+    @classmethod
+    def get(cls, conf: dict, url: str) -> T.Union["RateLimiter", None]:
+        """ from a 'ratelimit' var of the conf : {host: {rate, burst, concurrent}, "*": {...}} """
+        if type(conf) is not dict:
+            return None
+        host = urllib.parse.urlparse(url).hostname or ""
+        c = conf.get(host, conf.get("*"))
+        if type(c) is not dict:
+            return None
+        key = (id(asyncio.get_event_loop()), host, jdumps(c, sort_keys=True))
+        if key not in cls._instances:
+            try:
+                cls._instances[key] = RateLimiter(c.get("rate"), c.get("burst", 1), c.get("concurrent"))
+            except (ValueError, TypeError):
+                raise RMFormatException("ratelimit of '%s' is malformed" % host)
+        return cls._instances[key]
+
+    async def acquire(self) -> float:
+        """ wait for a slot, and return the waited time (ms) """
+        t = time.monotonic()
+        if self.sem:
+            await self.sem.acquire()
+        try:
+            while True:
+                now = time.monotonic()
+                if now < self.pausedUntil:
+                    await asyncio.sleep(self.pausedUntil - now)
+                    continue
+                if self.rate:
+                    self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                    self.last = now
+                    if self.tokens < 1:
+                        await asyncio.sleep((1 - self.tokens) / self.rate)
+                        continue
+                    self.tokens -= 1
+                return (time.monotonic() - t) * 1000
+        except BaseException:  # (cancelled while waiting : give the slot back)
+            if self.sem:
+                self.sem.release()
+            raise
+
+    def release(self, status, outHeaders: dict):
+        if self.sem:
+            self.sem.release()
+        retryAfter = HeadersMixedCase(**outHeaders).get("Retry-After")
+        if status == 429 or (status == 503 and retryAfter):
+            pause = RateLimiter.seconds(retryAfter)
+            if pause is None:
+                pause = 1 / self.rate if self.rate else 1
+            self.pausedUntil = max(self.pausedUntil, time.monotonic() + pause)
+            if self.rate:
+                self.rate = max(self.rate / 2, self.maxRate / 16)
+        elif status and self.rate and self.rate < self.maxRate:
+            self.rate = min(self.maxRate, self.rate + self.maxRate / 10)
+
+    @staticmethod
+    def seconds(retryAfter) -> T.Union[float, None]:
+        """ Retry-After (seconds or http-date) as seconds """
+        if not retryAfter:
+            return None
+        try:
+            return max(0, float(retryAfter))
+        except ValueError:
+            try:
+                d = email.utils.parsedate_to_datetime(retryAfter)
+                return max(0, (d - datetime.datetime.now(d.tzinfo)).total_seconds())
+            except (TypeError, ValueError):
+                return None
 
 
 class FString(str):
@@ -553,6 +1412,12 @@ class Xml:
 
 
 class Exchange:
+    __slots__ = (
+        "id", "doc", "scope", "tests", "nolimit", "cached", "wait", "attempts",
+        "skipped", "cpu", "method", "path", "url", "body", "inHeaders", "status",
+        "outHeaders", "content", "info", "time", "_spilled",
+    )
+
     def __init__(
         self,
         method,
@@ -571,12 +1436,19 @@ class Exchange:
         self.scope = None
         self.tests = []
         self.nolimit = False
-
-        self.method = method
+        self.cached = False  # True if the content comes from the HttpCache (304)
+        self.wait = 0  # time (ms) waited for the RateLimiter (not in 'time')
+        self.attempts = []  # (status or error, time) of each attempt (see RetryPolicy)
+        self.skipped = False  # True if not executed (see FailFast)
+        self.cpu = {}  # step -> (wait, time) (ms) of its cpu-bound steps (see offload())
+        self._spilled = None  # (retention, offset, length) when its heavy parts are spilled
+
+        self.method = sys.intern(method)
         self.path = path
         self.url = url
+        if isinstance(body, BodyStream):
+            body = str(body)  # only its size & hash (never its content)
         self.body = body
-        self.bodyContent = Content(body)
         self.inHeaders = HeadersMixedCase(**inHeaders)
         self.status = status
         self.outHeaders = HeadersMixedCase(**outHeaders)
@@ -587,6 +1459,30 @@ class Exchange:
     def __eq__(self, o):
         return o and self.id == o.id
 
+    @property
+    def bodyContent(self) -> Content:  # (a view, made when needed)
+        return Content(self.body)
+
+    def __getattr__(self, name):  # the heavy parts of a spilled exchange (see Retention)
+        spilled = None if name == "_spilled" else self._spilled
+        if spilled and name in Retention.HEAVY:
+            return spilled[0].load(*spilled[1:])[name]
+        raise AttributeError(name)
+
+    def __getstate__(self):  # (a spilled exchange is loaded back, when pickled)
+        state = {k: getattr(self, k) for k in Exchange.__slots__[:-1] if hasattr(self, k)}
+        if self._spilled:
+            state.update(self._spilled[0].load(*self._spilled[1:]))
+        return state
+
+    def __setstate__(self, state):  # (from a dict : the old rmr's too)
+        self.cpu, self.attempts, self.tests = {}, [], []
+        self.cached = self.skipped = self.nolimit = False
+        self.wait, self._spilled = 0, None
+        for k, v in state.items():
+            if k in Exchange.__slots__ and k != "_spilled":
+                setattr(self, k, v)
+
     def __repr__(self):
         return "<Exchange: %s %s -> %s tests:%s>" % (
             self.method,
@@ -596,6 +1492,88 @@ class Exchange:
         )
 
 
+class Retention:
+    """ Bound the memory of the exchanges of a long run : the heavy parts of an
+        exchange (bodies, headers, scope) are spilled to an on-disk store when it
+        completes (when over 'size' Mb, or for the OK ones in "ko" mode), and
+        are loaded back lazily (for the html render, or the rmr) """
+
+    HEAVY = ["body", "inHeaders", "outHeaders", "content", "scope"]
+    _instances = {}  # (size, ko, folder) -> Retention (of the current run)
+
+    def __init__(self, size: int = None, ko: bool = False, folder: str = None):
+        self.size = size  # in bytes (None: no limit)
+        self.ko = ko  # keep only the KO's ones in memory
+        self.used = 0  # bytes of the exchanges kept in memory
+        self.folder = folder
+        self.fid = None  # the store, created at the first spill
+        self.last = (None, None)  # the last loaded (offset, state)
+
+    @classmethod
+    def get(cls, conf, path=None) -> "Retention":
+        """ from a 'retention' var of the conf : "ko", a size (Mb), or {size, ko, path} """
+        try:
+            if type(conf) is dict:
+                size, ko, folder = conf.get("size"), conf.get("ko", False), conf.get("path")
+            elif str(conf).lower() == "ko":
+                size, ko, folder = None, True, None
+            else:
+                size, ko, folder = conf, False, None
+            size = None if size is None else int(float(size) * 1024 * 1024)
+        except (ValueError, TypeError):
+            raise RMFormatException("retention is malformed")
+        if folder and path and not os.path.isabs(folder):
+            folder = os.path.join(path, folder)
+        key = (size, bool(ko), folder)
+        if key not in cls._instances:
+            cls._instances[key] = Retention(*key)
+        return cls._instances[key]
+
+    @classmethod
+    def reset(cls) -> None:
+        """ a new run : new instances, with their own budget (the exchanges of the
+            previous runs keep their stores) """
+        cls._instances.clear()
+
+    @staticmethod
+    def weight(ex: Exchange) -> int:
+        weight = 0
+        for i in [ex.bodyContent, ex.content]:
+            weight += len(bytes(i)) if type(i) is Content else len(str(i))
+        for h in [ex.inHeaders, ex.outHeaders]:
+            weight += sum(len(str(k)) + len(str(v)) for k, v in h.items())
+        return weight
+
+    def keep(self, ex: Exchange) -> None:
+        """ keep 'ex' in memory, or spill its heavy parts to the store """
+        weight = Retention.weight(ex)
+        if (self.ko and all(ex.tests)) or (
+            self.size is not None and self.used + weight > self.size
+        ):
+            self.spill(ex)
+        else:
+            self.used += weight
+
+    def spill(self, ex: Exchange) -> None:
+        if self.fid is None:
+            if self.folder:
+                os.makedirs(self.folder, exist_ok=True)
+            self.fid = tempfile.TemporaryFile(prefix="reqman_", dir=self.folder)
+        state = {k: getattr(ex, k) for k in Retention.HEAVY if hasattr(ex, k)}
+        for k in state:
+            delattr(ex, k)
+        blob = zlib.compress(pickle.dumps(state))
+        self.fid.seek(0, 2)
+        ex._spilled = (self, self.fid.tell(), len(blob))
+        self.fid.write(blob)
+
+    def load(self, offset: int, length: int) -> dict:
+        if self.last[0] != offset:
+            self.fid.seek(offset)
+            self.last = (offset, pickle.loads(zlib.decompress(self.fid.read(length))))
+        return self.last[1]
+
+
 class Env(dict):
     path=None
 
@@ -619,6 +1597,7 @@ class Env(dict):
         self.__global = (
             {}
         )  # shared global saved scope between all cloned Env (from BEGIN only)
+        self.__cookies = []  # shared exported cookies between all cloned Env (from BEGIN only)
 
         dict.__init__(self, dict(d))
         self.cookiejar = CookieStore()
@@ -648,6 +1627,18 @@ class Env(dict):
     def globals(self):
         return self.__global
 
+    @property
+    def shared(self):
+        return self.__shared
+
+    @property
+    def beginCookies(self) -> T.List[dict]:
+        return self.__cookies
+
+    def saveCookies(self, cookiejar: CookieStore) -> None:
+        """ keep the cookies of BEGIN, for all the Reqs (as its saved vars) """
+        self.__cookies[:] = cookiejar.export()
+
     def clone(self, cloneSharedScope=True):
         newOne = Env({})
         dict_merge(newOne, self)
@@ -657,6 +1648,7 @@ class Env(dict):
             newOne, self.__global
         )  # declare those of the global scope !!! (from BEGIN only)
         newOne.__global = self.__global  # mk a ref to global
+        newOne.__cookies = self.__cookies
 
         if (
             cloneSharedScope
@@ -702,7 +1694,7 @@ class Env(dict):
     def replaceObj(
         self, v: T.Any
     ) -> T.Any:  # same as txtReplace() but for "object" (json'able)
-        if type(v) is bytes:
+        if type(v) is bytes or isinstance(v, BodyStream):
             return v
         elif type(v) is Content:  # (when save to var)
             return bytes(v)
@@ -710,7 +1702,7 @@ class Env(dict):
             v = jdumps(v)
 
         obj = self.replaceTxt(v)
-        if type(obj) is bytes:
+        if type(obj) is bytes or isinstance(obj, BodyStream):
             return obj
         else:
             try:
@@ -731,11 +1723,20 @@ class Env(dict):
         else:
             return []
 
-    def replaceTxt(self, txt: str) -> T.Union[str, bytes]:
+    def replaceTxt(self, txt: str) -> T.Union[str, bytes, BodyStream]:
         assert type(txt) is str
 
-        def _replace(txt: str) -> T.Union[str, bytes]:
+        def _replace(txt: str) -> T.Union[str, bytes, BodyStream]:
             def getVar(var: str):
+                if var.startswith("file:"):  # a streamed file (for a body)
+                    name = var[5:].strip()
+                    fn = name
+                    if self.path and not os.path.isabs(fn):
+                        fn = os.path.join(self.path, fn)
+                    if not os.path.isfile(fn):
+                        raise RMNonResolvedVars("File '%s' not found" % name)
+                    return BodyStream(fn, name)
+
                 methods = re.findall(r"\|[\d\w\|]+$", var)
                 if methods:
                     p = var.index(methods[0])
@@ -799,8 +1800,10 @@ class Env(dict):
                             val = "true"
                         elif val is False:
                             val = "false"
-                        elif type(val) == bytes:
+                        elif type(val) == bytes or isinstance(val, BodyStream):
                             return val  # keep BYTES !!!!!!!!!!!!!!
+                        elif isinstance(val, collections.abc.Iterator):
+                            return BodyStream(val, var)  # streamed
                         else:  # int, float, list, dict...
                             try:
                                 val = jdumps(val)
@@ -821,10 +1824,19 @@ class Env(dict):
                 return txt
             else:
                 txt = _txt
-        return txt  # bytes
+        return txt  # bytes or BodyStream
 
     def transform(
         self, content: T.Union[str, None], methodName: str
+    ) -> T.Union[str, None]:
+        t = PROFILER.start()
+        try:
+            return self._transform(content, methodName)
+        finally:
+            PROFILER.stop(t, "resolver", methodName)
+
+    def _transform(
+        self, content: T.Union[str, None], methodName: str
     ) -> T.Union[str, None]:
         def prepareContent(content):
             if content is None:
@@ -879,14 +1891,369 @@ class Env(dict):
         self.__dict__ = state
         self.__shared = {}
         self.__global = {}
+        self.__cookies = []
         self.cookiejar = CookieStore()
 
 
+class FailFast:
+    """ Stop a run (--failfast) after 'tests' failed tests, or 'errors' unreachable/timeout
+        exchanges : the pending requests are skipped, and the in-flight ones cancelled """
+
+    def __init__(self, tests: int = 1, errors: int = None):
+        self.tests = tests
+        self.errors = errors or tests
+        self.nbTests = 0
+        self.nbErrors = 0
+        self.tripped = False
+        self.tasks = set()  # the running tasks (to cancel)
+
+    def check(self, ex: Exchange) -> None:
+        if ex.status is None and str(ex.content) in ["Unreachable", "Timeout"]:
+            self.nbErrors += 1
+        self.nbTests += len([t for t in ex.tests if not t])
+        if not self.tripped and (
+            self.nbTests >= self.tests or self.nbErrors >= self.errors
+        ):
+            self.tripped = True
+            current = asyncio.current_task()
+            for task in self.tasks:
+                if task is not current:
+                    task.cancel()
+
+
+class Sampling:
+    """ Select a deterministic subset of the rows of the foreach's (--sample, --shard) :
+        a rate ("10%") or a number of rows (per distinct value of a 'by' key, if any),
+        chosen by a seeded hash of the rows ; and/or the rows of a shard (i/n) """
+
+    def __init__(self, size=None, seed: int = 0, shard: tuple = None):
+        self.size = size  # a rate (float), a number of rows (int), or None (all)
+        self.seed = seed
+        self.shard = shard  # (i, n), 1-based, or None
+        self.counts = {}  # group's name -> [selected, total, infos] (for the report)
+
+    @property
+    def sampled(self) -> list:
+        """ what was sampled : a line per group """
+        return [
+            "%s: %s/%s rows (%s)" % (name, selected, total, ", ".join(infos))
+            for name, (selected, total, infos) in self.counts.items()
+        ]
+
+    @staticmethod
+    def parseSize(v) -> T.Union[float, int]:
+        """ "10%" -> 0.1, "5" -> 5 (ValueError if malformed) """
+        if type(v) is str and v.strip().endswith("%"):
+            rate = float(v.strip()[:-1]) / 100
+            if not 0 < rate <= 1:
+                raise ValueError(v)
+            return rate
+        if type(v) is bool or int(v) < 1:
+            raise ValueError(v)
+        return int(v)
+
+    @staticmethod
+    def parseGroup(sample) -> dict:
+        """ the override of a group : a size, or a dict size/seed/by """
+        if type(sample) is not dict:
+            sample = dict(size=sample)
+        if not all(k in ["size", "seed", "by"] for k in sample):
+            raise ValueError(sample)
+        if sample.get("size") is not None:
+            Sampling.parseSize(sample["size"])
+        int(sample.get("seed", 0))
+        return sample
+
+    def score(self, row: dict, seed) -> float:
+        h = hashlib.md5(("%s:%s" % (seed, jdumps(row, sort_keys=True, default=str))).encode())
+        return int(h.hexdigest()[:8], 16) / 16 ** 8
+
+    def rows(
+        self, foreach: T.Iterable, sample: dict = None, name: str = "", outer: bool = True
+    ) -> T.Iterator[dict]:
+        """ the selected rows of a foreach (in their order), lazily when possible ; the
+            shard is applied on the outer foreach only (the nested ones run all its rows) """
+        size, seed, by = self.size, self.seed, None
+        if size is not None and sample is not None:  # the group's override
+            if sample.get("size") is not None:
+                size = Sampling.parseSize(sample["size"])
+            seed, by = int(sample.get("seed", seed)), sample.get("by")
+        shard = self.shard if outer else None
+        if size is None and shard is None:
+            yield from foreach
+            return
+
+        infos = []
+        if size is not None:
+            infos.append("%g%%" % (size * 100) if type(size) is float else str(size))
+            infos.append("seed %s" % seed)
+        if by:
+            infos.append("by %s" % by)
+        if shard:
+            infos.append("shard %s/%s" % shard)
+        count = self.counts.setdefault(name, [0, 0, infos])  # (once per group)
+
+        def inShard():
+            for idx, row in enumerate(foreach):
+                count[1] += 1
+                if shard is None or idx % shard[1] == shard[0] - 1:
+                    yield idx, row
+
+        if size is None or (type(size) is float and by is None):  # streamed
+            for idx, row in inShard():
+                if size is None or self.score(row, seed) < size:
+                    count[0] += 1
+                    yield row
+        else:
+            strata = {}  # by's value -> the kept (-score, idx, row)
+            best = {}  # by's value -> the one with the lowest score (for a rate)
+            for idx, row in inShard():
+                key = jdumps(row.get(by), sort_keys=True, default=str) if by else None
+                heap = strata.setdefault(key, [])
+                item = (-self.score(row, seed), idx, row)
+                if type(size) is int:  # the 'size' lowest scores
+                    heapq.heappush(heap, item)
+                    if len(heap) > size:
+                        heapq.heappop(heap)
+                else:  # a rate, but at least one per value
+                    if -item[0] < size:
+                        heap.append(item)
+                    if key not in best or item > best[key]:
+                        best[key] = item
+            kept = []
+            for key, heap in strata.items():
+                kept.extend(heap or [best[key]])
+            for _, idx, row in sorted(kept, key=lambda i: i[1]):
+                count[0] += 1
+                yield row
+
+
+class Slice:
+    """ The subset of the requests of a run to execute (the others are not executed) :
+        the failed ones of a previous ReqmanResult (--rerun-failed), or the producers of
+        a var (--x:var) ; with the prior requests they depend on, through their saved vars """
+
+    def __init__(self, uids: dict, whole=("BEGIN", "END"), old: dict = None):
+        self.uids = uids  # Reqs's name -> uids of the requests to execute
+        self.whole = whole  # names of the Reqs executed entirely
+        self.old = old or {}  # Reqs's name -> previous exchanges (to merge with)
+
+    @classmethod
+    def failed(cls, rr: "ReqmanResult") -> "Slice":
+        """ the requests with KO tests (or skipped) of rr (BEGIN & END are executed) """
+        scope = rr.env.clone()
+        for switch in rr.switches:
+            scope.mergeSwitch(switch)
+
+        failed = set()
+        for reqs in rr.results:
+            for ex in reqs.exchanges or []:
+                if getattr(ex, "skipped", False) or not all(ex.tests):
+                    failed.add((reqs.name, ex.id))
+
+        lreqs = [
+            i for i in rr.results if i.name not in ["BEGIN", "END"] and isinstance(i, Reqs)
+        ]
+        return cls(
+            Slice.select(scope, lreqs, failed=failed),
+            old={i.name: i.exchanges for i in rr.snapshot().results},
+        )
+
+    @classmethod
+    def needed(cls, reqman: "Reqman", switches: list, var: str) -> "Slice":
+        """ the requests of a Reqman which contribute to the var (BEGIN & END are executed
+            entirely : they may open/close a session, without saving a var) """
+        scope = reqman.env.clone()
+        for switch in switches:
+            scope.mergeSwitch(switch)
+
+        lreqs = [yml if isinstance(yml, Reqs) else Reqs(yml, scope) for yml in reqman.ymls]
+        return cls(Slice.select(scope, lreqs, needed=Slice.vars(scope, "<<%s>>" % var)))
+
+    @staticmethod
+    def select(scope: Env, lreqs: list, failed=(), needed=()) -> dict:
+        """ walk the requests of each file backward : keep the failed ones, and the ones
+            which save a needed var (the vars they use become needed too). A file only
+            sees its own saved vars, and the BEGIN's ones (walked last) """
+        uids = {}
+        needBegin = set(needed)
+        for reqs in sorted(lreqs, key=lambda i: i.name == "BEGIN"):
+            need = needBegin if reqs.name == "BEGIN" else set(needed)
+            for r, ctx in reversed(list(Slice._reqs(reqs))):
+                uid = r.uid()
+                saves = {k for s in r.saves for k in s}
+                if (reqs.name, uid) in failed or saves & need:
+                    uids.setdefault(reqs.name, set()).add(uid)
+                    need |= Slice.vars(
+                        scope,
+                        [r.path, r.headers, r.querys, r.body, r.form, r.params, r.tests]
+                        + [r.ifs, r.saves, ctx],
+                    )
+            if reqs.name != "BEGIN":
+                needBegin |= need
+        return uids
+
+    @staticmethod
+    def _reqs(items: list, ctx=()) -> T.Iterator[tuple]:
+        """ the Req templates (with the params/foreach of their groups) """
+        for i in items:
+            if isinstance(i, Req):
+                yield i, list(ctx)
+            elif isinstance(i, ReqGroup):
+                yield from Slice._reqs(i.reqs, ctx + (i.scope, i.foreach))
+
+    @staticmethod
+    def vars(scope: Env, obj) -> set:
+        """ the names of the vars used by obj (transitively, thru the vars of the scope) """
+        names, todo = set(), [json.dumps(obj, default=str)]
+        while todo:
+            for vvar in scope.getNonResolvedVars(todo.pop()):
+                for var in vvar[2:-2].split("|"):
+                    name = var.split(".")[0].strip()
+                    if name in names or name.startswith("file:"):
+                        continue
+                    names.add(name)
+                    value = dict.get(scope, name, None)
+                    if type(value) is str:
+                        todo.append(value)
+                    elif type(value) in [dict, list]:
+                        todo.append(json.dumps(value, default=str))
+        return names
+
+    def merge(self, reqs: "Reqs") -> None:
+        """ replace the previous exchanges of a Reqs by the re-executed ones """
+        news = {}
+        for ex in reqs.exchanges:
+            news.setdefault(ex.id, []).append(ex)
+        ll = []
+        for ex in self.old.get(reqs.name, []):
+            if ex.id in news:
+                ll.extend(news.pop(ex.id))  # (at the place of the first one)
+            elif ex.id not in self.uids[reqs.name]:
+                ll.append(ex)
+        for exs in news.values():
+            ll.extend(exs)
+        reqs.exchanges = ll
+
+
+class Partial:
+    """ The resolved fragments (path, headers, body's leaves ...) of a request template,
+        shared by the iterations of a foreach (partial evaluation) : a fragment is only
+        re-resolved when a var it depends on (transitively) has changed, so the
+        invariant fragments are resolved once per group """
+
+    class Fallback(Exception):
+        pass
+
+    def __init__(self):
+        self.memo = {}  # (kind, fragment) -> (deps, resolved)
+        self.plan = None  # the var's leaves of the body: [(path, leaf)] (or False)
+
+    @staticmethod
+    def deps(scope: Env, txt: str) -> T.Union[list, None]:
+        """ the (name, value) a fragment depends on, or None if it's dynamic """
+        ll, todo, seen = [], [txt], set()
+        while todo:
+            for vvar in scope.getNonResolvedVars(todo.pop()):
+                var = vvar[2:-2]
+                if "|" in var or var.startswith("file:"):
+                    return None
+                name = var.split(".")[0]
+                if name in seen:
+                    continue
+                seen.add(name)
+                value = dict.get(scope, name, NotFound)
+                if value is NotFound:
+                    if name in EXPOSEDS:
+                        return None
+                elif isPython(value):
+                    return None
+                elif type(value) is str:
+                    todo.append(value)
+                elif type(value) in [dict, list]:
+                    try:
+                        todo.append(jdumps(value))
+                    except TypeError:
+                        return None
+                ll.append((name, value))
+        return ll
+
+    def resolve(self, scope: Env, fragment: str, kind: str = "txt") -> T.Any:
+        """ scope.replaceTxt(fragment) (or replaceObj, or replaceObj([]) for a leaf) """
+        key = (kind, fragment)
+        memo = self.memo.get(key)
+        if memo is not None:
+            deps, value = memo
+            if all(
+                v is o or v == o
+                for v, o in ((dict.get(scope, n, NotFound), o) for n, o in deps)
+            ):
+                return value
+
+        if kind == "txt":
+            value = scope.replaceTxt(fragment)
+        elif kind == "obj":
+            value = scope.replaceObj(fragment)
+        else:
+            value = scope.replaceObj([fragment])
+        deps = Partial.deps(scope, fragment)
+        if deps is not None:
+            self.memo[key] = (deps, value)
+        return value
+
+    def resolveBody(self, scope: Env, body) -> T.Any:
+        """ scope.replaceObj(body), but leaf by leaf for a dict/list """
+        if type(body) is str:
+            return self.resolve(scope, body, "obj")
+        elif type(body) in [dict, list]:
+            if self.plan is None:
+                self.plan = Partial._plan(scope, body)
+            if self.plan is not False:
+                try:
+                    return self._resolveLeaves(scope, body)
+                except Partial.Fallback:
+                    pass
+        return scope.replaceObj(body)
+
+    @staticmethod
+    def _plan(scope: Env, obj, path=()) -> T.Union[list, bool]:
+        ll = []
+        if type(obj) in [dict, list]:
+            items = obj.items() if type(obj) is dict else enumerate(obj)
+            for k, v in items:
+                if type(k) is str and scope.getNonResolvedVars(k):
+                    return False  # a key with vars : not by leaves
+                sub = Partial._plan(scope, v, path + (k,))
+                if sub is False:
+                    return False
+                ll.extend(sub)
+        elif type(obj) is str and scope.getNonResolvedVars(obj):
+            ll.append((path, obj))
+        return ll
+
+    def _resolveLeaves(self, scope: Env, body) -> T.Any:
+        copied = {(): copy.copy(body)}  # copy the containers along the paths only
+        for path, leaf in self.plan:
+            value = self.resolve(scope, leaf, "leaf")
+            if type(value) is not list or len(value) != 1:
+                raise Partial.Fallback()  # bytes, stream, or broken json
+            node = copied[()]
+            for i in range(len(path) - 1):
+                sub = path[: i + 1]
+                if sub not in copied:
+                    copied[sub] = node[path[i]] = copy.copy(node[path[i]])
+                node = copied[sub]
+            node[path[-1]] = value[0]
+        return copied[()]
+
+
 class Reqs(list):
     def __init__(
         self, obj: T.Union[str, FString], env=None, trace=False, name="<YamlString>"
     ):
+        tParse = PROFILER.start()
         self.__proc = {}
+        compiled = {}  # id(proc's content) -> the proc's templates (compiled once)
         self._trace = trace
         self.exchanges = None  # list of Exchange
         self.name = obj.filename if type(obj) is FString else name
@@ -953,11 +2320,24 @@ class Reqs(list):
 
                     else:
                         foreach = i.get("foreach", None)
-                        self._assertType("foreach", foreach, [list, str])
+                        self._assertType("foreach", foreach, [list, str, dict])
+                        if type(foreach) is dict and not Rows.isSource(foreach):
+                            raise self._errorFormat(
+                                "Reqs: foreach source should be a dict file/start/stop/step"
+                            )
 
                         scopeParams = i.get("params", {})
                         self._assertType("params", scopeParams, [dict])
 
+                        sample = i.get("sample", None)
+                        if sample is not None:
+                            try:
+                                sample = Sampling.parseGroup(sample)
+                            except (ValueError, TypeError):
+                                raise self._errorFormat(
+                                    "Reqs: sample should be a size (ex: 10%, 5), or a dict size/seed/by"
+                                )
+
                         if "call" in keys:
                             call = i["call"]
                             self._assertType("call", call, [list, str])
@@ -967,30 +2347,30 @@ class Reqs(list):
                                     % ",".join(keys)
                                 )
 
+                            Req("GET", "", self).override(i)  # control the overrides
+
                             for namedProc in toList(call):
 
                                 # TODO: test not dynamic (not call: <<proc>>) !
 
                                 if namedProc in self.__proc:
-                                    reqs = controle(self.__proc[namedProc])
+                                    proc = self.__proc[namedProc]
                                 elif namedProc in self.env:
-                                    reqs = controle(self.env[namedProc])
+                                    proc = self.env[namedProc]
                                 else:
                                     raise self._errorFormat(
                                         "Reqs: call a proc '%s' that doesn't exist"
                                         % namedProc
                                     )
+                                if id(proc) not in compiled:
+                                    compiled[id(proc)] = controle(proc)
 
-                                for r in reqs:  # surcharge reqs from 'i'
-                                    r.updateIf(i)
-                                    r.updateBody(i)
-                                    r.updateDoc(i)
-                                    r.updateHeaders(i)
-                                    r.updateQuery(i)
-                                    r.updateSave(i)
-                                    r.updateTests(i)
-
-                                liste.append(ReqGroup(reqs, foreach, scopeParams))
+                                # surcharge reqs from 'i' (at execution)
+                                liste.append(
+                                    ReqGroup(
+                                        compiled[id(proc)], foreach, scopeParams, [i], sample
+                                    )
+                                )
 
                         elif any([v in keys for v in KNOWNVERBS]):
                             # there is a KNOWNVERBS's action in the dict 'i'
@@ -1026,12 +2406,15 @@ class Reqs(list):
                             r.updateSave(i)
                             r.updateTests(i)
                             r.updateQuery(i)
+                            r.updateRetry(i)
 
                             if foreach is None:  # no foreach
                                 r.updateParams(i)
                                 liste.append(r)
                             else:  # foreach
-                                liste.append(ReqGroup([r], foreach, scopeParams))
+                                liste.append(
+                                    ReqGroup([r], foreach, scopeParams, sample=sample)
+                                )
                         else:
                             raise self._errorFormat(
                                 "Reqs: unknown action in %s" % ", ".join(keys)
@@ -1054,6 +2437,7 @@ class Reqs(list):
 
         # here 'obj' is a list of ReqBase, and valid one
         list.__init__(self, lreqs)
+        PROFILER.stop(tParse, "parse", self.name)
         if self._trace:
             print("~" * 80)
             print("~~ Reqs")
@@ -1078,8 +2462,16 @@ class Reqs(list):
         )
 
     async def asyncReqsExecute(
-        self, switches: list, http=None, outputConsole=OutputConsole.MINIMAL
+        self,
+        switches: list,
+        http=None,
+        outputConsole=OutputConsole.MINIMAL,
+        failfast: FailFast = None,
+        uids: set = None,
+        sampling: Sampling = None,
     ) -> list:
+        """ 'uids' : the uids of the requests to execute (all, if None)
+            'sampling' : a Sampling, to execute a subset of the foreach's rows """
         assert type(switches) is list
         ############################################# live console
         if len(self) > 0 and outputConsole in [
@@ -1111,13 +2503,17 @@ class Reqs(list):
                 elif isinstance(i, ReqGroup):
                     scope = gscope.clone()  # important
 
-                    log(level, "* ReqGroup:", len(i.reqs), "ReqItem(s)")
+                    log(level, "* ReqGroup:", len(i.templates), "ReqItem(s)")
 
                     dict_merge(scope, i.scope)
                     log(level, "  Scope Add: ", i.scope)
 
                     foreach = i.foreach or [{}]
-                    if type(foreach) == str:  # dynamic foreach !
+                    if type(foreach) is dict or (
+                        type(foreach) == str and foreach.strip().startswith("<<file:")
+                    ):  # a data source (read lazily)
+                        foreach = Rows.get(scope, foreach)
+                    elif type(foreach) == str:  # dynamic foreach !
                         try:
                             foreach = json.loads(scope.replaceTxt(foreach))
                         except json.decoder.JSONDecodeError as e:
@@ -1135,10 +2531,25 @@ class Reqs(list):
                                 "Reqs: Dynamic foreach params is not a list of dict"
                             )
 
+                    if sampling is not None and i.foreach:
+                        paths = [r.path for r, _ in Slice._reqs(i.templates)]
+                        name = "%s %s" % (self.name, ",".join(paths))
+                        foreach = sampling.rows(
+                            foreach,
+                            i.sample,
+                            name if level == 0 else name + " (nested)",
+                            outer=level == 0,
+                        )
+
+                    reqs = i.reqs  # (instantiated here, for a call)
+                    for r in reqs:  # resolve their invariant parts once
+                        if isinstance(r, Req) and r.partial is None:
+                            r.partial = Partial()
+
                     for fparam in foreach:
                         log(level, "  Foreach with params:", fparam)
 
-                        for l, s, r in _test(i.reqs, scope, level + 1):
+                        for l, s, r in _test(reqs, scope, level + 1):
                             r.updateParams({"params": fparam})
                             yield l, s, r
                 elif isinstance(i, ReqConf):
@@ -1162,31 +2573,45 @@ class Reqs(list):
 
         reqsBegin = gscope.getBEGIN(local=True)
         reqsEnd = gscope.getEND(local=True)
+
+        async def execute(r, scope):
+            if failfast is None:
+                return await r.asyncReqExecute(scope, http, outputConsole=outputConsole)
+            if failfast.tripped:
+                return r.skipped()
+            try:
+                ex = await r.asyncReqExecute(scope, http, outputConsole=outputConsole)
+            except asyncio.CancelledError:
+                if not failfast.tripped:
+                    raise
+                return r.skipped("Cancelled (failfast)")
+            failfast.check(ex)
+            return ex
+
         if reqsBegin is not None:
             for r in reqsBegin:
-                ll.append(
-                    await r.asyncReqExecute(gscope, http, outputConsole=outputConsole)
-                )
+                ll.append(await execute(r, gscope))
         # /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\
 
         for l, s, r in _test(self, gscope):
+            if uids is not None and r.uid() not in uids:
+                continue
+
             doIf = True
-            if r.ifs:
+            if r.ifs and not (failfast and failfast.tripped):
                 envIf = s.clone()
                 dict_merge(envIf, r.params)
                 doIf = all([envIf.replaceObjOrNone(i) for i in r.ifs])
 
             if doIf:
-                ex = await r.asyncReqExecute(s, http, outputConsole=outputConsole)
+                ex = await execute(r, s)
                 ll.append(ex)
                 log(l, "  >>> EXECUTE:", ex)
 
         # /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\ SELFCONF
         if reqsEnd is not None:
             for r in reqsEnd:
-                ll.append(
-                    await r.asyncReqExecute(gscope, http, outputConsole=outputConsole)
-                )
+                ll.append(await execute(r, gscope))
         # /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\
 
         self.exchanges = ll
@@ -1197,7 +2622,9 @@ class Reqs(list):
 
 
 class ReqItem:
-    pass
+    def instantiate(self, overlays: list) -> "ReqItem":
+        """ a copy, surcharged by the overrides of calls (see ReqGroup) """
+        return self
 
 
 class ReqConf(ReqItem):
@@ -1214,38 +2641,40 @@ class ReqConf(ReqItem):
 
 
 class ReqGroup(ReqItem):
-    def __init__(self, reqs: list, foreach, params):
-        self.reqs = reqs
+    """ Reqs executed with the params of a foreach. The group of a call holds the proc's
+        templates (compiled once, shared by all its calls, never modified) and the
+        overrides of its call sites ('overlays'): its reqs are instantiated on demand """
+
+    def __init__(self, reqs: list, foreach, params, overlays: list = None, sample=None):
+        self.templates = reqs
+        self.overlays = overlays  # the dicts of the call sites (inner first), or None
         self.foreach = foreach
         self.scope = params
+        self.sample = sample  # dict size/seed/by, overriding the --sample one (or None)
 
-    def updateIf(self, o: dict):
-        for r in self.reqs:
-            r.updateIf(o)
-
-    def updateHeaders(self, o: dict):
-        for r in self.reqs:
-            r.updateHeaders(o)
-
-    def updateQuery(self, o: dict):
-        for r in self.reqs:
-            r.updateQuery(o)
-
-    def updateTests(self, o: dict):
-        for r in self.reqs:
-            r.updateTests(o)
-
-    def updateBody(self, o: dict):
-        for r in self.reqs:
-            r.updateBody(o)
-
-    def updateDoc(self, o: dict):
-        for r in self.reqs:
-            r.updateDoc(o)
+    @property
+    def reqs(self) -> list:
+        if self.overlays is None:
+            return self.templates
+        return [i.instantiate(self.overlays) for i in self.templates]  # new ones
+
+    def instantiate(self, overlays: list) -> "ReqGroup":
+        if self.overlays is None:
+            return ReqGroup(
+                [i.instantiate(overlays) for i in self.templates],
+                self.foreach,
+                self.scope,
+                sample=self.sample,
+            )
+        return ReqGroup(
+            self.templates, self.foreach, self.scope, self.overlays + overlays, self.sample
+        )
 
-    def updateSave(self, o: dict):
-        for r in self.reqs:
-            r.updateSave(o)
+    def __setstate__(self, state):  # (from an old rmr : its reqs were instantiated)
+        self.overlays, self.sample = None, None
+        self.__dict__.update(state)
+        if "reqs" in state:
+            self.templates = self.__dict__.pop("reqs")
 
     def __repr__(self):
         l = []
@@ -1275,6 +2704,13 @@ class Req(ReqItem):
         self.saves = []
         self.ifs = []
         self.querys={}
+        self.retry = None  # or int,dict,bool (see RetryPolicy)
+        self.form = None  # or ("form"|"multipart", dict) (replace the body)
+        self.partial = None  # or Partial, when in a foreach
+
+    def __setstate__(self, state):  # (from an old rmr, without the newer attributs)
+        self.retry, self.form, self.partial = None, None, None
+        self.__dict__.update(state)
 
     def clone(self):
         r = Req(self.method, self.path, self.parent)
@@ -1282,13 +2718,59 @@ class Req(ReqItem):
         r.params = clone(self.params)
         r.tests = clone(self.tests)
         r.body = clone(self.body)
+        r.form = clone(self.form)
         r.doc = clone(self.doc)
         r.saves = clone(self.saves)
         r.nolimit = clone(self.nolimit)
         r.ifs = clone(self.ifs)
         r.querys = clone(self.querys)
+        r.retry = clone(self.retry)
+        r.partial = self.partial  # shared between iterations
+        return r
+
+    def uid(self) -> str:
+        """ an unique id based on the req's attributes """
+        return hashlib.md5(
+            json.dumps(
+                [
+                    self.method,
+                    self.path,
+                    self.body if self.form is None else self.form,
+                    self.headers,
+                    self.doc,
+                    self.tests,
+                    self.saves,
+                ]
+            ).encode()
+        ).hexdigest()
+
+    def override(self, o: dict) -> "Req":
+        """ surcharge with the action keys of a call 'o' """
+        self.updateIf(o)
+        self.updateBody(o)
+        self.updateDoc(o)
+        self.updateHeaders(o)
+        self.updateQuery(o)
+        self.updateSave(o)
+        self.updateTests(o)
+        self.updateRetry(o)
+        return self
+
+    def instantiate(self, overlays: list) -> "Req":
+        r = self.clone()
+        for o in overlays:
+            r.override(o)
         return r
 
+    def skipped(self, why: str = "Skipped (failfast)") -> Exchange:
+        """ the exchange of a request which is not executed (see FailFast) """
+        ex = Exchange(self.method, self.path, self.path, "", {}, None, {}, why, "SKIPPED", 0)
+        ex.id = self.uid()
+        ex.doc = self.doc
+        ex.nolimit = self.nolimit
+        ex.skipped = True
+        return ex
+
     def updateIf(self, o: dict):  # merge headers
         if "if" in o:
             v = o.get("if", None)
@@ -1319,13 +2801,23 @@ class Req(ReqItem):
         if tests is not None:
             self.tests += tests
 
-    def updateBody(self, o: dict):  # replace body
+    def updateBody(self, o: dict):  # replace body (or form/multipart)
         body = o.get("body", None)
         self.parent._assertType(
             "body", body, [str, dict, list, bool, bytes, int, float]
         )
         if body is not None:
-            self.body = body
+            self.body, self.form = body, None
+
+        for kind in ["form", "multipart"]:
+            form = o.get(kind, None)
+            self.parent._assertType(kind, form, [dict])
+            if form is not None:
+                if body is not None:
+                    raise self.parent._errorFormat(
+                        "Reqs: can't have a body and a %s" % kind
+                    )
+                self.body, self.form = None, (kind, form)
 
     def updateDoc(self, o: dict):  # replace doc
         doc = o.get("doc", None)
@@ -1333,6 +2825,12 @@ class Req(ReqItem):
         if doc is not None:
             self.doc = doc
 
+    def updateRetry(self, o: dict):  # replace retry
+        retry = o.get("retry", None)
+        self.parent._assertType("retry", retry, [int, dict, bool])
+        if retry is not None:
+            self.retry = retry
+
     def updateSave(self, o: dict):  # append save
         save = o.get("save", None)
         self.parent._assertType("save", save, [str, dict])  # new
@@ -1373,15 +2871,20 @@ class Req(ReqItem):
             l.append("\ttests: %s" % (self.tests))
         if self.body:
             l.append("\tbody: %s" % (self.body))
+        if self.form:
+            l.append("\t%s: %s" % self.form)
         if self.doc:
             l.append("\tdoc: %s" % (self.doc))
         if self.saves:
             l.append("\tsaves: %s" % (self.saves))
+        if self.retry is not None:
+            l.append("\tretry: %s" % (self.retry))
         return "\n".join(l)
 
     async def asyncReqExecute(
         self, gscope, http=None, outputConsole=OutputConsole.MINIMAL
     ) -> Exchange:
+        tRequest = tPhase = PROFILER.start()
         scope = gscope.clone()  # important
         dict_merge(scope, self.params)
 
@@ -1399,20 +2902,33 @@ class Req(ReqItem):
         except:
             proxy = None
 
+        cache = scope.get("cache", None)  # global http cache
+        cache = HttpCache.get(cache, scope.path) if cache else None
+        ratelimit = scope.get("ratelimit", None)  # global rate limits (per host)
+        retry = self.retry if self.retry is not None else scope.get("retry", None)
+        retention = scope.get("retention", None)  # spill the exchanges to disk
+        retention = Retention.get(retention, scope.path) if retention else None
+        http2 = bool(scope.get("http2", False))  # http2 transport (httpx)
+        if http2 and httpx is None and not isinstance(http, dict):
+            raise RMException("'http2' needs the httpx module (pip install httpx[http2])")
+
 
         method, path, body, headers, querys = self.method, self.path, self.body, self.headers, self.querys
-        doc, tests, saves = self.doc, self.tests, self.saves
+        doc, tests, saves, form = self.doc, self.tests, self.saves, self.form
 
-        #'''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''' compute an unique id based on reqs's attributes
-        uid = hashlib.md5()
-        uid.update(
-            json.dumps([method, path, body, headers, doc, tests, saves]).encode()
-        )
-        #''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+        uid = self.uid()
 
         gpath = path
         ex = None
         try:
+            if self.partial is not None:  # in a foreach
+                rTxt = lambda t: self.partial.resolve(scope, t)
+                rObj = lambda o: (
+                    self.partial.resolve(scope, o, "obj") if type(o) is str else scope.replaceObj(o)
+                )
+                rBody = lambda b: self.partial.resolveBody(scope, b)
+            else:
+                rTxt, rObj, rBody = scope.replaceTxt, scope.replaceObj, scope.replaceObj
 
             def resolvHeaders(headers):
                 if type(headers) == str:
@@ -1425,10 +2941,10 @@ class Req(ReqItem):
                 dict_merge(newHeaders, headers)
                 headers = newHeaders
 
-            path = scope.replaceTxt(path)
+            path = rTxt(path)
 
             if root is not None and not urllib.parse.urlparse(path.lower()).scheme:
-                url = scope.replaceTxt(root) + path
+                url = rTxt(root) + path
             else:
                 url = path
 
@@ -1440,7 +2956,7 @@ class Req(ReqItem):
                     ll=[]
                     for i in v:
                         if i is not None:
-                            i=scope.replaceObj(i)
+                            i=rObj(i)
                             if type(i)==list:
                                 ll.extend(i)
                             else:
@@ -1448,18 +2964,44 @@ class Req(ReqItem):
 
                     pquerys[k]=ll
                 else:
-                    pquerys[k]=scope.replaceObj(v)
+                    pquerys[k]=rObj(v)
 
             url=updateUrlQuery(url,pquerys)
 
             if body:
-                body = scope.replaceObj(body)
+                body = rBody(body)
 
             headers = resolvHeaders(headers)
             headers = {
-                k: scope.replaceTxt(str(v)) for k, v in headers.items() if v
+                k: rTxt(str(v)) for k, v in headers.items() if v
             }  # headers'value should be string
 
+            if form is not None:
+                kind, fields = form
+                fields = {k: rObj(v) for k, v in fields.items()}
+                for k, v in fields.items():
+                    if scope.getNonResolvedVars(v):
+                        raise RMNonResolvedVars("Field `%s` non resolved" % k)
+                if kind == "form":
+                    body = urllib.parse.urlencode(
+                        {
+                            k: [i if type(i) is str else jdumps(i) for i in toList(v)]
+                            for k, v in fields.items()
+                        },
+                        doseq=True,
+                    )
+                    ctype = "application/x-www-form-urlencoded"
+                else:
+                    body = Multipart(fields)
+                    ctype = body.contentType
+                if kind == "multipart" or not HeadersMixedCase(**headers).get(
+                    "Content-Type"
+                ):  # (the multipart's boundary is only known here)
+                    headers = {
+                        k: v for k, v in headers.items() if k.lower() != "content-type"
+                    }
+                    headers["Content-Type"] = ctype
+
             # #=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+ test if all vars are resolved
             if scope.getNonResolvedVars(path):
                 raise RMNonResolvedVars("`Path` non resolved")
@@ -1471,16 +3013,30 @@ class Req(ReqItem):
             # =+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+=+
 
             tests = [
-                {list(d.keys())[0]: scope.replaceObj(list(d.values())[0])}
+                {list(d.keys())[0]: rObj(list(d.values())[0])}
                 for d in tests
             ]  # cast value as str
 
             # set cookies in request according env
             self.parent.env.cookiejar.update(url, headers)
 
+            PROFILER.stop(tPhase, "resolve", gpath)
+            tPhase = PROFILER.start()
             ex = await asyncExecute(
-                method, gpath, url, body, headers, http=http, timeout=timeout, proxy=proxy
+                method,
+                gpath,
+                url,
+                body,
+                headers,
+                http=http,
+                timeout=timeout,
+                proxy=proxy,
+                cache=cache,
+                ratelimit=ratelimit,
+                retry=retry,
+                http2=http2,
             )
+            PROFILER.stop(tPhase, "send", url)
         except (
             RMPyException,
             RMFormatException,
@@ -1512,13 +3068,20 @@ class Req(ReqItem):
                 0,
             )
         finally:
-            assert ex
-            self.parent.env.cookiejar.extract(ex.url, ex.outHeaders)
+            if ex is not None:  # (None when cancelled, see FailFast)
+                self.parent.env.cookiejar.extract(ex.url, ex.outHeaders)
 
         # +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-
+        tPhase = PROFILER.start()
         envResponse = scope.clone()
-        contentAsJson = ex.content.toJson() if type(ex.content) == Content else None
-        contentAsXml = ex.content.toXml() if type(ex.content) == Content else None
+        size = len(ex.content.view()) if type(ex.content) == Content else 0
+        if type(ex.content) == Content:
+            (contentAsJson, contentAsXml), *ex.cpu["parse"] = await offload(
+                size, lambda c: (c.toJson(), c.toXml()), ex.content
+            )
+        else:
+            contentAsJson, contentAsXml = None, None
+        PROFILER.stop(tPhase, "decode", ex.url)
 
         envResponse["request"] = RmDict(  # new
             path=ex.url,
@@ -1552,6 +3115,7 @@ class Req(ReqItem):
 
         # +-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-+-
 
+        tPhase = PROFILER.start()
         try:  # postsave
             for s in saves:
                 for saveKey, saveWhat in s.items():
@@ -1571,12 +3135,17 @@ class Req(ReqItem):
             envResponse["rm"]["response"]["content"] = ex.content
             envResponse["rm"]["response"]["status"] = ex.status
 
+        PROFILER.stop(tPhase, "save", ex.url)
+
         # upgrade 'ex' !
-        ex.id = uid.hexdigest()
+        ex.id = uid
         ex.doc = envResponse.replaceTxt(doc) if doc else None
         ex.scope = scope
         ex.nolimit = self.nolimit
-        ex.tests = TestResult(tests, envResponse, ex.status)
+        tPhase = PROFILER.start()
+        ex.tests = TestResult(tests, envResponse, ex.status)  # (on the loop : user's python)
+        PROFILER.stop(tPhase, "test", ex.url)
+        PROFILER.stop(tRequest, "request", "%s %s" % (ex.method, ex.url))
 
         # =================================================== LIVE CONSOLE
         if outputConsole != OutputConsole.NO:
@@ -1612,80 +3181,188 @@ class Req(ReqItem):
                 print()
         # =================================================== LIVE CONSOLE
 
+        if retention is not None:
+            retention.keep(ex)
+
         return ex
 
 
 async def asyncExecute(
-    method, path, url, body, headers, http=None, timeout=None, proxy=None
+    method,
+    path,
+    url,
+    body,
+    headers,
+    http=None,
+    timeout=None,
+    proxy=None,
+    cache=None,
+    ratelimit=None,
+    retry=None,
+    http2=False,
 ) -> Exchange:
-    t1 = datetime.datetime.now()
+    limiter = RateLimiter.get(ratelimit, url) if ratelimit else None
+    policy = RetryPolicy.get(retry)
+
+    # conditional request, when the response is in the cache
+    if cache is not None and HttpCache.isCacheable(method, headers):
+        condHeaders = cache.validators(method, url, headers)
+        rheaders = dict(headers, **condHeaders)
+    else:
+        cache, condHeaders, rheaders = None, {}, headers
+
+    if type(body) is not bytes and not isinstance(body, BodyStream):
+        if body is None:
+            body = "".encode()
+        elif type(body) is str:
+            body = body.encode()
+        else:
+            body = jdumps(body).encode()
+
+    async def send():
+        if isinstance(http, dict):
+            status, content, outHeaders, info = (
+                404,
+                "mock not found",
+                {"server": "reqman mock"},
+                "MOCK RESPONSE",
+            )
+            if url in http:
+                rep = http[url]
+                if callable(rep):
+                    rep = rep(method, url, body, rheaders)
+                if isinstance(body, BodyStream):
+                    body.drain()  # as if it was sent
+
+                if len(rep) == 2:
+                    status, content = rep
+                elif len(rep) == 3:
+                    status, content, oHeaders = rep
+                    dict_merge(outHeaders, oHeaders)
+                else:
+                    status, content = 500, "mock server error"
+                assert type(content) in [str, bytes]
+                assert type(status) is int
+                assert type(outHeaders) is dict
+            return status, outHeaders, Content(content), info
+        else:
+            # use the real one !!
+            return await (request2 if http2 else request)(
+                method,
+                url,
+                body.stream() if isinstance(body, BodyStream) else body,
+                rheaders,
+                timeout=timeout,
+                proxy=proxy,
+            )
+
+    wait = 0  # time (ms) waited for the rate limiter (not counted in the time)
+    attempts = []  # (status or error, time) of each attempt
+    retryAfter = None
+    for attempt in range(policy.attempts if policy else 1):
+        if attempt:
+            await asyncio.sleep(policy.delay(attempt, retryAfter))
+
+        if limiter:
+            wait += await limiter.acquire()
+
+        t1 = datetime.datetime.now()
+        status, outHeaders = None, {}
+        try:
+            status, outHeaders, content, info = await send()
+        finally:
+            if limiter:
+                limiter.release(status, outHeaders)
+
+        diff = datetime.datetime.now() - t1
+        elapsed = (diff.days * 86400000) + (diff.seconds * 1000) + (diff.microseconds / 1000)
+        attempts.append((status or str(content), elapsed))
+
+        if not (policy and policy.isRetryable(method, status, content)):
+            break
+        retryAfter = HeadersMixedCase(**outHeaders).get("Retry-After")
+        if isinstance(body, BodyStream) and not body.replayable:
+            break
 
-    if type(body) is not bytes:
-        if body is None:
-            body = "".encode()
-        elif type(body) is str:
-            body = body.encode()
+    cpu = {}  # step -> (wait, time) (ms), see offload()
+    if status is not None and not isinstance(http, dict):  # (a mock is not decoded)
+        raw = bytes(content)
+        ctype = HeadersMixedCase(**outHeaders).get("Content-Type")
+        decoded, *cpu["decode"] = await offload(len(raw), decodeContent, raw, ctype)
+        if decoded is not raw:
+            content = Content(decoded)
+
+    cached = False
+    if cache is not None:
+        if status == 304 and condHeaders:
+            response = cache.load(method, url, headers)
+            if response:
+                status, outHeaders, content, _ = response
+                info = "%s (cached)" % info
+                cached = True
         else:
-            body = jdumps(body).encode()
-
-    if type(http) == dict:
-        status, content, outHeaders, info = (
-            404,
-            "mock not found",
-            {"server": "reqman mock"},
-            "MOCK RESPONSE",
-        )
-        if url in http:
-            rep = http[url]
-            if callable(rep):
-                rep = rep(method, url, body, headers)
-
-            if len(rep) == 2:
-                status, content = rep
-            elif len(rep) == 3:
-                status, content, oHeaders = rep
-                dict_merge(outHeaders, oHeaders)
-            else:
-                status, content = 500, "mock server error"
-            assert type(content) in [str, bytes]
-            assert type(status) is int
-            assert type(outHeaders) is dict
-        content = Content(content)
-    else:
-        http = request  # use the real one !!
-        status, outHeaders, content, info = await http(
-            method, url, body, headers, timeout=timeout, proxy=proxy
-        )
+            cache.store(method, url, headers, status, outHeaders, content, info)
 
-    diff = datetime.datetime.now() - t1
-    time = (diff.days * 86400000) + (diff.seconds * 1000) + (diff.microseconds / 1000)
-    return Exchange(
-        method, path, url, body, headers, status, outHeaders, content, info, time
+    ex = Exchange(
+        method, path, url, body, rheaders, status, outHeaders, content, info, elapsed
     )
+    ex.cached = cached
+    ex.wait = wait
+    ex.attempts = attempts
+    ex.cpu = cpu
+    return ex
 
 
 ######################################################################################"
 ## test part (old code)
 ######################################################################################"
-class Test(int):
-    """ a boolean with a name """
+class Test:
+    """ a boolean with a name (which counts as an int) ; its name (and its
+        short value) is interned : the same across the iterations """
 
-    name = ""
-
-    def __init__(self, v, n1, n2, realValue):
-        pass  # just for mypy
+    __slots__ = ("ok", "name", "value")
+    INTERN = 64  # max length of an interned value
 
     def __new__(
-        cls, value: int, nameOK: str = None, nameKO: str = None, realValue=None
+        cls, value: int = 0, nameOK: str = None, nameKO: str = None, realValue=None
     ):
-        s = super().__new__(cls, value)
-        if value:
-            s.name = nameOK
-        else:
-            s.name = nameKO
+        s = super().__new__(cls)
+        s.ok = bool(value)
+        name = nameOK if value else nameKO
+        s.name = sys.intern(name) if type(name) is str else name
+        if type(realValue) is str and len(realValue) <= Test.INTERN:
+            realValue = sys.intern(realValue)
         s.value = realValue
         return s
 
+    def __getstate__(self):
+        return (self.ok, self.name, self.value)
+
+    def __setstate__(self, state):  # (from a dict : an old rmr, where it was an int)
+        if type(state) is dict:
+            self.name, self.value = state.get("name", ""), state.get("value")
+        else:
+            self.ok, self.name, self.value = state
+
+    def __bool__(self):
+        return self.ok
+
+    def __int__(self):
+        return int(self.ok)
+
+    __index__ = __int__
+
+    def __add__(self, o):
+        return int(self) + o
+
+    __radd__ = __add__
+
+    def __eq__(self, o):
+        return int(self) == o
+
+    def __hash__(self):
+        return hash(int(self))
+
     def __repr__(self):
         return "%s: %s" % ("OK" if self else "KO", self.name)
 
@@ -1901,11 +3578,22 @@ class ReqmanResult(Result):
         ok = 0
         total = 0
         nbReqs = 0
+        nbCached = 0
+        time, timeCached = 0, 0  # (ms) of the requests, and of the cached ones (304)
+        nbSkipped = 0
         for r in ll:
             for x in r.exchanges:
+                if getattr(x, "skipped", False):
+                    nbSkipped += 1
+                    continue
                 nbReqs += 1
                 total += len(x.tests)
                 ok += sum([t for t in x.tests])
+                if getattr(x, "cached", False):
+                    nbCached += 1
+                    timeCached += x.time
+                else:
+                    time += x.time
 
         self.infos = [
             dict(
@@ -1919,6 +3607,10 @@ class ReqmanResult(Result):
         self.ok = ok
         self.total = total
         self.nbReqs = nbReqs
+        self.nbCached = nbCached
+        self.nbSkipped = nbSkipped  # not executed (see FailFast)
+        self.time = time
+        self.timeCached = timeCached
         self.results = ll
         self.title = "%s %s/%s" % (",".join(switches), ok, total)
 
@@ -1926,6 +3618,12 @@ class ReqmanResult(Result):
     def switches(self):
         return self.infos[0]["switches"]  # TODO: not top (but needed for replaying)
 
+    def snapshot(self) -> "ReqmanResult":
+        """ a copy, which is not affected by a replay of its Reqs """
+        r = copy.copy(self)
+        r.results = [ReqsMix(i.name, i.exchanges) for i in self.results]
+        return r
+
     def saveRMR(self, name=None):
         if name is None:
             name = (
@@ -1936,31 +3634,184 @@ class ReqmanResult(Result):
                 + ".rmr"
             )
         with open(name, "wb") as fid:
-            x = pickle.dumps(self)
-            fid.write(b"RMR2" + zlib.compress(x))
+            fid.write(b"RMR2")
+            z = zlib.compressobj()
+
+            class Writer:  # compress while pickling (no whole pickle in memory)
+                def write(self, b):
+                    return fid.write(z.compress(b))
+
+            pickle.dump(self, Writer())
+            fid.write(z.flush())
         return name
 
 
+class Diff:
+    """ The structural differences between 2 responses (status & content) :
+        a json tree diff (with jpath's paths), else a line diff of the
+        (prettified) xml or text. 'changes' is a list of (path, op, v1, v2),
+        where op is "+" (added), "-" (removed) or "~" (changed) """
+
+    MAXLINES = 50  # max changes for a line diff
+
+    def __init__(self, ex1: Exchange, ex2: Exchange):
+        self.changes = []
+        self.kind = None  # json, xml, text (None when contents are the same)
+
+        if ex1.status != ex2.status:
+            self.changes.append(("status", "~", ex1.status, ex2.status))
+
+        c1, c2 = ex1.content, ex2.content
+        if type(c1) is Content and type(c2) is Content:
+            if bytes(c1) == bytes(c2):
+                return
+            j1, j2 = c1.toJson(), c2.toJson()
+            if j1 is not None and j2 is not None:
+                self.kind = "json"
+                self.changes.extend(Diff.json(j1, j2))
+            else:
+                x1, x2 = c1.toXml(), c2.toXml()
+                if x1 is not None and x2 is not None:
+                    self.kind = "xml"
+                    self.changes.extend(Diff.lines(repr(x1), repr(x2), "xml"))
+                else:
+                    self.kind = "text"
+                    self.changes.extend(Diff.lines(str(c1), str(c2), "content"))
+        elif str(c1) != str(c2):
+            self.kind = "text"
+            self.changes.append(("content", "~", str(c1), str(c2)))
+
+    @staticmethod
+    def json(a, b, path="json") -> T.Iterator[tuple]:
+        if isinstance(a, dict) and isinstance(b, dict):
+            for k in a:
+                if k in b:
+                    yield from Diff.json(a[k], b[k], "%s.%s" % (path, k))
+                else:
+                    yield ("%s.%s" % (path, k), "-", a[k], None)
+            for k in b:
+                if k not in a:
+                    yield ("%s.%s" % (path, k), "+", None, b[k])
+        elif isinstance(a, list) and isinstance(b, list):
+            for i in range(max(len(a), len(b))):
+                if i >= len(b):
+                    yield ("%s.%s" % (path, i), "-", a[i], None)
+                elif i >= len(a):
+                    yield ("%s.%s" % (path, i), "+", None, b[i])
+                else:
+                    yield from Diff.json(a[i], b[i], "%s.%s" % (path, i))
+        elif type(a) != type(b) or a != b:
+            yield (path, "~", a, b)
+
+    @staticmethod
+    def lines(t1: str, t2: str, path: str) -> T.List[tuple]:
+        l1, l2 = t1.splitlines(), t2.splitlines()
+        ll = []
+        sm = difflib.SequenceMatcher(None, l1, l2, autojunk=False)
+        for op, i1, i2, j1, j2 in sm.get_opcodes():
+            if op == "equal":
+                continue
+            o = {"replace": "~", "delete": "-", "insert": "+"}[op]
+            ll.append(
+                (
+                    "%s@%s" % (path, i1 + 1),
+                    o,
+                    "\n".join(l1[i1:i2]) or None,
+                    "\n".join(l2[j1:j2]) or None,
+                )
+            )
+        return ll[: Diff.MAXLINES]
+
+    @property
+    def paths(self) -> T.List[str]:
+        """ the changed paths, where list's indexes are generalized (ex: json.items.*.id) """
+        generalize = lambda p: re.sub(r"\.\d+(?=\.|$)", ".*", p) if p.startswith("json") else p.split("@")[0]
+        return sorted(set([generalize(p) for p, *_ in self.changes]))
+
+    def __bool__(self):
+        return len(self.changes) > 0
+
+    def __repr__(self):
+        show = lambda v: strjs(v) if v is not None else "-"
+        return "\n".join(["%s %s: %s -> %s" % (o, p, show(v1), show(v2)) for p, o, v1, v2 in self.changes])
+
+
+class ReqsMix:
+    """ the exchanges of a file, without its Reqs (aligned tuples in dual mode) """
+
+    def __init__(self, name, exchanges):
+        self.name = name
+        self.exchanges = exchanges
+
+
+class DualAligner:
+    """ Align the exchanges of the files of 2 runs, as soon as a file has been
+        executed on both sides (see Reqman.onReqs), while the others are executing
+        (if 'reordered' : matched by id wherever they are, see izip) """
+
+    def __init__(self, reordered=False):
+        self.reordered = reordered
+        self.pending = ({}, {})  # name -> exchanges, for side 0 & side 1
+        self.aligned = {}  # name -> aligned exchanges
+
+    def feed(self, side: int, reqs) -> None:
+        others = self.pending[1 - side]
+        if reqs.name in others:
+            ex1, ex2 = others.pop(reqs.name), reqs.exchanges
+            if side == 0:
+                ex1, ex2 = ex2, ex1
+            self.aligned[reqs.name] = izip(ex1, ex2, reordered=self.reordered)
+        else:
+            self.pending[side][reqs.name] = reqs.exchanges
+
+    def get(self, name) -> list:
+        if name in self.aligned:
+            return self.aligned.pop(name)
+        else:
+            ex1 = self.pending[0].pop(name, [])
+            ex2 = self.pending[1].pop(name, [])
+            return izip(ex1, ex2, reordered=self.reordered)
+
+
 class ReqmanDualResult(Result):
-    def __init__(self, r1: ReqmanResult, r2: ReqmanResult):
+    def __init__(
+        self, r1: ReqmanResult, r2: ReqmanResult, aligner: DualAligner = None, reordered=False
+    ):
         assert len(r1.results) == len(r2.results)  # TODO: better here
 
-        d1 = {i.name: i.exchanges for i in r1.results}
-        d2 = {i.name: i.exchanges for i in r2.results}
+        if aligner is None:
+            aligner = DualAligner(reordered)
+            for i in r1.results:
+                aligner.feed(0, i)
+            for i in r2.results:
+                aligner.feed(1, i)
 
-        class ReqsMix:
-            name = None
-            exchanges = []
+        cache = {}  # (md5 of ex1, md5 of ex2) -> Diff (a same pair is compared once)
 
+        def diff(ex1, ex2):
+            if ex1 is None or ex2 is None:
+                return None
+            h = lambda ex: hashlib.md5(
+                str(ex.status).encode()
+                + b"|"
+                + (bytes(ex.content) if type(ex.content) is Content else str(ex.content).encode())
+            ).digest()
+            k = (h(ex1), h(ex2))
+            if k not in cache:
+                cache[k] = None if k[0] == k[1] else Diff(ex1, ex2)
+            return cache[k]
+
+        self.drifts = collections.Counter()  # path -> nb of exchanges where it differs
+        self.nbDiffs = 0
         ll = []
         for i in r1.results:
-            m = ReqsMix()
-            m.name = i.name
-            ex1 = d1.get(i.name, [])
-            ex2 = d2.get(i.name, [])
-
-            m.exchanges = izip(ex1, ex2)
+            m = ReqsMix(i.name, aligner.get(i.name))
             if m.exchanges:
+                m.diffs = [diff(ex1, ex2) for ex1, ex2 in m.exchanges]
+                for d in m.diffs:
+                    if d:
+                        self.nbDiffs += 1
+                        self.drifts.update(d.paths)
                 ll.append(m)
 
         self.infos = [r1.infos[0], r2.infos[0]]
@@ -1972,24 +3823,19 @@ class ReqmanDualResult(Result):
         self.results = ll
         self.title = "%s vs %s" % (r1.title, r2.title)
 
-        # for i in ll:
-        #     print("FILE:",i.name)
-        #     for ex,v1,v2 in i.exchanges:
-        #         print("  ",ex.method,ex.path)
-        #         if v1: print("    v1:",v1.method,v1.url)
-        #         if v2: print("    v2:",v2.method,v2.url)
-
 
 class Reqman:
     def __init__(self, conf=None):  # TODO: ability to pass env directly
         self.env = Env(conf)
         self.ymls = []  # list of str (or reqs)
         self.outputConsole = OutputConsole.MINIMAL
+        self.onReqs = None  # callback(reqs), called each time a Reqs is executed
 
     def clone(self):
         r = Reqman(clone(self.env))
         r.ymls = self.ymls
         r.outputConsole = self.outputConsole
+        r.onReqs = self.onReqs
         return r
 
     @property
@@ -2004,18 +3850,35 @@ class Reqman:
         return loop.run_until_complete(self.asyncExecute(switches, paralleliz, http))
 
     async def asyncExecute(
-        self, switches: list = [], paralleliz=False, http=None
+        self,
+        switches: list = [],
+        paralleliz=False,
+        http=None,
+        only=None,
+        failfast=None,
+        subset=None,
+        sampling=None,
+        begin=None,
+        end=None,
     ) -> ReqmanResult:
+        """ 'only' : a list of yml's filenames to execute, without BEGIN/END (watch mode)
+            'failfast' : a FailFast, to stop the run (but END) on failures
+            'sampling' : a Sampling, to execute a subset of the foreach's rows
+            'subset' : a Slice, to execute only its requests (the others are kept)
+            'begin'/'end' : to execute BEGIN/END or not (default: when not 'only') """
+        Retention.reset()
         scope = self.env.clone()
 
         for switch in switches:
             scope.mergeSwitch(switch)
 
-        reqsBegin = scope.getBEGIN()
-        reqsEnd = scope.getEND()
+        reqsBegin = scope.getBEGIN() if (only is None if begin is None else begin) else None
+        reqsEnd = scope.getEND() if (only is None if end is None else end) else None
 
         lreqs = []
         for yml in self.ymls:
+            if only is not None and getattr(yml, "filename", None) not in only:
+                continue
             if isinstance(yml, Reqs):
                 reqs = yml
                 reqs.env = scope
@@ -2026,46 +3889,187 @@ class Reqman:
                 )  # (no need to clone) scope is cloned at execution time!
 
         results = []
+        timings = scope.get("timings", None)  # durations db (for the schedule)
+        timings = Timings.get(timings, scope.path) if timings else None
+
+        async def run(reqs, failfast=failfast, **k):
+            if subset is not None and reqs.name not in subset.whole:
+                if reqs.name not in subset.uids:
+                    if reqs.exchanges is None:
+                        reqs.exchanges = []
+                    return  # not executed (keep its previous exchanges)
+                k["uids"] = subset.uids[reqs.name]
+            if reqs is not reqsBegin:
+                reqs.env.cookiejar.add(scope.beginCookies)  # (BEGIN's session)
+            await reqs.asyncReqsExecute(
+                switches, http, failfast=failfast, sampling=sampling, **k
+            )
+            if "uids" in k:
+                subset.merge(reqs)
+            if self.onReqs:
+                self.onReqs(reqs)
 
         if reqsBegin is not None:
-            await reqsBegin.asyncReqsExecute(switches, http)
+            await run(reqsBegin)
+            scope.saveCookies(reqsBegin.env.cookiejar)
             results.append(reqsBegin)
 
         if paralleliz:
-            ll = [
-                reqs.asyncReqsExecute(switches, http, outputConsole=self.outputConsole)
-                for reqs in lreqs
-            ]
-
             sem = asyncio.Semaphore(10)  # ten concurrent coroutine max
-            async with sem:
-                await asyncio.gather(*ll)
+
+            async def bounded(reqs):
+                async with sem:
+                    if failfast is not None:
+                        failfast.tasks.add(asyncio.current_task())  # to be cancelled
+                    await run(reqs, outputConsole=self.outputConsole)
+
+            if timings is not None:  # the longest first
+                queue = timings.schedule(lreqs, lambda i: i.name, lambda i: i)
+            else:
+                queue = lreqs
+            await asyncio.gather(*[asyncio.ensure_future(bounded(i)) for i in queue])
             results += lreqs
         else:
             for reqs in lreqs:
-                await reqs.asyncReqsExecute(
-                    switches, http, outputConsole=self.outputConsole
-                )
+                await run(reqs, outputConsole=self.outputConsole)
                 results.append(reqs)
 
-        if reqsEnd is not None:
-            await reqsEnd.asyncReqsExecute(
-                switches, http, outputConsole=self.outputConsole
-            )
+        if reqsEnd is not None:  # (always executed)
+            await run(reqsEnd, failfast=None, outputConsole=self.outputConsole)
             results.append(reqsEnd)
 
+        if timings is not None and subset is None:
+            timings.update(lreqs)
+
+        if SESSION is None:  # not pooled (see openSession())
+            await closeH2()
+        HttpCache.close()
+
+        return self._result(results, switches, sampling)
+
+    async def asyncExecuteWorkers(
+        self, switches: list = [], workers: int = 2, http=None
+    ) -> ReqmanResult:
+        """ execute BEGIN, then the ymls in a pool of 'workers' processes (which
+            get the BEGIN's globals & cookies), then END. Results are in the serial order """
+        ctx = multiprocessing.get_context(WORKERS)
+        if EXPOSEDS and ctx.get_start_method() != "fork":
+            raise RMException(
+                "Can't use exposed python methods in workers, started with '%s' (not fork)"
+                % ctx.get_start_method()
+            )
+        Retention.reset()
+        scope = self.env.clone()
+
+        for switch in switches:
+            scope.mergeSwitch(switch)
+
+        results = []
+
+        reqsBegin = scope.getBEGIN()
+        await reqsBegin.asyncReqsExecute(switches, http)
+        scope.saveCookies(reqsBegin.env.cookiejar)
+        if self.onReqs:
+            self.onReqs(reqsBegin)
+        results.append(reqsBegin)
+
+        loop = asyncio.get_event_loop()
+        with concurrent.futures.ProcessPoolExecutor(
+            workers,
+            mp_context=ctx,
+            initializer=_initWorker,
+            initargs=(
+                dict(scope),
+                scope.path,
+                dict(self.env.globals),
+                scope.beginCookies,
+                switches,
+                http,
+                self.outputConsole,
+            ),
+        ) as pool:
+
+            async def run(yml):
+                reqs = await loop.run_in_executor(
+                    pool, _workerExecute, getattr(yml, "filename", None), str(yml)
+                )
+                if self.onReqs:
+                    self.onReqs(reqs)
+                return reqs
+
+            timings = scope.get("timings", None)  # durations db (for the schedule)
+            timings = Timings.get(timings, scope.path) if timings else None
+            if timings is not None:  # submit the longest first
+                name = lambda yml: getattr(yml, "filename", None) or "<YamlString>"
+                queue = timings.schedule(self.ymls, name)
+            else:
+                queue = self.ymls
+            tasks = {id(yml): asyncio.ensure_future(run(yml)) for yml in queue}
+            ll = [await tasks[id(yml)] for yml in self.ymls]
+            results += ll
+            if timings is not None:
+                timings.update(ll)
+
+        reqsEnd = scope.getEND()
+        reqsEnd.env.cookiejar.add(scope.beginCookies)
+        await reqsEnd.asyncReqsExecute(switches, http, outputConsole=self.outputConsole)
+        if self.onReqs:
+            self.onReqs(reqsEnd)
+        results.append(reqsEnd)
+        HttpCache.close()
+
+        return self._result(results, switches)
+
+    def _result(self, results: list, switches: list, sampling=None) -> ReqmanResult:
         r = ReqmanResult(results, switches, self.env)
+        if sampling is not None:
+            r.infos[0]["sampled"] = sampling.sampled
         # ============================= LIVE CONSOLE
         if self.outputConsole != OutputConsole.NO:
             callback = cg if r.ok == r.total else cr
+            cached = ", %s cached" % r.nbCached if r.nbCached else ""
+            if r.nbSkipped:
+                cached += ", " + cr("%s skipped" % r.nbSkipped)
             print(
-                "RESULT:", callback("%s/%s" % (r.ok, r.total)), "(%sreq(s))" % r.nbReqs
+                "RESULT:", callback("%s/%s" % (r.ok, r.total)), "(%sreq(s)%s)" % (r.nbReqs, cached)
             )
+            for i in r.infos[0].get("sampled", []):
+                print("SAMPLED:", i)
         # ============================= LIVE CONSOLE
 
         return r
 
 
+WORKERS = None  # start method of the worker processes (None: the platform's default)
+_WORKER = None  # (env, switches, http, outputConsole) of a worker process
+
+
+def _initWorker(
+    scope: dict, path, globals: dict, cookies: list, switches, http, outputConsole
+):
+    """ initialize a worker process of Reqman.asyncExecuteWorkers() """
+    global _WORKER
+    EXECUTORS.clear()  # (the ones of the parent process)
+    env = Env(scope)
+    env.path = path
+    for k, v in globals.items():
+        env.save(k, v, isGlobal=True)
+    env.cookiejar = CookieStore(cookies)  # (BEGIN's session)
+    asyncio.set_event_loop(asyncio.new_event_loop())  # its own loop
+    _WORKER = (env, switches, http, outputConsole)
+
+
+def _workerExecute(filename, yml: str) -> Reqs:
+    """ execute a yml in a worker process (see Reqman.asyncExecuteWorkers()) """
+    env, switches, http, outputConsole = _WORKER
+    reqs = Reqs(FString(filename) if filename else yml, env)
+    asyncio.get_event_loop().run_until_complete(
+        reqs.asyncReqsExecute(switches, http, outputConsole=outputConsole)
+    )
+    HttpCache.close()  # (the pool's processes don't run atexit)
+    return reqs
+
+
 async def testContent(content: str, env: dict = {}, http=None) -> ReqmanResult:
     """ test a yml 'content' against env (easy wrapper for main call )"""
     if not isinstance(env, Env):
@@ -2095,8 +4099,45 @@ def findRCup(cp):
 
 class ReqmanCommand:
     def __init__(self, *params):
+        t = PROFILER.start()
         self._r = Reqman()
 
+        files, penv = ReqmanCommand.expand(params)
+        cp = os.path.dirname(os.path.commonprefix(files)) or "."
+
+        rqc = findRCup(cp)
+        self.params = list(params)
+        self.files = files
+        self.rqc = rqc
+        if rqc:
+            self._r.env = Env(FString(rqc),rqc)
+
+        # /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\ SELFCONF
+        self.fileSwitches = []
+        for i in files:
+            try:
+                for s in yaml.load(FString(i), Loader=yaml.SafeLoader):
+                    if "conf" in s:
+                        self.fileSwitches.extend(list(Env(s["conf"]).switches))
+            except:
+                pass
+        # /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\
+
+        for k, v in penv.items():  # add param's input env into env
+            self._r.env[k] = guessValue(v)
+
+        if len(files)==1 and os.path.basename(files[0])==REQMAN_CONF:
+            # special case of "reqman.exe reqman.conf"
+            self._r.ymls=[""]
+        else:
+            for i in files:
+                self._r.add(FString(i))
+        PROFILER.stop(t, "command")
+
+    @staticmethod
+    def expand(params) -> tuple:
+        """ -> (the yml files of the params (files, folders or patterns), their env params) """
+
         def listFiles(path: str, filters=(".yml", ".rml")) -> T.Iterator[str]:
             for folder, subs, files in os.walk(path):
                 if (folder in [".", ".."]) or (
@@ -2129,37 +4170,19 @@ class ReqmanCommand:
         files = [os.path.abspath(i) for i in files]  # TODO: really needed ?
 
         files.sort()
-        cp = os.path.dirname(os.path.commonprefix(files)) or "."
-
-        rqc = findRCup(cp)
-        if rqc:
-            self._r.env = Env(FString(rqc),rqc)
-
-        # /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\ SELFCONF
-        self.fileSwitches = []
-        for i in files:
-            try:
-                for s in yaml.load(FString(i), Loader=yaml.SafeLoader):
-                    if "conf" in s:
-                        self.fileSwitches.extend(list(Env(s["conf"]).switches))
-            except:
-                pass
-        # /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\
-
-        for k, v in penv.items():  # add param's input env into env
-            self._r.env[k] = guessValue(v)
-
-        if len(files)==1 and os.path.basename(files[0])==REQMAN_CONF:
-            # special case of "reqman.exe reqman.conf"
-            self._r.ymls=[""]
-        else:
-            for i in files:
-                self._r.add(FString(i))
+        return files, penv
 
     @property
     def nbFiles(self):
         return len(self._r.ymls)
 
+    def reload(self, files: list) -> None:
+        """ re-read the content of the yml 'files' (watch mode) """
+        self._r.ymls = [
+            FString(i.filename) if isinstance(i, FString) and i.filename in files else i
+            for i in self._r.ymls
+        ]
+
     @property
     def switches(self):
         return self._r.switches + self.fileSwitches
@@ -2180,9 +4203,22 @@ class ReqmanCommand:
         paralleliz=False,
         outputConsole=OutputConsole.MINIMAL,
         fakeServer=None,
+        workers=None,
+        failfast=None,
+        subset=None,
+        sampling=None,
     ) -> ReqmanResult:
         self._r.outputConsole = outputConsole
-        return await self._r.asyncExecute(switches, paralleliz, http=fakeServer)
+        if workers and workers > 1:
+            return await self._r.asyncExecuteWorkers(switches, workers, http=fakeServer)
+        return await self._r.asyncExecute(
+            switches,
+            paralleliz,
+            http=fakeServer,
+            failfast=failfast,
+            subset=subset,
+            sampling=sampling,
+        )
 
     async def asyncExecuteDual(
         self,
@@ -2190,16 +4226,245 @@ class ReqmanCommand:
         switches2=[],
         outputConsole=OutputConsole.MINIMAL,
         fakeServer=None,
+        reordered=False,
     ) -> ReqmanDualResult:
         self._r.outputConsole = outputConsole
 
         r2 = self._r.clone()  # clone IMPORTANT !!!
 
-        ll = [
-            self._r.asyncExecute(switches1, http=fakeServer),
-            r2.asyncExecute(switches2, http=fakeServer),
-        ]
-        return ReqmanDualResult(*await asyncio.gather(*ll))
+        # align the files as soon as they are executed on both sides
+        aligner = DualAligner(reordered)
+        onReqs = self._r.onReqs
+        self._r.onReqs = lambda reqs: aligner.feed(0, reqs)
+        r2.onReqs = lambda reqs: aligner.feed(1, reqs)
+        try:
+            ll = [
+                self._r.asyncExecute(switches1, http=fakeServer),
+                r2.asyncExecute(switches2, http=fakeServer),
+            ]
+            return ReqmanDualResult(*await asyncio.gather(*ll), aligner=aligner)
+        finally:
+            self._r.onReqs = onReqs
+
+
+class ReqmanWatcher:
+    """ Keep a ReqmanCommand alive, and re-run only the yml files which have
+        changed (polling mtimes). A change in the reqman.conf re-runs all. """
+
+    def __init__(
+        self,
+        cmd: ReqmanCommand,
+        switches=[],
+        paralleliz=False,
+        outputConsole=OutputConsole.MINIMAL,
+        fakeServer=None,
+    ):
+        self.cmd = cmd
+        self.switches = switches
+        self.paralleliz = paralleliz
+        self.outputConsole = outputConsole
+        self.fakeServer = fakeServer
+        self.result = None
+        self._broken = False  # a rebuild has failed
+        self._mtimes = self._scan()
+
+    def _scan(self) -> dict:
+        mtimes = {}
+        try:
+            files = ReqmanCommand.expand(self.cmd.params)[0]  # (a new yml in a folder too)
+        except RMException:
+            files = self.cmd.files
+        for f in files + [self.cmd.rqc]:
+            if f and os.path.isfile(f):
+                mtimes[f] = os.path.getmtime(f)
+        return mtimes
+
+    async def asyncRun(self) -> ReqmanResult:
+        """ (re)run all (with BEGIN/END) """
+        self.result = await self.cmd.asyncExecute(
+            self.switches,
+            paralleliz=self.paralleliz,
+            outputConsole=self.outputConsole,
+            fakeServer=self.fakeServer,
+        )
+        return self.result
+
+    async def asyncCheck(self) -> T.Union[ReqmanResult, None]:
+        """ re-run what have changed since the last check, return the new
+            (merged) ReqmanResult, or None if nothing has changed """
+        mtimes, old = self._scan(), self._mtimes
+        changed = [f for f in set(mtimes) | set(old) if mtimes.get(f) != old.get(f)]
+        self._mtimes = mtimes
+        if not changed:
+            return None
+
+        if (
+            self.result is None
+            or self._broken
+            or self.cmd.rqc in changed
+            or any(f not in mtimes or f not in old for f in changed)  # (removed/added)
+        ):
+            # switches, procs & BEGIN/END are affected -> rebuild all
+            self._broken = True  # (till rebuilt, if it fails)
+            self.cmd = ReqmanCommand(*self.cmd.params)
+            self._mtimes = self._scan()
+            rr = await self.asyncRun()
+            self._broken = False
+            return rr
+
+        self.cmd.reload(changed)
+        self.cmd._r.outputConsole = self.outputConsole
+        rr = await self.cmd._r.asyncExecute(
+            self.switches,
+            self.paralleliz,
+            http=self.fakeServer,
+            only=changed,
+        )
+
+        news = {i.name: i for i in rr.results}
+        results = [news.get(i.name, i) for i in self.result.results]
+        self.result = ReqmanResult(results, self.switches, self.result.env)
+        return self.result
+
+    async def asyncWatch(self, callback: T.Callable, interval: float = 1.0) -> None:
+        """ run all, and re-run the changes forever (callback is called with each new ReqmanResult) """
+        await openSession()
+        try:
+            run = self.asyncRun
+            while True:
+                try:
+                    rr = await run()
+                    if rr is not None:
+                        callback(rr)
+                except RMFormatException as e:  # (a typo while editing : keep watching)
+                    print("\nERROR FORMAT: %s" % e)
+                except RMException as e:
+                    print("\nERROR EXECUTION: %s" % e)
+                await asyncio.sleep(interval)
+                run = self.asyncCheck
+        finally:
+            await closeSession()
+
+
+class ReqmanServer:
+    """ A long-lived reqman (see "reqman serve"), which runs files over a local
+        http api, and streams back the results as json lines.
+        Confs are kept warm : a (files, switches, params) is parsed once, its BEGIN
+        is only executed at the first run (its saved vars & cookies are reused),
+        and its END at the shutdown (or when its conf changes) """
+
+    def __init__(self, fakeServer=None):
+        self.fakeServer = fakeServer
+        self.warms = {}  # (files, switches, params) -> (ReqmanCommand, conf's mtime)
+        self.locks = {}  # (files, switches, params) -> asyncio.Lock
+
+        self.app = aiohttp.web.Application()
+        self.app.router.add_get("/", self.hello)
+        self.app.router.add_post("/run", self.run)
+        self.app.on_startup.append(self._startup)
+        self.app.on_cleanup.append(self._cleanup)
+
+    async def _startup(self, app):
+        await openSession()
+
+    async def _cleanup(self, app):
+        for key in list(self.warms):
+            await self.cool(key)
+        await closeSession()
+
+    @staticmethod
+    def mtime(rqc) -> T.Union[float, None]:
+        return os.path.getmtime(rqc) if rqc and os.path.isfile(rqc) else None
+
+    async def cool(self, key) -> None:
+        """ forget a warm conf, executing its END """
+        cmd, _ = self.warms.pop(key)
+        r = copy.copy(cmd._r)
+        r.outputConsole, r.onReqs = OutputConsole.NO, None
+        try:
+            await r.asyncExecute(list(key[1]), http=self.fakeServer, only=[], end=True)
+        except (RMFormatException, RMException, RMPyException):
+            pass
+
+    @staticmethod
+    def jsonExchange(name: str, ex: Exchange) -> dict:
+        return dict(
+            file=name,
+            method=ex.method,
+            url=ex.url,
+            status=ex.status,
+            info=ex.info,
+            time=ex.time,
+            doc=ex.doc,
+            content=None if ex.status else str(ex.content),
+            tests=[dict(ok=bool(t), name=t.name) for t in ex.tests],
+        )
+
+    async def hello(self, request):
+        return aiohttp.web.json_response(dict(reqman=__version__, warms=len(self.warms)))
+
+    async def run(self, request):
+        """ POST {"files":[...], "switches":[...], "params":{...}, "fresh": false} """
+        o = await request.json()
+        files = o.get("files", [])
+        switches = o.get("switches", [])
+        params = o.get("params", {})
+
+        resp = aiohttp.web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await resp.prepare(request)
+
+        async def send(d: dict):
+            await resp.write((jdumps(d) + "\n").encode())
+
+        key = (tuple(files), tuple(switches), jdumps(params, sort_keys=True))
+        try:
+            async with self.locks.setdefault(key, asyncio.Lock()):  # (a run at a time, per key)
+                if key in self.warms:
+                    cmd, mtime = self.warms[key]
+                    if o.get("fresh") or mtime != ReqmanServer.mtime(cmd.rqc):
+                        await self.cool(key)
+
+                if key in self.warms:
+                    cmd, _ = self.warms[key]
+                    cmd.reload(cmd.files)  # (the ymls only, the conf is kept)
+                    only = cmd.files  # BEGIN already done, END at the shutdown
+                else:
+                    cmd = ReqmanCommand(*(files + ["%s:%s" % (k, v) for k, v in params.items()]))
+                    if not all([s in [i[0] for i in cmd.switches] for s in switches]):
+                        raise RMException("bad switch")
+                    if cmd.nbFiles < 1:
+                        raise RMException("no yml files found")
+                    only = None
+
+                queue = asyncio.Queue()
+                r = copy.copy(cmd._r)  # (its own callback, but the same warm env)
+                r.outputConsole = OutputConsole.NO
+                r.onReqs = queue.put_nowait
+                task = asyncio.ensure_future(
+                    r.asyncExecute(
+                        switches, http=self.fakeServer, only=only, begin=only is None, end=False
+                    )
+                )
+                task.add_done_callback(lambda t: queue.put_nowait(None))
+                while True:
+                    reqs = await queue.get()
+                    if reqs is None:
+                        break
+                    for ex in reqs.exchanges:
+                        await send(self.jsonExchange(reqs.name, ex))
+
+                rr = task.result()
+                if only is None:  # BEGIN is done : warm
+                    self.warms[key] = (cmd, ReqmanServer.mtime(cmd.rqc))
+                await send(dict(ok=rr.ok, total=rr.total, code=rr.code, nbReqs=rr.nbReqs))
+        except (RMFormatException, RMException, RMPyException) as e:
+            await send(dict(error=str(e)))
+
+        await resp.write_eof()
+        return resp
+
+    def serve(self, port: int = 8080, host: str = "127.0.0.1"):
+        aiohttp.web.run_app(self.app, host=host, port=port)
 
 
 class ReqmanRMR(ReqmanCommand):
@@ -2215,6 +4480,7 @@ class ReqmanRMR(ReqmanCommand):
         switches2=[],
         outputConsole=OutputConsole.MINIMAL,
         fakeServer=None,
+        reordered=False,
     ) -> ReqmanDualResult:
         raise RMException("not implemented")
 
@@ -2274,6 +4540,7 @@ div.hide > h4 {background:white}
 div.h {display:flex; flex-flow: row nowrap;padding-left:10px}
 div.h > div {flex: 1 0 50%}
 .nonp * {color:#888 !important;text-decoration: line-through;}
+div.d {padding-left:10px;color:#C60;font-size:0.9em}
 .expanderContent   {
     padding: 0;
     max-height: 700px;
@@ -2328,6 +4595,9 @@ function copyToClipboard( obj ) {
         <span style="float:right;padding:4px"><b>{{", ".join(i["switches"])}}</b> {{i["date"].strftime("%Y-%m-%d %H:%M:%S")}}<br/>
             <span style="float:right">{{i["title"]}}</span>
         </span>
+        %for s in i.get("sampled", []):
+        <div style="font-size:0.8em">sampled {{s}}</div>
+        %end
     </div>
 %end
 </div>
@@ -2337,7 +4607,7 @@ function copyToClipboard( obj ) {
 <div class="f">
     <h3>File: {{relpath(r.name)}}</h3>
 
-    %for ex in r.exchanges:
+    %for idx,ex in enumerate(r.exchanges):
         % isLimit=not first(ex).nolimit
     <div class="r hide">
         <h4 class="click" onclick="this.parentElement.classList.toggle('hide')" title="Click to show/hide details">
@@ -2358,7 +4628,7 @@ function copyToClipboard( obj ) {
 <b>{{k}}</b>: {{limit(v,isLimit and LIMIT.HEADERVALUE)}}
 %end
 {{limit(prettify(x.bodyContent),isLimit and LIMIT.BODY)}}</pre>
---> {{x.info}}
+--> {{x.info}}{{" (waited %sms)" % int(x.wait) if getattr(x,"wait",0) >= 1 else ""}}{{" (attempts: %s)" % ", ".join([str(i[0]) for i in x.attempts]) if len(getattr(x,"attempts",[])) > 1 else ""}}
 
 <pre>
 %for k,v in genKV(x.outHeaders):
@@ -2387,6 +4657,10 @@ function copyToClipboard( obj ) {
     </div>
 %end
 </div>
+%d=diffOf(r,idx)
+%if d:
+<div class="d" title="{{limit(repr(d),LIMIT.BODY)}}">changed: {{limit(", ".join(d.paths),LIMIT.DOC)}}</div>
+%end
 
     </div>
     %end
@@ -2395,6 +4669,17 @@ function copyToClipboard( obj ) {
 </div>
 %end
 %end
+
+%if getattr(result,"drifts",None):
+<div class="f">
+    <h3>Drifting paths ({{result.nbDiffs}} exchange(s) differ)</h3>
+    <table>
+    %for path,nb in result.drifts.most_common():
+        <tr><td class="KO">{{path}}</td><td>{{nb}}</td></tr>
+    %end
+    </table>
+</div>
+%end
 </body>
 </html>
 """
@@ -2423,19 +4708,27 @@ function copyToClipboard( obj ) {
         except:
             return p
 
-    return stpl.template(
+    def diffOf(r, idx):
+        diffs = getattr(r, "diffs", None)
+        return diffs[idx] if diffs else None
+
+    t = PROFILER.start()
+    html = stpl.template(
         template,
         result=rr,
         prettify=prettify,
         discover=discover,
         first=first,
         relpath=relpath,
+        diffOf=diffOf,
         first_path=first_path,
         version=__version__,
         limit=limit,
         LIMIT=LIMIT,
         genKV=genKV,
     )
+    PROFILER.stop(t, "render")
+    return html
 
 
 def mkUrl(protocol: str, host: str, port=None) -> str:
@@ -2477,7 +4770,7 @@ def extractParams(params):
         if param.startswith("--"):
             # reqman param
             p = param[2:]
-            if p.startswith("o") or p.startswith("x"):
+            if p.startswith("o") or p.startswith("x") or p.split(":")[0] in LONGOPTIONS:
                 rparams.append(p)
             else:  # ability to group param (ex: --kspb)
                 for i in p:
@@ -2551,6 +4844,13 @@ def main(fakeServer=None, hookResults=None) -> int:
 
             return 0
 
+        if len(params) in [1, 2] and params[0].lower() == "serve":
+            ## SERVE USAGE
+            ReqmanServer(fakeServer=fakeServer).serve(
+                int(params[1]) if len(params) == 2 else 8080
+            )
+            return 0
+
         # control options
         paralleliz = False
         outputConsole = OutputConsole.MINIMAL
@@ -2559,6 +4859,13 @@ def main(fakeServer=None, hookResults=None) -> int:
         saveRMR = False
         replayRMR = False
         outputContent=None
+        watch = False
+        workers = None
+        profile = None
+        failfast = None
+        rerun = False
+        sampling = None
+        reordered = False
         for p in rparams:
             if p == "k":
                 outputConsole = OutputConsole.MINIMAL_ONLYKO
@@ -2591,16 +4898,78 @@ def main(fakeServer=None, hookResults=None) -> int:
                 outputContent = p[1:].strip(":= ")
                 if not outputContent:
                     raise RMCommandException("You should provide a var'name with --x:<varname>")
+            elif p == "watch":
+                watch = True
+            elif p == "reordered":
+                reordered = True
+            elif p == "rerun-failed":
+                if not rmrFile:
+                    raise RMCommandException("Can't rerun failed requests, you'll need a rmr file")
+                rerun = True
+            elif p.startswith("profile"):
+                profile = p[7:].strip(":= ") or True
+            elif p.startswith("failfast"):
+                try:
+                    failfast = FailFast(
+                        *[int(i) for i in p[8:].strip(":= ").split(",") if i.strip()]
+                    )
+                except (ValueError, TypeError):
+                    raise RMCommandException(
+                        "You should provide numbers with --failfast:<N>[,<M>]"
+                    )
+            elif p.startswith("sample"):
+                try:
+                    size, _, seed = p[6:].strip(":= ").partition(",")
+                    sampling = sampling or Sampling()
+                    sampling.size = Sampling.parseSize(size)
+                    sampling.seed = int(seed or 0)
+                except ValueError:
+                    raise RMCommandException(
+                        "You should provide a rate or a number with --sample:<N%>|<N>[,<seed>]"
+                    )
+            elif p.startswith("shard"):
+                try:
+                    i, n = [int(i) for i in p[5:].strip(":= ").split("/")]
+                    assert 1 <= i <= n
+                except (ValueError, AssertionError):
+                    raise RMCommandException("You should provide a shard with --shard:<i>/<n>")
+                sampling = sampling or Sampling()
+                sampling.shard = (i, n)
+            elif p.startswith("workers"):
+                try:
+                    workers = int(p[7:].strip(":= "))
+                except ValueError:
+                    raise RMCommandException("You should provide a number with --workers:<N>")
             else:
                 raise RMCommandException("bad option '%s'" % p)
 
+        PROFILER.enable(bool(profile))
+
+        def output(rr):
+            if outputHtmlFile:
+                with codecs.open(outputHtmlFile, "w+", "utf-8-sig") as fid:
+                    fid.write(rr.html)
+
+        if watch and (dswitches or rmrFile or saveRMR or outputContent):
+            raise RMCommandException("Can't watch in dual/rmr/save/x mode")
+        if workers and (dswitches or rmrFile or watch):
+            raise RMCommandException("Can't use workers in dual/rmr/watch mode")
+        if failfast and (dswitches or rmrFile or watch or workers):
+            raise RMCommandException("Can't failfast in dual/rmr/watch/workers mode")
+        if sampling and (dswitches or rmrFile or watch or workers):
+            raise RMCommandException("Can't sample/shard in dual/rmr/watch/workers mode")
+        if rerun and (switches or dswitches or replayRMR or workers):
+            raise RMCommandException("Can't rerun failed requests with switches/dual/replay/workers")
+        if reordered and not (dswitches or replayRMR):
+            raise RMCommandException("Can't align reordered exchanges, without a dual mode")
+
         loop = asyncio.get_event_loop()
         if dswitches:
             # dual mode -> ReqmanDualResult
             if rmrFile:
-                r = ReqmanRMR(ReqmanResult.fromRMR(rmrFile))
-
-                rr1 = ReqmanResult.fromRMR(rmrFile)
+                rmr = ReqmanResult.fromRMR(rmrFile)
+                rr1 = rmr.snapshot()  # (the replay will re-execute its Reqs)
+                r = ReqmanRMR(rmr)
                 rr2 = loop.run_until_complete(
                     r.asyncExecute(
                         dswitches,
@@ -2609,7 +4978,7 @@ def main(fakeServer=None, hookResults=None) -> int:
                         fakeServer=fakeServer,
                     )
                 )
-                rr = ReqmanDualResult(rr1, rr2)
+                rr = ReqmanDualResult(rr1, rr2, reordered=reordered)
             else:
                 r = ReqmanCommand(*files)
                 if saveRMR:
@@ -2628,19 +4997,30 @@ def main(fakeServer=None, hookResults=None) -> int:
                         dswitches,
                         outputConsole=outputConsole,
                         fakeServer=fakeServer,
+                        reordered=reordered,
                     )
                 )
         else:
             # single mode -> ReqmanResult or ReqmanDualResult
             if rmrFile:
                 rmr = ReqmanResult.fromRMR(rmrFile)
-                if not switches:
+                if rerun:  # -> ReqmanResult (the previous one, with the re-executed requests)
+                    r = ReqmanRMR(rmr)
+                    rr = loop.run_until_complete(
+                        r.asyncExecute(
+                            rmr.switches,
+                            paralleliz=paralleliz,
+                            outputConsole=outputConsole,
+                            fakeServer=fakeServer,
+                            subset=Slice.failed(rmr),
+                        )
+                    )
+                elif not switches:
                     if replayRMR:  # -> ReqmanDualResult
+                        rr1 = rmr.snapshot()  # (the replay will re-execute its Reqs)
                         r = ReqmanRMR(rmr)
 
-                        rr1 = ReqmanResult.fromRMR(
-                            rmrFile
-                        )  # vv redeclare used switches (important ! fix 2.0.1)
+                        # vv redeclare used switches (important ! fix 2.0.1)
                         rr2 = loop.run_until_complete(
                             r.asyncExecute(
                                 rmr.switches,
@@ -2649,7 +5029,7 @@ def main(fakeServer=None, hookResults=None) -> int:
                                 fakeServer=fakeServer,
                             )
                         )
-                        rr = ReqmanDualResult(rr1, rr2)
+                        rr = ReqmanDualResult(rr1, rr2, reordered=reordered)
                     else:
                         rr = rmr
                 else:
@@ -2669,22 +5049,49 @@ def main(fakeServer=None, hookResults=None) -> int:
                 if r.nbFiles < 1:
                     raise RMCommandException("no yml files found")
 
+                if watch:
+                    w = ReqmanWatcher(
+                        r,
+                        switches,
+                        paralleliz=paralleliz,
+                        outputConsole=outputConsole,
+                        fakeServer=fakeServer,
+                    )
+                    try:
+                        loop.run_until_complete(w.asyncWatch(output))
+                    except KeyboardInterrupt:
+                        print("\nWatch stopped")
+                    return w.result.code if w.result else -1
+
+                subset = None
+                if outputContent is not None and not workers:
+                    # only the requests which contribute to the var
+                    subset = Slice.needed(r._r, switches, outputContent)
+
                 rr = loop.run_until_complete(
                     r.asyncExecute(
                         switches,
                         paralleliz=paralleliz,
                         outputConsole=outputConsole,
                         fakeServer=fakeServer,
+                        workers=workers,
+                        failfast=failfast,
+                        subset=subset,
+                        sampling=sampling,
                     )
                 )
 
+        if isinstance(rr, ReqmanDualResult) and outputConsole != OutputConsole.NO:
+            print("DIFF: %s exchange(s) differ" % rr.nbDiffs)
+            for path, nb in rr.drifts.most_common(10):
+                print("  -", cy(path), ":", nb)
+
         if saveRMR:
             if isinstance(rr, ReqmanResult):
                 print("Save RMR:", rr.saveRMR("reqman.rmr" if saveRMR == 2 else None))
 
-        if outputHtmlFile:
-            with codecs.open(outputHtmlFile, "w+", "utf-8-sig") as fid:
-                fid.write(rr.html)
+        if outputHtmlFile and outputContent is None:
+            output(rr)
             if openBrowser:
                 try:
                     import webbrowser
@@ -2693,6 +5100,14 @@ def main(fakeServer=None, hookResults=None) -> int:
                 except:
                     pass
 
+        if profile:
+            print("PROFILE:")
+            print(PROFILER.report())
+            if type(profile) is str:
+                PROFILER.dump(profile)
+                print("Save profile:", profile)
+            PROFILER.enable(False)
+
         if hookResults is not None:  # for tests only
             hookResults.rr = rr
 
@@ -2700,6 +5115,11 @@ def main(fakeServer=None, hookResults=None) -> int:
             x=r._r.env.get(outputContent,None)
             if x is None:
                 x=r._r.env.globals.get(outputContent,None)
+            if x is None:  # saved in a file (the last one)
+                for reqs in reversed(getattr(rr, "results", [])):
+                    if isinstance(reqs, Reqs) and outputContent in reqs.env.shared:
+                        x=reqs.env.shared[outputContent]
+                        break
 
             if x :
                 if isPython(x):
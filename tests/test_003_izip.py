@@ -98,3 +98,33 @@ def test_zip_nimp():
 
     assert "[(1, None), (None, 2)]" == str(reqman.izip(ex1,ex2))
     assert not reqman.comparable(reqman.izip(ex1,ex2))
+
+def test_zip_reordered():
+    ex1 = [Ex(id=1), Ex(id=2), Ex(id=3)]
+    ex2 = [Ex(id=9), Ex(id=3), Ex(id=2), Ex(id=8), Ex(id=1)]
+
+    assert "[(None, 9), (1, 1), (2, 2), (None, 8), (3, 3)]" == str(reqman.izip(ex1,ex2,reordered=True))
+
+def test_zip_big():
+    ex1 = [Ex(id=i) for i in range(20000)]
+    ex2 = [Ex(id=i) for i in range(0,20000,2)] + [Ex(id=-i) for i in range(1,3000)]
+
+    l = reqman.izip(ex1,ex2)
+    assert len([1 for a,b in l if a and b]) == 10000
+    assert len([1 for a,b in l if a is None]) == 2999
+
+def test_aligner():
+    class R:
+        def __init__(self,name,ids):
+            self.name=name
+            self.exchanges=[Ex(id=i) for i in ids]
+
+    a = reqman.DualAligner()
+    a.feed(0, R("f1",[1,2]))
+    a.feed(1, R("f2",[3]))
+    assert a.pending == ({"f1":a.pending[0]["f1"]}, {"f2":a.pending[1]["f2"]})
+    a.feed(1, R("f1",[2]))
+    assert "f1" not in a.pending[0] and "f1" in a.aligned
+    assert "[(1, None), (2, 2)]" == str(a.get("f1"))
+    assert "[(None, 3)]" == str(a.get("f2"))
+    assert a.aligned == {} and a.pending == ({},{})
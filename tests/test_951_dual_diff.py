@@ -0,0 +1,81 @@
+import reqman, pytest, json
+
+MOCK = {
+    "http://a/1": (200, json.dumps(dict(id=1, items=[dict(v=1), dict(v=2)], old=True))),
+    "http://b/1": (200, json.dumps(dict(id=1, items=[dict(v=1), dict(v=3)], new=True))),
+    "http://a/2": (200, "<a><b>1</b></a>"),
+    "http://b/2": (200, "<a><b>2</b></a>"),
+    "http://a/3": (200, "line1\nline2"),
+    "http://b/3": (201, "line1\nline2\nline3"),
+    "http://a/4": (200, "same"),
+    "http://b/4": (200, "same"),
+}
+
+
+def test_json():
+    d = list(reqman.Diff.json(dict(a=[1, 2], b=dict(c=1), x=1), dict(a=[1], b=dict(c="1"), y=2)))
+    assert d == [
+        ("json.a.1", "-", 2, None),
+        ("json.b.c", "~", 1, "1"),
+        ("json.x", "-", 1, None),
+        ("json.y", "+", None, 2),
+    ]
+    assert list(reqman.Diff.json(dict(a=1), dict(a=True))) == [("json.a", "~", 1, True)]
+
+
+def test_dual_diff(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("""
+root: http://a
+switches:
+  other:
+    root: http://b
+""")
+
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- GET: /<<i>>
+  foreach:
+    - i: 1
+    - i: 2
+    - i: 3
+    - i: 4
+""")
+
+    x = exe(".", "+other", fakeServer=MOCK)
+    assert x.rc == 0
+    rr = x.rr
+    diffs = rr.results[0].diffs
+    assert diffs[0].kind == "json"
+    assert diffs[0].paths == ["json.items.*.v", "json.new", "json.old"]
+    assert diffs[1].kind == "xml"
+    assert diffs[2].kind == "text"
+    assert diffs[2].changes == [("status", "~", 200, 201), ("content@3", "+", None, "line3")]
+    assert diffs[3] is None
+
+    assert rr.nbDiffs == 3
+    assert rr.drifts["json.new"] == 1
+    assert "DIFF: 3 exchange(s) differ" in x.console
+    assert "Drifting paths" in rr.html
+    assert "changed: json.items.*.v, json.new, json.old" in rr.html
+
+
+def test_dual_reordered(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://a\nfirst: false\nswitches:\n  other:\n    root: http://b\n    first: true\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: /2\n  if: <<first>>\n- GET: /4\n- GET: /2\n  if: <<first|not>>\n")
+    with open("reqman.conf", "a") as fid:
+        fid.write("not: return not x\n")
+
+    x = exe(".", "+other", fakeServer=MOCK)
+    pairs = [(a and a.path, b and b.path) for a, b in x.rr.results[0].exchanges]
+    assert pairs == [("/4", None), ("/2", "/2"), (None, "/4")]  # in order
+
+    x = exe(".", "+other", "--reordered", fakeServer=MOCK)
+    pairs = [(a and a.path, b and b.path) for a, b in x.rr.results[0].exchanges]
+    assert pairs == [("/4", "/4"), ("/2", "/2")]
+    assert x.rr.nbDiffs == 1  # /2 : <b>1</b> vs <b>2</b>
+
+    x = exe(".", "--reordered", fakeServer=MOCK)
+    assert x.rc == -1  # not in a dual mode
@@ -0,0 +1,36 @@
+import reqman, pytest, asyncio, aiohttp.web
+from aiohttp.test_utils import TestServer
+
+
+@pytest.mark.asyncio
+async def test_offload(monkeypatch):
+    r, wait, t = await reqman.offload(10, sum, [1, 2])
+    assert r == 3 and wait == 0  # inline
+
+    monkeypatch.setattr(reqman, "OFFLOAD", 0)
+    r, wait, t = await reqman.offload(10, sum, [1, 2])
+    assert r == 3 and wait >= 0 and t >= 0
+    r, wait, t = await reqman.offload(10, reqman.decodeContent, b'{"a": "\\u00e9"}', "application/json")
+    assert r == '{"a": "é"}'.encode()
+
+
+@pytest.mark.asyncio
+async def test_offload_exchange(monkeypatch):
+    monkeypatch.setattr(reqman, "OFFLOAD", 0)
+
+    async def handler(request):
+        return aiohttp.web.Response(body=b'{"v": "\\u00e9"}', content_type="application/json")
+
+    app = aiohttp.web.Application()
+    app.router.add_get("/", handler)
+    async with TestServer(app) as server:
+        url = str(server.make_url("/"))
+        ex = await reqman.asyncExecute("GET", "/", url, None, {})
+        assert str(ex.content) == '{"v": "é"}'
+        assert set(ex.cpu) == {"decode"}
+
+        rr = await reqman.testContent("- GET: %s\n  tests:\n    - json.v: é\n" % url)
+    ex = rr.results[0].exchanges[0]
+    assert all(ex.tests)
+    assert set(ex.cpu) == {"decode", "parse"}  # (the tests run on the loop)
+    assert all(wait >= 0 and t >= 0 for wait, t in ex.cpu.values())
@@ -0,0 +1,47 @@
+import reqman, pickle
+
+
+def test_test_is_compact():
+    tests = [reqman.Test(i % 2, "json.x = 42", "json.x != 42", "4" + "2") for i in range(4)]
+    assert not hasattr(tests[0], "__dict__")
+    assert tests[0].name is tests[2].name  # interned
+    assert tests[0].value is tests[1].value
+    assert sum(tests) == 2 and not all(tests) and any(tests)
+    assert [int(t) for t in tests] == [0, 1, 0, 1] and tests[1] == True
+    assert repr(tests[1]) == "OK: json.x = 42"
+
+    t = pickle.loads(pickle.dumps(tests[1]))
+    assert t and t.name == "json.x = 42" and t.value == "42"
+
+
+def test_exchange_pickle():
+    ex = reqman.Exchange("GET", "/", "http://x/", "body", {"A": "1"}, 200, {"Content-Type": "text/plain"}, reqman.Content("ok"), "", 12)
+    ex.tests = reqman.TestResult([{"status": 200}], reqman.Env(dict(status=200)), 200)
+    assert not hasattr(ex, "__dict__")
+    assert bytes(ex.bodyContent) == b"body"
+    assert ex.outHeaders["content-type"] == "text/plain"
+
+    ex2 = pickle.loads(pickle.dumps(ex))
+    assert (ex2.method, ex2.status, ex2.time, ex2.wait) == ("GET", 200, 12, 0)
+    assert str(ex2.content) == "ok" and all(ex2.tests) and ex2.tests[0].name == "status = 200"
+
+
+def test_old_rmr_objects(monkeypatch):
+    class Test(int):  # as it was pickled, in the old rmr
+        pass
+
+    Test.__qualname__ = "Test"
+    Test.__module__ = "reqman"
+    old = Test(1)
+    old.name, old.value = "status = 200", "200"
+    monkeypatch.setattr(reqman, "Test", Test)
+    buf = pickle.dumps(old)
+    monkeypatch.undo()
+
+    t = pickle.loads(buf)
+    assert type(t) is reqman.Test
+    assert t and t.name == "status = 200" and t.value == "200"
+
+    ex = reqman.Exchange.__new__(reqman.Exchange)
+    ex.__setstate__(dict(id="x", method="GET", status=200, bodyContent=None, tests=[t]))
+    assert ex.id == "x" and ex.cpu == {} and not ex.skipped and all(ex.tests)
@@ -0,0 +1,91 @@
+import reqman, pytest, json
+
+MOCK = {"http://x/item/%s" % i: (200, "ok") for i in range(100)}
+
+
+def ids(x):
+    return [int(ex.url.split("/")[-1]) for ex in x.rr.results[1].exchanges]
+
+
+def test_sampling_rows():
+    rows = [dict(id=i, kind="ab"[i % 2]) for i in range(100)]
+
+    s = reqman.Sampling(0.1, seed=1)
+    sample = list(s.rows(rows, name="f"))
+    assert 3 < len(sample) < 20
+    assert sample == list(reqman.Sampling(0.1, seed=1).rows(iter(rows)))  # deterministic
+    assert sample != list(reqman.Sampling(0.1, seed=2).rows(rows))
+    assert sample == sorted(sample, key=lambda r: r["id"])  # in their order
+    assert s.sampled == ["f: %s/100 rows (10%%, seed 1)" % len(sample)]
+
+    sample = list(s.rows(rows, dict(size=3, by="kind")))
+    assert len(sample) == 6
+    assert len([r for r in sample if r["kind"] == "a"]) == 3
+
+    sample = list(reqman.Sampling(0.001).rows(rows, dict(by="kind")))
+    assert sorted(r["kind"] for r in sample) == ["a", "b"]  # at least one per value
+
+    shards = [list(reqman.Sampling(shard=(i, 3)).rows(rows)) for i in [1, 2, 3]]
+    assert sum(len(i) for i in shards) == 100
+    assert not set(r["id"] for r in shards[0]) & set(r["id"] for r in shards[1])
+
+    with pytest.raises(ValueError):
+        reqman.Sampling.parseSize("0%")
+    with pytest.raises(ValueError):
+        reqman.Sampling.parseGroup(dict(size=2, bad=1))
+
+
+def test_sample_option(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nall: %s\n" % json.dumps([dict(id=i) for i in range(100)]))
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: /item/<<id>>\n  foreach: <<all>>\n")
+
+    x = exe("f.yml", fakeServer=MOCK)
+    assert len(ids(x)) == 100
+
+    x = exe("f.yml", "--sample:5,42", "--o:out.html", fakeServer=MOCK)
+    assert len(ids(x)) == 5
+    (sampled,) = x.rr.infos[0]["sampled"]
+    assert sampled.endswith("f.yml /item/<<id>>: 5/100 rows (5, seed 42)")
+    assert "SAMPLED:" in x.console
+    assert "5/100 rows" in open("out.html").read()
+    assert ids(x) == ids(exe("f.yml", "--sample:5,42", fakeServer=MOCK))
+
+    x = exe("f.yml", "--shard:2/4", fakeServer=MOCK)
+    assert ids(x) == list(range(1, 100, 4))
+
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: /item/<<id>>\n  foreach: <<all>>\n  sample: 2\n")
+    x = exe("f.yml", "--sample:50%", fakeServer=MOCK)
+    assert len(ids(x)) == 2  # the group's override
+    x = exe("f.yml", fakeServer=MOCK)
+    assert len(ids(x)) == 100  # (only when sampling)
+
+    x = exe("f.yml", "--sample:x", fakeServer=MOCK)
+    assert x.rc == -1
+    x = exe("f.yml", "--shard:3/2", fakeServer=MOCK)
+    assert x.rc == -1
+
+
+def test_shard_nested(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nproc:\n  - GET: /a/<<o>>/<<i>>\n    foreach:\n      - i: 0\n      - i: 1\n")
+    with open("a.yml", "w+") as fid:
+        fid.write("- call: proc\n  foreach:\n    - o: 0\n    - o: 1\n")
+    MOCK = {"http://x/a/%s/%s" % (o, i): (200, "ok") for o in "01" for i in "01"}
+
+    urls = []
+    for shard in ["1/2", "2/2"]:
+        x = exe("a.yml", "--shard:" + shard, fakeServer=MOCK)
+        urls.append([ex.url[len("http://x"):] for ex in x.rr.results[1].exchanges])
+        (sampled,) = x.rr.infos[0]["sampled"]  # the outer one, once
+        assert sampled.endswith("a.yml /a/<<o>>/<<i>>: 1/2 rows (shard %s)" % shard)
+    assert urls == [["/a/0/0", "/a/0/1"], ["/a/1/0", "/a/1/1"]]
+
+    x = exe("a.yml", "--sample:1", fakeServer=MOCK)
+    assert len(x.rr.results[1].exchanges) == 1
+    assert [i.split(": ")[-1] for i in x.rr.infos[0]["sampled"]] == [
+        "1/2 rows (1, seed 0)",
+        "1/2 rows (1, seed 0)",  # the nested one, for its outer row
+    ]
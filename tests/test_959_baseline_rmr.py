@@ -0,0 +1,32 @@
+import reqman, os, shutil
+
+# baseline.rmr was saved by reqman 2.11 (before the call templates, retry, form ...),
+# from "f.yml" : a call of a proc (foreach o, in a foreach i), a POST, and a KO GET /ko
+OLD = os.path.join(os.path.dirname(__file__), "baseline.rmr")
+
+
+def mock(fixed):
+    MOCK = {"http://x/login": (200, "tok"), "http://x/p": (200, "ok")}
+    for o in "01":
+        for i in "01":
+            MOCK["http://x/a/%s/%s" % (o, i)] = (200, "ok")
+    MOCK["http://x/ko"] = (200, "ok") if fixed else (500, "ko")
+    return MOCK
+
+
+def test_load_old_rmr():
+    rr = reqman.ReqmanResult.fromRMR(OLD)
+    assert rr.ok == 5 and rr.total == 6
+    g = [i for i in rr.results[1] if isinstance(i, reqman.ReqGroup)][0]
+    assert len(g.reqs) == 1 and g.overlays is None and g.sample is None
+    req = g.reqs[0].reqs[0]
+    assert (req.retry, req.form, req.partial) == (None, None, None)
+    assert "/a/<<o>>/<<i>>" in repr(req)
+
+
+def test_replay_old_rmr(exe):
+    shutil.copy(OLD, "old.rmr")
+    x = exe("old.rmr", "--r", fakeServer=mock(False))
+    assert "BUG" not in x.console
+    assert x.rr.ok == 5 + 5 and x.rr.total == 6 + 6  # the old and the replayed run
+
@@ -0,0 +1,123 @@
+import reqman, asyncio, pytest, os
+
+CALLS = []
+
+def count(method, url, body, headers):
+    CALLS.append(url)
+    return 200, "ok"
+
+MOCK = {
+    "http://x/begin": count,
+    "http://x/a": count,
+    "http://x/b": count,
+    "http://x/b2": count,
+}
+
+
+def touch(f, content):
+    mtime = os.path.getmtime(f) if os.path.isfile(f) else 0
+    with open(f, "w+") as fid:
+        fid.write(content)
+    os.utime(f, (mtime + 10, mtime + 10))  # ensure mtime changes
+
+
+def test_watch(exe):  # exe: just for the temp folder
+    touch("reqman.conf", """
+root: http://x
+BEGIN:
+    - GET: /begin
+      save: token
+""")
+    touch("a.yml", "- GET: /a\n  tests:\n    - status: 200\n")
+    touch("b.yml", "- GET: /b\n  tests:\n    - status: 200\n")
+
+    CALLS.clear()
+    w = reqman.ReqmanWatcher(reqman.ReqmanCommand("."), fakeServer=MOCK)
+    loop = asyncio.get_event_loop()
+
+    rr = loop.run_until_complete(w.asyncRun())
+    assert CALLS == ["http://x/begin", "http://x/a", "http://x/b"]
+    assert rr.total == 2
+
+    CALLS.clear()
+    assert loop.run_until_complete(w.asyncCheck()) is None
+    assert CALLS == []
+
+    # a changed file is the only one re-runned (no BEGIN)
+    touch("b.yml", "- GET: /b2\n  tests:\n    - status: 200\n    - content: ok\n")
+    rr = loop.run_until_complete(w.asyncCheck())
+    assert CALLS == ["http://x/b2"]
+    assert rr.total == 3 and rr.ok == 3
+    assert [os.path.basename(i.name) for i in rr.results] == ["BEGIN", "a.yml", "b.yml", "END"]
+    assert "/b2" in rr.html
+
+    # a changed reqman.conf re-runs all
+    CALLS.clear()
+    touch("reqman.conf", "root: http://x\n")
+    rr = loop.run_until_complete(w.asyncCheck())
+    assert CALLS == ["http://x/a", "http://x/b2"]
+    assert rr.total == 3
+
+
+def test_watch_bad_mode(exe):
+    touch("a.yml", "- GET: /a\n")
+    x = exe("a.yml", "+sw", "--watch")
+    assert x.rc == -1
+    assert "Can't watch" in x.console
+
+
+def test_watch_begin_cookies(exe):
+    touch("reqman.conf", "root: http://x\nBEGIN:\n    - GET: /login\n")
+    touch("a.yml", "- GET: /a\n  tests:\n    - status: 200\n")
+
+    def login(method, url, body, headers):
+        CALLS.append(url)
+        return 200, "ok", {"Set-Cookie": "sid=42; Path=/"}
+
+    def auth(method, url, body, headers):
+        CALLS.append(url)
+        return (200, "ok") if headers.get("Cookie") == "sid=42" else (401, "ko")
+
+    mock = {"http://x/login": login, "http://x/a": auth, "http://x/c": auth}
+    w = reqman.ReqmanWatcher(reqman.ReqmanCommand("."), fakeServer=mock)
+    loop = asyncio.get_event_loop()
+    assert loop.run_until_complete(w.asyncRun()).ok == 1  # BEGIN's cookie is sent
+
+    CALLS.clear()
+    touch("a.yml", "- GET: /a\n  tests:\n    - status: 200\n    - content: ok\n")
+    rr = loop.run_until_complete(w.asyncCheck())
+    assert CALLS == ["http://x/a"]
+    assert rr.ok == 2 and rr.total == 2  # still authenticated, without BEGIN
+
+    # a new yml in the watched folder
+    CALLS.clear()
+    touch("c.yml", "- GET: /c\n  tests:\n    - status: 200\n")
+    rr = loop.run_until_complete(w.asyncCheck())
+    assert "http://x/c" in CALLS
+    assert [os.path.basename(i.name) for i in rr.results] == ["BEGIN", "a.yml", "c.yml", "END"]
+    assert rr.ok == rr.total == 3
+
+
+def test_watch_typo(exe, capsys):
+    touch("reqman.conf", "root: http://x\n")
+    touch("a.yml", "- GET: /a\n")
+    w = reqman.ReqmanWatcher(reqman.ReqmanCommand("."), fakeServer=MOCK, outputConsole=reqman.OutputConsole.NO)
+    results = []
+
+    async def go():
+        task = asyncio.ensure_future(w.asyncWatch(results.append, 0.01))
+        await asyncio.sleep(0.1)
+        touch("a.yml", "- GET: /a\n  nimp: 1\n")  # a typo : the watch goes on
+        await asyncio.sleep(0.1)
+        touch("reqman.conf", "root: http://x\nBEGIN: [\n")  # a broken conf too
+        await asyncio.sleep(0.1)
+        touch("reqman.conf", "root: http://x\n")
+        touch("a.yml", "- GET: /b\n")
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    CALLS.clear()
+    asyncio.get_event_loop().run_until_complete(go())
+    assert "ERROR FORMAT:" in capsys.readouterr().out
+    assert len(results) == 2
+    assert CALLS == ["http://x/a", "http://x/b"]  # rebuilt, when fixed
@@ -0,0 +1,117 @@
+import reqman, pytest, json, os, asyncio
+from aiohttp.test_utils import TestServer, TestClient
+
+CALLS = []
+
+def count(method, url, body, headers):
+    CALLS.append(url)
+    return 200, "ok"
+
+MOCK = {
+    "http://x/begin": count,
+    "http://x/a": count,
+}
+
+async def post(client, **k):
+    r = await client.post("/run", json=k)
+    assert r.status == 200
+    return [json.loads(i) for i in (await r.text()).splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_serve(exe):  # exe: just for the temp folder
+    with open("reqman.conf", "w+") as fid:
+        fid.write("""
+root: http://x
+BEGIN:
+    - GET: /begin
+      save: token
+""")
+    with open("a.yml", "w+") as fid:
+        fid.write("- GET: /a\n  tests:\n    - status: 200\n")
+
+    CALLS.clear()
+    s = reqman.ReqmanServer(fakeServer=MOCK)
+    async with TestClient(TestServer(s.app)) as client:
+        ll = await post(client, files=["a.yml"])
+        assert CALLS == ["http://x/begin", "http://x/a"]
+        assert [i.get("url") for i in ll] == ["http://x/begin", "http://x/a", None]
+        assert ll[1]["tests"] == [dict(ok=True, name="status = 200")]
+        assert ll[-1] == dict(ok=1, total=1, code=0, nbReqs=2)
+
+        # the conf is warm : no more BEGIN
+        CALLS.clear()
+        ll = await post(client, files=["a.yml"])
+        assert CALLS == ["http://x/a"]
+        assert ll[-1]["ok"] == 1
+
+        # unless forced
+        CALLS.clear()
+        ll = await post(client, files=["a.yml"], fresh=True)
+        assert CALLS == ["http://x/begin", "http://x/a"]
+
+        ll = await post(client, files=["a.yml"], switches=["unknown"])
+        assert ll == [dict(error="bad switch")]
+
+        r = await client.get("/")
+        assert (await r.json())["warms"] == 1
+
+
+@pytest.mark.asyncio
+async def test_serve_session(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nBEGIN:\n    - GET: /login\nEND:\n    - GET: /logout\n")
+    with open("a.yml", "w+") as fid:
+        fid.write("- GET: /a\n  tests:\n    - status: 200\n")
+
+    def login(method, url, body, headers):
+        CALLS.append(url)
+        return 200, "ok", {"Set-Cookie": "sid=42; Path=/"}
+
+    def auth(method, url, body, headers):
+        CALLS.append(url)
+        return (200, "ok") if headers.get("Cookie") == "sid=42" else (401, "ko")
+
+    mock = {"http://x/login": login, "http://x/a": auth, "http://x/logout": auth}
+    CALLS.clear()
+    s = reqman.ReqmanServer(fakeServer=mock)
+    async with TestClient(TestServer(s.app)) as client:
+        ll = await post(client, files=["a.yml"])
+        assert CALLS == ["http://x/login", "http://x/a"]  # no END
+        (cmd, _), = s.warms.values()
+
+        CALLS.clear()
+        ll = await post(client, files=["a.yml"])
+        assert CALLS == ["http://x/a"]
+        assert ll[-1]["ok"] == 1  # BEGIN's session is still alive
+        assert list(s.warms.values())[0][0] is cmd  # not parsed again
+
+        CALLS.clear()
+    assert CALLS == ["http://x/logout"]  # END, at the shutdown
+    assert s.warms == {}
+
+
+@pytest.mark.asyncio
+async def test_serve_cold_failure(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nBEGIN:\n    - GET: /begin\n")
+    with open("a.yml", "w+") as fid:
+        fid.write("- GET: /a\n  nimp: 1\n")  # broken
+
+    CALLS.clear()
+    s = reqman.ReqmanServer(fakeServer=MOCK)
+    async with TestClient(TestServer(s.app)) as client:
+        ll = await post(client, files=["a.yml"])
+        assert "error" in ll[-1]
+        assert s.warms == {}  # not warm, BEGIN wasn't done
+
+        with open("a.yml", "w+") as fid:
+            fid.write("- GET: /a\n")
+        CALLS.clear()
+        ll = await post(client, files=["a.yml"])
+        assert CALLS == ["http://x/begin", "http://x/a"]
+
+        # concurrent runs of a cold key : only one BEGIN
+        CALLS.clear()
+        ll = await asyncio.gather(*[post(client, files=["a.yml"], fresh=i == 0) for i in range(2)])
+        assert CALLS == ["http://x/begin", "http://x/a", "http://x/a"]
@@ -0,0 +1,88 @@
+import reqman, pytest, os
+
+MOCK = {
+    "http://x/begin": (200, "tok"),
+    "http://x/tok/1": (200, "ok"),
+    "http://x/tok/2": (200, "ok"),
+    "http://x/tok/3": (200, "ok"),
+    "http://x/tok/4": (200, "ko"),
+    "http://x/end": (200, "ok"),
+}
+
+
+def test_workers(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("""
+root: http://x
+BEGIN:
+    - GET: /begin
+      save: token
+END:
+    - GET: /end
+""")
+    for i in range(1, 5):
+        with open("f%s.yml" % i, "w+") as fid:
+            fid.write("- GET: /<<token>>/%s\n  tests:\n    - content: ok\n" % i)
+
+    x = exe(".", "--o:serial.html", fakeServer=MOCK)
+    assert x.rc == 1
+    serial = x.rr
+
+    x = exe(".", "--workers:3", "--o:workers.html", fakeServer=MOCK)
+    assert x.rc == 1
+    rr = x.rr
+    assert [os.path.basename(i.name) for i in rr.results] == [
+        os.path.basename(i.name) for i in serial.results
+    ]
+    assert [e.url for i in rr.results for e in i.exchanges] == [
+        e.url for i in serial.results for e in i.exchanges
+    ]
+    assert (rr.ok, rr.total, rr.nbReqs) == (serial.ok, serial.total, serial.nbReqs)
+    assert os.path.isfile("workers.html")
+
+
+def test_workers_bad(exe):
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: /a\n")
+    x = exe(".", "--workers:x")
+    assert x.rc == -1
+    assert "--workers:<N>" in x.console
+
+
+def login(method, url, body, headers):
+    return 200, "ok", {"Set-Cookie": "sid=42; Path=/"}
+
+
+def auth(method, url, body, headers):
+    return (200, "ok") if headers.get("Cookie") == "sid=42" else (401, "ko")
+
+
+def test_workers_cookies(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nBEGIN:\n    - GET: /login\n")
+        fid.write("END:\n    - GET: /a\n      tests:\n        - status: 200\n")
+    for i in range(1, 5):
+        with open("f%s.yml" % i, "w+") as fid:
+            fid.write("- GET: /a\n  tests:\n    - status: 200\n")
+
+    x = exe(".", "--workers:2", fakeServer={"http://x/login": login, "http://x/a": auth})
+    assert x.rc == 0
+    assert x.rr.ok == x.rr.total == 5  # the BEGIN's session, in the workers and END
+
+
+def test_workers_spawn(exe, monkeypatch):
+    monkeypatch.setattr(reqman, "WORKERS", "spawn")
+    monkeypatch.setattr(reqman, "EXPOSEDS", {})  # (the ones of the other tests)
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nBEGIN:\n    - GET: /begin\n      save: token\n")
+    for i in range(1, 3):
+        with open("f%s.yml" % i, "w+") as fid:
+            fid.write("- GET: /<<token>>/%s\n  tests:\n    - content: ok\n" % i)
+
+    x = exe(".", "--workers:2", fakeServer=MOCK)
+    assert x.rc == 0 and x.rr.ok == 2
+
+    reqman.EXPOSEDS["fn"] = lambda x: x
+    x = exe(".", "--workers:2", fakeServer=MOCK)
+    assert x.rc == -1
+    assert "not fork" in x.console
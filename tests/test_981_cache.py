@@ -0,0 +1,90 @@
+import reqman, pytest, os, json
+
+CALLS = []
+
+def etag(method, url, body, headers):
+    CALLS.append(dict(headers))
+    if headers.get("If-None-Match") == '"v1"':
+        return 304, ""
+    return 200, "big content", {"ETag": '"v1"'}
+
+def nocache(method, url, body, headers):
+    CALLS.append(dict(headers))
+    return 200, "hello"
+
+MOCK = {
+    "http://x/ref": etag,
+    "http://x/other": nocache,
+}
+
+def test_cache(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\ncache: .cache\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- GET: /ref
+  tests:
+    - status: 200
+    - content: big content
+- POST: /ref
+- GET: /other
+""")
+
+    CALLS.clear()
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    assert "If-None-Match" not in CALLS[0]
+    assert x.rr.nbCached == 0
+    assert os.path.isfile(os.path.join(".cache", "index.json"))
+
+    CALLS.clear()
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    assert CALLS[0]["If-None-Match"] == '"v1"'
+    assert "If-None-Match" not in CALLS[1]  # POST : never cached
+    assert "If-None-Match" not in CALLS[2]  # no validators
+    ex = x.rr.results[1].exchanges[0]
+    assert ex.cached and ex.status == 200 and "(cached)" in ex.info
+    assert x.rr.nbCached == 1
+    assert "3req(s), 1 cached" in x.console
+
+
+def test_cache_lru(tmp_path):
+    c = reqman.HttpCache(str(tmp_path), 25)
+    for i in range(3):
+        c.store("GET", "http://x/%s" % i, {}, 200, {"ETag": "e%s" % i}, reqman.Content("0123456789"), "info")
+    assert sorted([e["url"] for e in c.entries.values()]) == ["http://x/1", "http://x/2"]
+    assert c.validators("GET", "http://x/0", {}) == {}
+    assert c.validators("GET", "http://x/2", {}) == {"If-None-Match": "e2"}
+    assert len(os.listdir(str(tmp_path))) == 2  # 2 bodies (no index, till saved)
+    c.save()
+    assert len(os.listdir(str(tmp_path))) == 4  # 2 bodies + index + its lock
+
+    c2 = reqman.HttpCache(str(tmp_path), 25)  # reloaded from disk
+    assert bytes(c2.load("GET", "http://x/1", {})[2]) == b"0123456789"
+
+
+def test_cache_vary(tmp_path):
+    c = reqman.HttpCache(str(tmp_path), 1000)
+    c.store("GET", "http://x", {"Accept": "a"}, 200, {"ETag": "e", "Vary": "Accept"}, reqman.Content("A"), "info")
+    assert c.validators("GET", "http://x", {"Accept": "a"}) == {"If-None-Match": "e"}
+    assert c.validators("GET", "http://x", {"Accept": "b"}) == {}
+
+
+def test_cache_save_merge(tmp_path):
+    # two processes (--workers) share a cache : the indexes are merged at save
+    c1 = reqman.HttpCache(str(tmp_path), 1000)
+    c2 = reqman.HttpCache(str(tmp_path), 1000)
+    c1.store("GET", "http://x/1", {}, 200, {"ETag": "e1"}, reqman.Content("A"), "info")
+    c2.store("GET", "http://x/2", {}, 200, {"ETag": "e2"}, reqman.Content("B"), "info")
+    c1.save()
+    c2.save()
+    assert not [i for i in os.listdir(str(tmp_path)) if i.endswith(".tmp")]
+
+    c3 = reqman.HttpCache(str(tmp_path), 1000)
+    assert sorted([e["url"] for e in c3.entries.values()]) == ["http://x/1", "http://x/2"]
+
+    c3.load("GET", "http://x/1", {})
+    assert c3.dirty
+    c3.save()
+    assert not c3.dirty
@@ -0,0 +1,36 @@
+import reqman, pytest, json, os
+
+MOCK = {
+    "http://x/a": (200, '{"v": 1}'),
+    "http://x/b": (200, "<a>1</a>"),
+}
+
+def test_profile(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nupper: |\n  return x.upper()\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- GET: /a
+  doc: <<root|upper>>
+  tests:
+    - json.v: 1
+  save: v
+- GET: /b
+""")
+
+    x = exe(".", "--profile:trace.json", fakeServer=MOCK)
+    assert x.rc == 0
+    assert "PROFILE:" in x.console
+    for phase in ["command", "parse", "resolve", "send", "decode", "save", "test", "request", "render", "resolver"]:
+        assert "\n%s " % phase in x.console
+    assert "Slowest requests" in x.console
+    assert "GET http://x/a" in x.console
+    assert "Slowest resolvers" in x.console
+
+    trace = json.load(open("trace.json"))
+    assert len([e for e in trace["traceEvents"] if e["cat"] == "request"]) == 2
+    assert not reqman.PROFILER.enabled
+
+    x = exe(".", fakeServer=MOCK)
+    assert "PROFILE:" not in x.console
+    assert reqman.PROFILER.spans == []
@@ -0,0 +1,94 @@
+import reqman, pytest, asyncio, time
+
+CALLS = []
+
+def limited(method, url, body, headers):
+    CALLS.append(time.monotonic())
+    if len(CALLS) == 1:
+        return 429, "too many", {"Retry-After": "0.2"}
+    return 200, "ok"
+
+MOCK = {
+    "http://x/a": (200, "ok"),
+    "http://y/a": (200, "ok"),
+    "http://x/limited": limited,
+}
+
+
+def test_ratelimit(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("""
+root: http://x
+ratelimit:
+    x:
+        rate: 20
+        burst: 1
+""")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- GET: /a
+  foreach:
+    - i: 1
+    - i: 2
+    - i: 3
+    - i: 4
+    - i: 5
+- GET: http://y/a  # not limited
+""")
+
+    t = time.monotonic()
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    assert time.monotonic() - t >= 0.19  # 4 waits of 50ms
+    exs = x.rr.results[1].exchanges
+    assert all([ex.time < 40 for ex in exs])  # the wait is not in the time
+    assert sum([ex.wait for ex in exs[:5]]) >= 190
+    assert exs[5].wait == 0
+
+
+def test_ratelimit_429():
+    CALLS.clear()
+    conf = {"*": {"rate": 100, "concurrent": 1}}
+
+    async def go():
+        ll = []
+        for i in range(2):
+            ll.append(await reqman.asyncExecute("GET", "/", "http://x/limited", None, {}, http=MOCK, ratelimit=conf))
+        return ll
+
+    ex1, ex2 = asyncio.get_event_loop().run_until_complete(go())
+    assert ex1.status == 429 and ex2.status == 200
+    assert CALLS[1] - CALLS[0] >= 0.19  # paused by the Retry-After
+    assert ex2.wait >= 190
+
+
+def test_ratelimit_adapt():
+    r = reqman.RateLimiter(rate=10)
+    r.release(429, {})
+    assert r.rate == 5
+    r.release(200, {})
+    assert r.rate == 6
+    for i in range(10):
+        r.release(200, {})
+    assert r.rate == 10
+
+
+def test_retry_after():
+    assert reqman.RateLimiter.seconds("2") == 2
+    assert reqman.RateLimiter.seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert reqman.RateLimiter.seconds("nimp") is None
+
+
+def test_ratelimit_cancelled():
+    async def go():
+        r = reqman.RateLimiter(rate=1, concurrent=1)
+        await r.acquire()  # (the only token)
+        r.release(200, {})
+        task = asyncio.ensure_future(r.acquire())  # waits for a token
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await asyncio.wait_for(r.acquire(), 2)  # the slot was given back
+
+    assert asyncio.get_event_loop().run_until_complete(go()) > 0
@@ -0,0 +1,89 @@
+import reqman, pytest, asyncio, ssl
+
+CALLS = []
+
+def flaky(method, url, body, headers):
+    CALLS.append(url)
+    if len(CALLS) < 3:
+        return 503, "unavailable"
+    return 200, "ok"
+
+MOCK = {
+    "http://x/flaky": flaky,
+    "http://x/ko": (502, "bad gateway"),
+}
+
+
+def test_retry(exe):
+    CALLS.clear()
+    with open("reqman.conf", "w+") as fid:
+        fid.write("""
+root: http://x
+retry:
+    attempts: 3
+    backoff: 0.01
+""")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- GET: /flaky
+  tests:
+    - status: 200
+- GET: /ko
+  retry: 1  # no retry for this one
+  tests:
+    - status: 502
+""")
+
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    ex1, ex2 = x.rr.results[1].exchanges
+    assert len(CALLS) == 3
+    assert [i[0] for i in ex1.attempts] == [503, 503, 200]
+    assert ex1.status == 200
+    assert len(ex2.attempts) == 1
+
+
+def test_retry_post(exe):
+    CALLS.clear()
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nretry:\n    attempts: 3\n    backoff: 0.01\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("- POST: /flaky\n- POST: /flaky\n  retry:\n    methods: POST\n    max: 0.05\n")
+
+    def flaky(method, url, body, headers):
+        CALLS.append(url)
+        return 503, "unavailable", {"Retry-After": "1"}
+
+    x = exe(".", fakeServer={"http://x/flaky": flaky})
+    ex1, ex2 = x.rr.results[1].exchanges
+    assert len(ex1.attempts) == 1  # a POST is not retried (by default)
+    assert len(ex2.attempts) == 3  # (after 0.05s : the Retry-After, capped by max)
+
+
+def test_retry_policy():
+    assert reqman.RetryPolicy.get(None) is None
+    assert reqman.RetryPolicy.get(4).attempts == 4
+    p = reqman.RetryPolicy.get(dict(attempts=5, backoff=1, max=3, statuses=429))
+    assert p.statuses == [429]
+    assert 0.5 <= p.delay(1) <= 1
+    assert 1.5 <= p.delay(3) <= 3  # capped
+    assert p.isRetryable("GET", 429, "")
+    assert not p.isRetryable("GET", 503, "")
+    assert p.isRetryable("GET", None, "Unreachable")
+    assert not p.isRetryable("GET", None, "Invalid")
+    assert not p.isRetryable("POST", None, "Timeout")  # not idempotent
+    assert reqman.RetryPolicy.get(dict(methods="post")).isRetryable("POST", None, "Timeout")
+    assert p.delay(1, "2") == 2 and p.delay(1, "60") == 3  # Retry-After, capped
+    with pytest.raises(reqman.RMFormatException):
+        reqman.RetryPolicy.get("lot")
+
+
+def test_ssl_error(monkeypatch):
+    async def _request(*a, **k):
+        raise ssl.SSLError("bad handshake")
+
+    monkeypatch.setattr(reqman, "_request", _request)
+    r = asyncio.get_event_loop().run_until_complete(
+        reqman.request("GET", "https://x/", None, {})
+    )
+    assert r == (None, {}, "SSL Error", "")
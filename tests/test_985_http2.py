@@ -0,0 +1,125 @@
+import reqman, pytest, asyncio
+
+
+class FakeHeaders(dict):
+    def get_list(self, k):
+        return ["a=1", "b=2"]
+
+
+class FakeResponse:
+    http_version = "HTTP/2"
+    status_code = 200
+    reason_phrase = "OK"
+    headers = FakeHeaders({"content-type": "application/json", "set-cookie": "a=1"})
+    content = b'{"ok": "\\u00e9"}'
+    text = '{"ok": "\\u00e9"}'
+
+
+class FakeClient:
+    created = 0
+
+    def __init__(self, **k):
+        assert k["http2"]
+        FakeClient.created += 1
+
+    async def request(self, method, url, **k):
+        return FakeResponse()
+
+    async def aclose(self):
+        pass
+
+
+class FakeHttpx:
+    AsyncClient = FakeClient
+
+
+def test_http2_transport(monkeypatch):
+    monkeypatch.setattr(reqman, "httpx", FakeHttpx)
+    FakeClient.created = 0
+
+    async def go():
+        ll = await asyncio.gather(
+            *[
+                reqman.asyncExecute("GET", "/", "https://x/", None, {}, http2=True)
+                for i in range(5)
+            ]
+        )
+        await reqman.closeH2()
+        return ll
+
+    ll = asyncio.get_event_loop().run_until_complete(go())
+    assert FakeClient.created == 1  # one client for all
+    assert not reqman.H2CLIENTS
+    ex = ll[0]
+    assert ex.status == 200
+    assert ex.info == "HTTP/2 200 OK"
+    assert ex.content.toJson() == {"ok": "é"}
+    assert ex.outHeaders["Set-Cookie"] == ["a=1", "b=2"]
+
+
+def test_http2_without_httpx(monkeypatch):
+    monkeypatch.setattr(reqman, "httpx", None)
+    run = lambda http: asyncio.get_event_loop().run_until_complete(
+        reqman.testContent("- GET: https://x/\n  tests:\n    - status: 200", {"http2": True}, http=http)
+    )
+
+    with pytest.raises(reqman.RMException):
+        run(None)
+    assert run({"https://x/": (200, "ok")}).ok == 1  # mocks don't need httpx
+
+
+def test_http2_without_h2(monkeypatch):
+    class NoH2Client(FakeClient):
+        def __init__(self, **k):
+            raise ImportError("Using http2=True, but the 'h2' package is not installed")
+
+    class NoH2Httpx:
+        AsyncClient = NoH2Client
+
+    monkeypatch.setattr(reqman, "httpx", NoH2Httpx)
+    with pytest.raises(reqman.RMException, match="h2"):
+        asyncio.get_event_loop().run_until_complete(
+            reqman.asyncExecute("GET", "/", "https://x/", None, {}, http2=True)
+        )
+
+
+def test_http2_read_error(monkeypatch):
+    class ResetHttpx:
+        class TimeoutException(Exception): pass
+        class NetworkError(Exception): pass
+        class ReadError(NetworkError): pass  # (a connection reset, mid-response)
+        class RemoteProtocolError(Exception): pass
+
+        class AsyncClient(FakeClient):
+            async def request(self, method, url, **k):
+                raise ResetHttpx.ReadError("reset")
+
+    monkeypatch.setattr(reqman, "httpx", ResetHttpx)
+
+    async def go():
+        ex = await reqman.asyncExecute("GET", "/", "https://x/", None, {}, http2=True)
+        await reqman.closeH2()
+        return ex
+
+    ex = asyncio.get_event_loop().run_until_complete(go())
+    assert ex.status is None and str(ex.content) == "Unreachable"  # (so, retryable)
+
+
+@pytest.mark.asyncio
+async def test_http2_real_httpx():  # (the real httpx, against a http/1.1 server)
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    import aiohttp.web
+    from aiohttp.test_utils import TestServer
+
+    async def handler(request):
+        return aiohttp.web.json_response({"ok": "é"}, headers={"Set-Cookie": "a=1"})
+
+    app = aiohttp.web.Application()
+    app.router.add_get("/", handler)
+    async with TestServer(app) as server:
+        ex = await reqman.asyncExecute("GET", "/", str(server.make_url("/")), None, {}, http2=True)
+        await reqman.closeH2()
+    assert ex.status == 200 and ex.info.startswith("HTTP/1.1 200")
+    assert ex.content.toJson() == {"ok": "é"}
+    assert ex.outHeaders["Set-Cookie"] == ["a=1"]
@@ -0,0 +1,84 @@
+import reqman, pytest, hashlib, aiohttp.web
+from aiohttp.test_utils import TestServer
+
+DATA = b"0123456789" * 20000
+
+SEEN = []
+
+def upload(method, url, body, headers):
+    SEEN.append(b"".join(body))  # a mock can read the stream
+    return 201, "ok"
+
+MOCK = {"http://x/upload": upload}
+
+
+def test_stream_file(exe):
+    with open("big.bin", "wb+") as fid:
+        fid.write(DATA)
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- PUT: /upload
+  body: <<file:big.bin>>
+  tests:
+    - status: 201
+""")
+
+    SEEN.clear()
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    assert SEEN == [DATA]
+    ex = x.rr.results[1].exchanges[0]
+    md5 = hashlib.md5(DATA).hexdigest()
+    assert ex.body == "<stream big.bin: 200000 bytes, md5 %s>" % md5  # not the content
+
+
+def test_stream_file_not_found(exe):
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- PUT: http://x/upload
+  body: <<file:nope.bin>>
+""")
+    x = exe("f.yml", fakeServer=MOCK)
+    ex = x.rr.results[1].exchanges[0]
+    assert ex.status is None and "nope.bin" in str(ex.content)
+
+
+def test_stream_iterator(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("""
+root: http://x
+gen: return ("chunk%s" % i for i in range(3))
+""")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- PUT: /upload
+  body: <<gen>>
+  tests:
+    - status: 201
+""")
+
+    SEEN.clear()
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    assert SEEN == [b"chunk0chunk1chunk2"]
+    assert "18 bytes" in x.rr.results[1].exchanges[0].body
+
+
+@pytest.mark.asyncio
+async def test_stream_chunked():
+    got = []
+
+    async def handler(request):
+        got.append((request.headers.get("Transfer-Encoding"), await request.read()))
+        return aiohttp.web.Response(text="ok")
+
+    app = aiohttp.web.Application()
+    app.router.add_put("/", handler)
+    async with TestServer(app) as server:
+        body = reqman.BodyStream(iter([b"a" * 70000, "b"]))
+        ex = await reqman.asyncExecute("PUT", "/", str(server.make_url("/")), body, {})
+    assert ex.status == 200
+    assert got == [("chunked", b"a" * 70000 + b"b")]
+    assert ex.body.startswith("<stream <iterator>: 70001 bytes")
@@ -0,0 +1,117 @@
+import reqman, pytest, aiohttp.web
+from aiohttp.test_utils import TestServer
+
+SEEN = []
+
+def echo(method, url, body, headers):
+    SEEN.append((headers["Content-Type"], body if type(body) is bytes else b"".join(body)))
+    return 200, "ok"
+
+MOCK = {"http://x/post": echo}
+
+
+def test_form(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nwho: jo & co\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- POST: /post
+  form:
+    name: <<who>>
+    n: 42
+    tags: [a, b]
+""")
+    SEEN.clear()
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    assert SEEN == [
+        (
+            "application/x-www-form-urlencoded",
+            b"name=jo+%26+co&n=42&tags=a&tags=b",
+        )
+    ]
+
+
+def test_form_and_body():
+    with pytest.raises(reqman.RMFormatException):
+        reqman.Reqs("- POST: /\n  body: hello\n  form:\n    a: 1\n")
+
+
+def test_multipart(exe):
+    with open("data.json", "wb+") as fid:
+        fid.write(b'{"big": "' + b"x" * 100000 + b'"}')
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nwho: jo\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- proc:
+    - POST: /post
+      multipart:
+        name: <<who>>
+        up: <<file:data.json>>
+- call: proc
+  multipart:
+    name: <<who>>
+    info: {"a": 1}
+    up: <<file:data.json>>
+""")
+    SEEN.clear()
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    ctype, body = SEEN[0]
+    assert ctype.startswith("multipart/form-data; boundary=")
+    boundary = ctype.split("=", 1)[1]
+    assert body.endswith(("--%s--\r\n" % boundary).encode())
+    assert b'Content-Disposition: form-data; name="up"; filename="data.json"\r\nContent-Type: application/json' in body
+    assert b'name="info"\r\n\r\n{"a": 1}\r\n' in body
+    assert body.count(b"x") >= 100000
+
+    ex = x.rr.results[1].exchanges[0]
+    assert ex.body.startswith("<stream multipart(name,info,up): %s bytes" % len(body))
+
+
+@pytest.mark.asyncio
+async def test_multipart_real():
+    got = []
+
+    async def handler(request):
+        form = await request.post()
+        got.append((form["name"], form["up"].file.read()))
+        return aiohttp.web.Response(text="ok")
+
+    app = aiohttp.web.Application()
+    app.router.add_post("/", handler)
+    async with TestServer(app) as server:
+        stream = reqman.BodyStream(iter([b"abc", b"def"]), "f.bin")
+        body = reqman.Multipart(dict(name="jo", up=stream))
+        ex = await reqman.asyncExecute(
+            "POST", "/", str(server.make_url("/")), body, {"Content-Type": body.contentType}
+        )
+    assert ex.status == 200
+    assert got == [("jo", b"abcdef")]
+
+
+def test_multipart_retry(exe):
+    sizes = []
+
+    def flaky(method, url, body, headers):
+        sizes.append(b"".join(body).count(b"chunk"))
+        return 503, "busy"
+
+    with open("reqman.conf", "w+") as fid:
+        fid.write("""
+root: http://x
+retry:
+    attempts: 3
+    backoff: 0.01
+gen: return ("chunk%s" % i for i in range(3))
+""")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- PUT: /up
+  multipart:
+    up: <<gen>>
+""")
+    x = exe(".", fakeServer={"http://x/up": flaky})
+    assert sizes == [3]  # an iterator part can't be sent twice
+    assert x.rr.results[1].exchanges[0].status == 503
@@ -0,0 +1,57 @@
+import reqman, pytest, gzip, pickle, aiohttp.web
+from aiohttp.test_utils import TestServer
+
+
+def test_decodeContent():
+    d = reqman.decodeContent
+    assert d(b'{"a": "\\u00e9"}', "application/json") == '{"a": "é"}'.encode()
+    assert d(b'{"a": 1}', "application/problem+json; charset=utf-8") == b'{"a": 1}'
+    assert d(b"not json", "application/json") == b"not json"
+    assert d("é".encode("latin-1"), "text/plain; charset=ISO-8859-1") == "é".encode()
+    assert d(b"\x00\x01\xe9", "application/octet-stream; charset=latin-1") == b"\x00\x01\xe9"  # sniffed
+    body = "é".encode()
+    assert d(body, "text/html; charset=utf-8") is body  # no copy
+    assert d(body, None) is body
+    assert d(body, "text/plain; charset=unknown") is body
+
+
+def test_content_view():
+    b = "héllo".encode()
+    c = reqman.Content(b)
+    assert bytes(c) is b
+    assert c.view().obj is b
+    assert str(c) == "héllo"
+    assert reqman.Content(b'{"a":1}').toJson() == {"a": 1}
+    assert str(reqman.Content(b"\xff\xfe")) == "b'\\xff\\xfe'"  # binary
+
+    c2 = pickle.loads(pickle.dumps(c))
+    assert bytes(c2) == b and str(c2) == "héllo"
+
+
+@pytest.mark.asyncio
+async def test_gzip():
+    got = []
+
+    async def handler(request):
+        got.append(request.headers.get("Accept-Encoding"))
+        return aiohttp.web.Response(
+            body=gzip.compress("é".encode("latin-1") * 1000),
+            headers={"Content-Encoding": "gzip", "Content-Type": "text/plain; charset=latin-1"},
+        )
+
+    app = aiohttp.web.Application()
+    app.router.add_get("/", handler)
+    async with TestServer(app) as server:
+        ex = await reqman.asyncExecute("GET", "/", str(server.make_url("/")), None, {})
+    assert got == [reqman.ACCEPTENCODING]
+    assert str(ex.content) == "é" * 1000
+
+
+def test_content_empty(exe):
+    assert repr(reqman.Content(b"")) == "" and str(reqman.Content("")) == ""
+
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: http://x/a\n  save: v\n- GET: http://x/b/<<v>>/z\n  tests:\n    - status: 200\n")
+    x = exe("f.yml", fakeServer={"http://x/a": (204, b""), "http://x/b//z": (200, "ok")})
+    assert x.rc == 0
+    assert x.rr.results[1].exchanges[1].url == "http://x/b//z"
@@ -0,0 +1,85 @@
+import reqman, pytest, json
+
+SEEN = []
+
+def echo(method, url, body, headers):
+    SEEN.append((url, headers.get("X-Id"), json.loads(body) if body[:1] in b"{[" else body))
+    return 200, json.dumps(dict(n=len(SEEN)))
+
+MOCK = {"http://x/1": echo, "http://x/2": echo, "http://x/3": echo}
+
+COUNTER = []
+
+def cpt(x, ENV):
+    COUNTER.append(1)
+    return len(COUNTER)
+
+
+def test_foreach_partial(exe, monkeypatch):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("""
+root: http://x
+big: {"a": [1, 2, 3]}
+alias: <<big>>
+headers:
+    X-Id: id<<i>>
+""")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- POST: /<<i>>
+  body:
+    const: [1, 2]
+    big: <<alias>>
+    i: <<i>>
+    label: row <<i>>
+    cpt: <<cpt>>
+    last: <<last>>
+  save:
+    last: <<json.n>>
+  foreach:
+    - i: 1
+    - i: 2
+    - i: 3
+""")
+
+    monkeypatch.setitem(reqman.EXPOSEDS, "cpt", cpt)
+    calls = []
+    replaceTxt = reqman.Env.replaceTxt
+
+    def spy(self, txt):
+        calls.append(txt)
+        return replaceTxt(self, txt)
+
+    monkeypatch.setattr(reqman.Env, "replaceTxt", spy)
+
+    SEEN.clear()
+    COUNTER.clear()
+    x = exe(".", fakeServer=MOCK)
+    assert x.rc == 0
+    assert [(u, h) for u, h, b in SEEN] == [("http://x/1", "id1"), ("http://x/2", "id2"), ("http://x/3", "id3")]
+    bodies = [b for u, h, b in SEEN]
+    assert [b["i"] for b in bodies] == [1, 2, 3]
+    assert [b["label"] for b in bodies] == ["row 1", "row 2", "row 3"]
+    assert [b["cpt"] for b in bodies] == [1, 2, 3]  # a python method is re-evaluated
+    assert [b["last"] for b in bodies] == ["<<last>>", 1, 2]  # a saved var too
+    assert all(b["big"] == {"a": [1, 2, 3]} and b["const"] == [1, 2] for b in bodies)
+
+    assert len([i for i in calls if "<<alias>>" in i]) == 1  # resolved once
+    assert len([i for i in calls if "row <<i>>" in i]) == 3
+
+
+def test_partial_fallback():
+    env = reqman.Env(dict(b=b"bytes", k="key"))
+    p = reqman.Partial()
+    assert p.resolveBody(env, {"x": "<<b>>"}) == b"bytes"  # bytes : the whole body
+
+    p = reqman.Partial()
+    assert p.resolveBody(env, {"<<k>>": 1}) == {"key": 1}  # key with var
+    assert p.plan is False
+
+    body = {"x": [1, {"y": "<<k>>"}], "z": {"w": 1}}
+    p = reqman.Partial()
+    r = p.resolveBody(env, body)
+    assert r == {"x": [1, {"y": "key"}], "z": {"w": 1}}
+    assert body == {"x": [1, {"y": "<<k>>"}], "z": {"w": 1}}  # template untouched
+    assert r["z"] is body["z"]  # invariant containers are shared
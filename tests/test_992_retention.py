@@ -0,0 +1,64 @@
+import reqman, pytest, os
+
+MOCK = {
+    "http://x/ok": (200, "ok " * 100),
+    "http://x/ko": (500, "ko " * 100),
+}
+
+
+def test_retention_ko(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nretention: ko\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("""
+- GET: /ok
+  tests:
+    - status: 200
+- GET: /ko
+  tests:
+    - status: 200
+""")
+    x = exe(".", "--o:out.html", fakeServer=MOCK)
+    assert x.rc == 1
+    ok, ko = x.rr.results[1].exchanges
+    assert ok._spilled  # spilled
+    assert not ko._spilled  # kept in memory
+    assert str(ok.content) == "ok " * 100  # loaded back, lazily
+    assert ok.outHeaders["server"] == "reqman mock" and ok.scope["root"] == "http://x"
+    with open("out.html") as fid:
+        assert "ok ok ok" in fid.read()
+
+    name = x.rr.saveRMR("run.rmr")
+    rr = reqman.ReqmanResult.fromRMR(name)
+    ok2, ko2 = rr.results[1].exchanges
+    assert not ok2._spilled
+    assert str(ok2.content) == "ok " * 100
+
+
+def test_retention_size():
+    r = reqman.Retention.get({"size": 0.0005})  # ~500 bytes
+    assert r.size == 524 and not r.ko
+
+    ll = []
+    for i in range(3):
+        ex = reqman.Exchange("GET", "/", "http://x/", "", {}, 200, {}, reqman.Content("x" * 200), "", 0)
+        ex.tests = []
+        r.keep(ex)
+        ll.append(ex)
+    assert [bool(ex._spilled) for ex in ll] == [False, False, True]
+    assert str(ll[2].content) == "x" * 200
+
+    with pytest.raises(reqman.RMFormatException):
+        reqman.Retention.get("lots")
+
+
+def test_retention_per_run(exe):  # exe: just for the temp folder
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nretention: 0.0005\n")  # ~500 bytes : one exchange in memory
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: /ok\n- GET: /ko\n")
+    cmd = reqman.ReqmanCommand("f.yml")
+    for run in range(2):
+        rr = cmd.execute(fakeServer=MOCK, outputConsole=reqman.OutputConsole.NO)
+        ok, ko = rr.results[1].exchanges
+        assert not ok._spilled and ko._spilled  # (the budget is per run)
@@ -0,0 +1,71 @@
+import reqman, pytest, asyncio, time, aiohttp.web
+from aiohttp.test_utils import TestServer
+
+MOCK = {
+    "http://x/ok": (200, "ok"),
+    "http://x/ko": (500, "ko"),
+    "http://x/end": (200, "end"),
+}
+
+
+def test_failfast(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nEND:\n    - GET: /end\n")
+    with open("f1.yml", "w+") as fid:
+        fid.write("- GET: /ok\n  tests:\n    - status: 200\n")
+    with open("f2.yml", "w+") as fid:
+        fid.write("- GET: /ko\n  tests:\n    - status: 200\n- GET: /ok\n")
+    with open("f3.yml", "w+") as fid:
+        fid.write("- GET: /ok\n  foreach:\n    - i: 1\n    - i: 2\n")
+
+    x = exe(".", "--failfast", "--o:out.html", fakeServer=MOCK)
+    assert x.rc == 1
+    assert "3 skipped" in x.console
+    _, f1, f2, f3, end = x.rr.results
+    assert not f1.exchanges[0].skipped
+    assert [ex.skipped for ex in f2.exchanges] == [False, True]
+    assert [ex.info for ex in f3.exchanges] == ["SKIPPED", "SKIPPED"]
+    assert end.exchanges[0].status == 200  # END is executed
+    assert x.rr.nbReqs == 3 and x.rr.nbSkipped == 3
+
+    x = exe(".", "--failfast:2", fakeServer=MOCK)
+    assert x.rr.nbSkipped == 0
+
+    x = exe(".", "--failfast:x", fakeServer=MOCK)
+    assert x.rc == -1
+
+
+def test_failfast_cancel(exe):
+    async def slow(request):
+        await asyncio.sleep(5)
+        return aiohttp.web.Response(text="slow")
+
+    async def ko(request):
+        await asyncio.sleep(0.1)
+        return aiohttp.web.Response(status=500)
+
+    app = aiohttp.web.Application()
+    app.router.add_get("/slow", slow)
+    app.router.add_get("/ko", ko)
+    server = TestServer(app)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(server.start_server())
+    try:
+        with open("reqman.conf", "w+") as fid:
+            fid.write("root: %s\n" % str(server.make_url("")))
+        with open("a.yml", "w+") as fid:
+            fid.write("- GET: /slow\n- GET: /slow\n")
+        with open("b.yml", "w+") as fid:
+            fid.write("- GET: /ko\n  tests:\n    - status: 200\n")
+
+        t = time.time()
+        x = exe(".", "--p", "--failfast")
+        assert time.time() - t < 3  # the in-flight request is cancelled
+        a, b = x.rr.results[1:3]
+        assert [str(ex.content) for ex in a.exchanges] == [
+            "Cancelled (failfast)",
+            "Skipped (failfast)",
+        ]
+        assert b.exchanges[0].status == 500
+    finally:
+        loop.run_until_complete(server.close())
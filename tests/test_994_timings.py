@@ -0,0 +1,62 @@
+import reqman, pytest, json, os
+
+CALLS = []
+
+def call(method, url, body, headers):
+    CALLS.append(url.split("/")[-1])
+    return (500 if "ko" in url else 200), "ok"
+
+MOCK = {"http://x/%s" % i: call for i in ["a", "b", "c", "ko"]}
+
+
+def test_timings(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\ntimings: true\n")
+    for i in "abc":
+        with open("%s.yml" % i, "w+") as fid:
+            fid.write("- GET: /%s\n" % i)
+
+    CALLS.clear()
+    x = exe(".", "--p", fakeServer=MOCK)
+    assert sorted(CALLS) == ["a", "b", "c"]
+    with open(".reqman_timings.json") as fid:
+        db = json.load(fid)["files"]
+    assert sorted(db) == ["a.yml", "b.yml", "c.yml"]
+    assert list(db["a.yml"]["reqs"].values())[0] == db["a.yml"]["time"]
+
+    # fake the durations : c is the longest, then b, then a
+    for i, t in zip("abc", [10, 500, 3000]):
+        db["%s.yml" % i]["time"] = t
+    with open(".reqman_timings.json", "w") as fid:
+        json.dump(dict(version=1, files=db), fid)
+
+    CALLS.clear()
+    x = exe(".", "--p", fakeServer=MOCK)
+    assert CALLS == ["c", "b", "a"]  # longest first
+    assert [os.path.basename(r.name) for r in x.rr.results[1:4]] == ["a.yml", "b.yml", "c.yml"]  # results in order
+
+
+def test_timings_failedfirst(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\ntimings:\n    path: db.json\n    failedfirst: true\n")
+    with open("a.yml", "w+") as fid:
+        fid.write("- GET: /a\n")
+    with open("z.yml", "w+") as fid:
+        fid.write("- GET: /ko\n  tests:\n    - status: 200\n")
+    exe(".", fakeServer=MOCK)
+
+    db = reqman.Timings.get({"path": "db.json", "failedfirst": True}, os.getcwd())
+    assert db.files["z.yml"]["ko"] and not db.files["a.yml"]["ko"]
+    db.files["a.yml"]["time"] = 1000
+    assert db.schedule(["a.yml", "z.yml"], lambda i: i) == ["z.yml", "a.yml"]
+    db.failedFirst = False
+    assert db.schedule(["a.yml", "z.yml"], lambda i: i) == ["a.yml", "z.yml"]
+
+
+def test_timings_estimate(tmp_path):
+    db = reqman.Timings(str(tmp_path / "db.json"))
+    reqs = reqman.Reqs("- GET: /a\n- GET: /b\n  foreach:\n    - i: 1\n    - i: 2\n")
+    ra, rb = reqs[0], reqs[1].reqs[0]
+    db.files["old.yml"] = dict(time=100, ko=False, reqs={ra.uid(): 10, rb.uid(): 20})
+    assert db.estimate("new.yml", reqs) == 10 + 2 * 20  # from its known requests
+    assert db.estimate("other.yml") == 100  # the average
@@ -0,0 +1,66 @@
+import reqman, pytest, os, shutil
+
+CALLS = []
+
+
+def mock(fixed):
+    def server(method, url, body, headers):
+        CALLS.append(url)
+        if url.endswith("/login"):
+            return 200, '{"token": "abc"}'
+        elif url.endswith("/item"):
+            ok = fixed and headers.get("Authorization") == "abc"
+            return (200, "item") if ok else (500, "ko")
+        return 200, "ok"
+
+    return dict(
+        ("http://x" + p, server) for p in ["/login", "/other", "/item", "/ok", "/end"]
+    )
+
+
+def test_rerun_failed(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nswitches:\n  s:\n    root: http://x\nEND:\n    - GET: /end\n")
+    with open("f1.yml", "w+") as fid:
+        fid.write("- GET: /ok\n  tests:\n    - status: 200\n")
+    with open("f2.yml", "w+") as fid:
+        fid.write(
+            "- GET: /login\n  save: token\n"
+            "- GET: /other\n  tests:\n    - status: 200\n"
+            "- GET: /item\n  headers:\n    Authorization: <<token.token>>\n"
+            "  tests:\n    - status: 200\n"
+        )
+
+    x = exe(".", "-s", "--S", fakeServer=mock(False))
+    assert x.rr.ok == 2 and x.rr.total == 3
+
+    del CALLS[:]
+    x = exe("reqman.rmr", "--rerun-failed", "--o:out.html", fakeServer=mock(True))
+    assert x.rc == 0
+    assert sorted(CALLS) == ["http://x/end", "http://x/item", "http://x/login"]
+    assert x.rr.ok == 3 and x.rr.total == 3
+    assert x.rr.switches == ["s"]  # the original switches
+    _, f1, f2, end = x.rr.results
+    assert [ex.url for ex in f2.exchanges] == [
+        "http://x/login",
+        "http://x/other",
+        "http://x/item",
+    ]
+    assert f1.exchanges[0].status == 200  # kept
+
+    x = exe("f1.yml", "--rerun-failed", fakeServer=mock(True))
+    assert x.rc == -1
+    x = exe("reqman.rmr", "-s", "--rerun-failed", fakeServer=mock(True))
+    assert x.rc == -1
+
+
+def test_rerun_failed_old_rmr(exe):  # an rmr saved by reqman 2.11 (see test_959)
+    shutil.copy(os.path.join(os.path.dirname(__file__), "baseline.rmr"), "old.rmr")
+    MOCK = {"http://x/login": (200, "tok"), "http://x/p": (200, "ok"), "http://x/ko": (200, "ok")}
+    for o in "01":
+        for i in "01":
+            MOCK["http://x/a/%s/%s" % (o, i)] = (200, "ok")
+    x = exe("old.rmr", "--rerun-failed", fakeServer=MOCK)
+    assert x.rc == 0
+    assert x.rr.ok == 6 and x.rr.total == 6
+    assert [ex.url for ex in x.rr.results[1].exchanges][-1] == "http://x/ko"
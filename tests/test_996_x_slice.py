@@ -0,0 +1,57 @@
+import reqman, os
+
+CALLS = []
+
+
+def server(method, url, body, headers):
+    CALLS.append(url)
+    if url.endswith("/login"):
+        return 200, '{"token": "abc"}'
+    elif url.endswith("/item"):
+        return 200, '{"id": "%s-42"}' % headers.get("Authorization")
+    return 200, "ok"
+
+
+MOCK = dict(
+    ("http://x" + p, server) for p in ["/login", "/ping", "/item", "/other", "/end"]
+)
+
+
+def test_x_slice(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write(
+            "root: http://x\n"
+            "auth: <<token.token>>\n"
+            "BEGIN:\n"
+            "    - GET: /ping\n"
+            "    - GET: /login\n"
+            "      save: token\n"
+            "END:\n"
+            "    - GET: /end\n"
+        )
+    with open("f1.yml", "w+") as fid:
+        fid.write(
+            "- GET: /other\n"
+            "  save: other\n"
+            "- GET: /item\n"
+            "  headers:\n"
+            "    Authorization: <<auth>>\n"
+            "  save:\n"
+            "    id: <<json.id>>\n"
+            "- GET: /other\n"
+        )
+
+    del CALLS[:]
+    x = exe(".", "--x:id", fakeServer=MOCK)
+    assert x.rc == "abc-42"
+    assert CALLS == ["http://x/ping", "http://x/login", "http://x/item", "http://x/end"]  # BEGIN & END whole
+    assert not os.path.isfile("reqman.html")
+
+    del CALLS[:]
+    x = exe(".", "--x:token", fakeServer=MOCK)
+    assert x.rc == '{"token": "abc"}'
+    assert CALLS == ["http://x/ping", "http://x/login", "http://x/end"]
+
+    del CALLS[:]
+    x = exe(".", fakeServer=MOCK)
+    assert len(CALLS) == 6  # all
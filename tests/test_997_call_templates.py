@@ -0,0 +1,84 @@
+import reqman, pytest
+
+
+def test_proc_compiled_once(Reqs):
+    y = """
+- proc:
+    - GET: /a
+      headers:
+        x: 1
+- call: proc
+  headers:
+    y: 2
+- call: proc
+  doc: hello
+"""
+    l = Reqs(y)
+    assert len(l) == 2
+    assert l[0].templates is l[1].templates  # compiled once
+
+    r0, r1 = l[0].reqs[0], l[1].reqs[0]
+    assert r0.headers == {"x": 1, "y": 2} and r0.doc is None
+    assert r1.headers == {"x": 1} and r1.doc == "hello"
+    assert l[0].templates[0].headers == {"x": 1}  # never modified
+
+
+def test_nested_calls(Reqs):
+    y = """
+- inner:
+    - GET: /a
+- outer:
+    - call: inner
+      headers:
+        h: inner
+    - GET: /b
+- call: outer
+  headers:
+    h: outer
+  tests:
+    - status: 200
+"""
+    l = Reqs(y)
+    assert len(l) == 1
+    group = l[0].reqs[0]
+    assert type(group) is reqman.ReqGroup
+    r = group.reqs[0]
+    assert r.path == "/a"
+    assert r.headers == {"h": "outer"}  # the outer call site wins
+    assert r.tests == [{"status": 200}]
+    assert l[0].reqs[1].tests == [{"status": 200}]
+
+
+def test_bad_override(Reqs):
+    y = """
+- proc:
+    - GET: /a
+- call: proc
+  doc: [1, 2]
+"""
+    with pytest.raises(reqman.RMFormatException):
+        Reqs(y)
+
+
+@pytest.mark.asyncio
+async def test_execute():
+    y = """
+- proc:
+    - GET: /item/<<i>>
+      save: last
+- call: proc
+  foreach:
+    - i: 1
+    - i: 2
+  tests:
+    - status: 200
+- call: proc
+  params:
+    i: 3
+"""
+    MOCK = {"/item/%s" % i: (200, "ok") for i in range(1, 4)}
+    reqs = reqman.Reqs(y)
+    exs = await reqs.asyncReqsExecute([], http=MOCK, outputConsole=reqman.OutputConsole.NO)
+    assert [ex.url for ex in exs] == ["/item/1", "/item/2", "/item/3"]
+    assert [len(ex.tests) for ex in exs] == [1, 1, 0]
+    assert reqs[0].templates[0].tests == []
@@ -0,0 +1,86 @@
+import reqman, os, json, pytest
+
+MOCK = {"http://x/item/%s" % i: (200, "item %s" % i) for i in range(1, 6)}
+
+
+def urls(x):
+    return [ex.url for ex in x.rr.results[1].exchanges]
+
+
+def test_foreach_csv(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\n")
+    with open("data.csv", "w+") as fid:
+        fid.write("id,name\n1,a\n2,b\n3,c\n")
+    with open("f.yml", "w+") as fid:
+        fid.write(
+            "- GET: /item/<<id>>\n"
+            "  foreach: <<file:data.csv>>\n"
+            "  tests:\n"
+            "    - content: item <<id>>\n"
+        )
+    x = exe("f.yml", fakeServer=MOCK)
+    assert x.rc == 0
+    assert urls(x) == ["http://x/item/1", "http://x/item/2", "http://x/item/3"]
+
+
+def test_foreach_jsonl_lazy(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\nsrc: data\n")
+    with open("data.jsonl", "w+") as fid:
+        fid.write('{"id": 1}\n\n{"id": 2}\n{"id": 3}\nnot json at all\n')
+    with open("f.yml", "w+") as fid:
+        fid.write(
+            "- GET: /item/<<id>>\n"
+            "  foreach:\n"
+            "    file: <<src>>.jsonl\n"
+            "    start: 1\n"
+            "    stop: 3\n"
+        )
+    x = exe("f.yml", fakeServer=MOCK)
+    assert urls(x) == ["http://x/item/2", "http://x/item/3"]  # the bad line is never read
+
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: /item/<<id>>\n  foreach: <<file:data.jsonl>>\n")
+    x = exe("f.yml", fakeServer=MOCK)
+    assert x.rc == -1
+
+
+def test_foreach_folder(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\n")
+    os.mkdir("rows")
+    for i in [5, 4]:
+        with open("rows/%s.json" % i, "w+") as fid:
+            json.dump(dict(id=i), fid)
+    with open("f.yml", "w+") as fid:
+        fid.write(
+            "- proc:\n"
+            "    - GET: /item/<<id>>\n"
+            "- call: proc\n"
+            "  foreach:\n"
+            "    file: rows\n"
+        )
+    x = exe("f.yml", fakeServer=MOCK)
+    assert urls(x) == ["http://x/item/4", "http://x/item/5"]
+
+
+def test_foreach_bad_source(exe):
+    with open("reqman.conf", "w+") as fid:
+        fid.write("root: http://x\n")
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: /item/1\n  foreach: <<file:unknown.csv>>\n")
+    x = exe("f.yml", fakeServer=MOCK)
+    assert x.rc == -1
+
+    with open("f.yml", "w+") as fid:
+        fid.write("- GET: /item/1\n  foreach:\n    file: f.yml\n    stop: x\n")
+    x = exe("f.yml", fakeServer=MOCK)
+    assert x.rc == -1
+
+    for bad in ["start: -1", "stop: -2", "step: 0", "step: -1"]:
+        with open("f.yml", "w+") as fid:
+            fid.write("- GET: /item/1\n  foreach:\n    file: f.yml\n    %s\n" % bad)
+        x = exe("f.yml", fakeServer=MOCK)
+        assert x.rc == -1
+        assert "should be numbers" in x.console